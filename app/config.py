@@ -11,11 +11,65 @@ class Config:
     SECRET_KEY=os.getenv("SECRET_KEY")
     ALGORITHM=os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+    # tokens ya verificados guardados en memoria hasta su expiración (0 desactiva la caché)
+    TOKEN_CACHE_SIZE=int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+    # métricas en formato Prometheus expuestas en /metrics (solo administradores o METRICS_TOKEN)
+    METRICS_ENABLED=os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN=os.getenv("METRICS_TOKEN", "")
+    # consultas SQL: registro de consultas lentas (ms, 0 lo desactiva) y diagnóstico por petición
+    SLOW_QUERY_MS=int(os.getenv("SLOW_QUERY_MS", "200"))
+    QUERY_DIAGNOSTICS_ENABLED=os.getenv("QUERY_DIAGNOSTICS_ENABLED", "false").lower() == "true"
+    # repeticiones de una misma sentencia en una petición para marcarla como posible N+1
+    QUERY_N_PLUS_ONE_THRESHOLD=int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
+    # máximo de consultas por petición (0 = sin límite); estricto lanza error (para las pruebas)
+    QUERY_BUDGET_DEFAULT=int(os.getenv("QUERY_BUDGET_DEFAULT", "0"))
+    QUERY_BUDGET_STRICT=os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
     #hashing
     HASHING_SCHEMES=os.getenv("HASHING_SCHEMES")
     HASHING_DEPRECATED=os.getenv("HASHING_DEPRECATED")
+    # costo de bcrypt (2^rounds iteraciones); al cambiarlo los hashes se recalculan al iniciar sesión
+    HASHING_BCRYPT_ROUNDS=int(os.getenv("HASHING_BCRYPT_ROUNDS", "12"))
     # sqlite
     DATABASE_URL=os.getenv("DATABASE_URL")
+    # perfil del engine de SQLite: "tuned" (WAL + pragmas) o "default" (valores de SQLite)
+    SQLITE_PROFILE=os.getenv("SQLITE_PROFILE", "tuned")
+    SQLITE_BUSY_TIMEOUT_MS=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB=int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE=int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # pool de conexiones lectoras; las escrituras se serializan con un único escritor
+    SQLITE_POOL_SIZE=int(os.getenv("SQLITE_POOL_SIZE", "8"))
+    SQLITE_MAX_OVERFLOW=int(os.getenv("SQLITE_MAX_OVERFLOW", "8"))
+    SQLITE_POOL_TIMEOUT=int(os.getenv("SQLITE_POOL_TIMEOUT", "30"))
+    # exportaciones CSV: filas por lote leídas del cursor y emitidas al cliente
+    CSV_BATCH_SIZE=int(os.getenv("CSV_BATCH_SIZE", "1000"))
+    # caché en memoria de tests completos (test + preguntas + respuestas)
+    TEST_BUNDLE_CACHE_SIZE=int(os.getenv("TEST_BUNDLE_CACHE_SIZE", "256"))
+    # catálogos con ETag: segundos que el cliente puede reutilizar la respuesta sin revalidar
+    CATALOG_CACHE_MAX_AGE=int(os.getenv("CATALOG_CACHE_MAX_AGE", "0"))
+    # compresión de respuestas: gzip (y brotli si el paquete está instalado) desde este tamaño
+    COMPRESSION_ENABLED=os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE=int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    # cuerpos comprimidos guardados por ETag para no recomprimirlos (0 deshabilita la caché)
+    COMPRESSION_CACHE_MAX_BYTES=int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # reseñas: tamaño de página por defecto y máximo permitido en las consultas paginadas
+    RESENAS_PAGE_SIZE=int(os.getenv("RESENAS_PAGE_SIZE", "5"))
+    RESENAS_MAX_PAGE_SIZE=int(os.getenv("RESENAS_MAX_PAGE_SIZE", "50"))
+    # reseñas en NDJSON: filas por lote leídas del cursor y emitidas al cliente
+    RESENAS_STREAM_BATCH_SIZE=int(os.getenv("RESENAS_STREAM_BATCH_SIZE", "500"))
+    # búsqueda de texto completo en reseñas con FTS5 (false si SQLite no incluye FTS5)
+    RESENAS_FTS_ENABLED=os.getenv("RESENAS_FTS_ENABLED", "true").lower() == "true"
+    # estadísticas: intervalo en segundos para reconstruir el snapshot (0 lo deshabilita)
+    STATICS_SNAPSHOT_REFRESH_SECONDS=int(os.getenv("STATICS_SNAPSHOT_REFRESH_SECONDS", "900"))
+    # Ruta asíncrona opcional con SQLAlchemy async + aiosqlite
+    ASYNC_DATABASE_ENABLED=os.getenv("ASYNC_DATABASE_ENABLED", "false").lower() == "true"
+    # concurrencia: hilos para ejecutar servicios bloqueantes fuera del event loop
+    BLOCKING_POOL_SIZE=int(os.getenv("BLOCKING_POOL_SIZE", "16"))
+    # pool de procesos para bcrypt (0 workers = un proceso por núcleo)
+    PASSWORD_POOL_ENABLED=os.getenv("PASSWORD_POOL_ENABLED", "true").lower() == "true"
+    PASSWORD_POOL_WORKERS=int(os.getenv("PASSWORD_POOL_WORKERS", "0"))
+    PASSWORD_POOL_QUEUE_SIZE=int(os.getenv("PASSWORD_POOL_QUEUE_SIZE", "32"))
     #admin credentials
     ADMIN_EMAIL=os.getenv("ADMIN_EMAIL")
     ADMIN_NAME=os.getenv("ADMIN_NAME")
@@ -29,6 +83,14 @@ class Config:
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
     FROM_EMAIL = os.getenv("FROM_EMAIL")
     FRONTEND_URL = os.getenv("FRONTEND_URL")
+    # bandeja de salida: el worker revisa los correos pendientes cada OUTBOX_POLL_SECONDS (0 lo deshabilita)
+    OUTBOX_POLL_SECONDS=int(os.getenv("OUTBOX_POLL_SECONDS", "30"))
+    OUTBOX_BATCH_SIZE=int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+    # reintentos con espera exponencial: OUTBOX_BACKOFF_SECONDS * 2^(intento - 1), hasta OUTBOX_MAX_ATTEMPTS
+    OUTBOX_MAX_ATTEMPTS=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+    OUTBOX_BACKOFF_SECONDS=int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+    SMTP_TIMEOUT_SECONDS=int(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    SMTP_STARTTLS=os.getenv("SMTP_STARTTLS", "true").lower() == "true"
 
     
 config = Config()
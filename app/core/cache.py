@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+# Registro de versiones por clave (por ejemplo "test:5"). Los servicios de escritura
+# incrementan la versión después de confirmar sus cambios y las entradas en caché
+# guardadas con una versión anterior dejan de ser válidas.
+_versiones = {}
+_lock = threading.Lock()
+
+
+def get_version(clave: str) -> int:
+    with _lock:
+        return _versiones.get(clave, 0)
+
+
+def bump_version(*claves: str):
+    with _lock:
+        for clave in claves:
+            _versiones[clave] = _versiones.get(clave, 0) + 1
+
+
+# Caché LRU en memoria cuyas entradas se validan contra el registro de versiones.
+class VersionedCache:
+    def __init__(self, nombre: str, max_entries: int = 256):
+        self.nombre = nombre
+        self.max_entries = max_entries
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: str):
+        version = get_version(clave)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == version:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+            return None
+
+    def set(self, clave: str, valor, version: int):
+        with self._lock:
+            self._entradas[clave] = (version, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+
+    # Retorna el valor en caché o lo calcula con `loader`. La versión se lee antes de
+    # cargar: si una escritura la incrementa mientras tanto, la entrada nace obsoleta.
+    def get_or_load(self, clave: str, loader):
+        valor = self.get(clave)
+        if valor is not None:
+            return valor
+        version = get_version(clave)
+        valor = loader()
+        self.set(clave, valor, version)
+        return valor
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "entradas": len(self._entradas),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,286 @@
+import threading
+import zlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..config import config
+from .executor import run_blocking
+from .metrics import registrar_cache
+
+try:
+    import brotli
+except ImportError:
+    # brotli es opcional: sin el paquete solo se ofrece gzip
+    brotli = None
+
+# Compresión de respuestas negociada con Accept-Encoding. Las respuestas completas se
+# comprimen si superan COMPRESSION_MIN_SIZE; las de streaming (CSV, NDJSON) se comprimen
+# bloque a bloque, con un flush por bloque para que el cliente reciba cada uno de inmediato.
+# Los cuerpos con ETag (catálogos, tests, estadísticas) se guardan ya comprimidos, así una
+# respuesta que no cambió no se vuelve a comprimir en cada petición.
+
+GZIP = "gzip"
+BROTLI = "br"
+
+TIPOS_COMPRIMIBLES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Cuerpos desde este tamaño se comprimen en el pool de hilos (zlib y brotli liberan el GIL)
+# para no detener el event loop mientras se comprime
+TAMANO_COMPRESION_EN_HILO = 64 * 1024
+
+
+def codificaciones_disponibles():
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+# Elige la codificación según Accept-Encoding (valores q de RFC 9110). Ante la misma
+# preferencia se usa brotli, que comprime más. Retorna None si no se acepta ninguna.
+def elegir_codificacion(accept_encoding: str):
+    if not accept_encoding:
+        return None
+    preferencias = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametros = parametros.strip().replace(" ", "")
+        if parametros.startswith("q="):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+        preferencias[nombre.strip().lower()] = calidad
+
+    mejor, mejor_calidad = None, 0.0
+    for codificacion in codificaciones_disponibles():
+        calidad = preferencias.get(codificacion, preferencias.get("*", 0.0))
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = codificacion, calidad
+    return mejor
+
+
+def es_comprimible(content_type: str) -> bool:
+    return content_type.lower().startswith(TIPOS_COMPRIMIBLES)
+
+
+class Compresor:
+    def __init__(self, codificacion: str):
+        self.codificacion = codificacion
+        if codificacion == BROTLI:
+            self._brotli = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+            self._zlib = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    # Comprime un bloque y vacía el compresor para que el bloque pueda enviarse ya
+    def bloque(self, datos: bytes) -> bytes:
+        if self.codificacion == BROTLI:
+            return self._brotli.process(datos) + self._brotli.flush()
+        return self._zlib.compress(datos) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self) -> bytes:
+        if self.codificacion == BROTLI:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def comprimir(datos: bytes, codificacion: str) -> bytes:
+    if codificacion == BROTLI:
+        return brotli.compress(datos, quality=config.COMPRESSION_BROTLI_QUALITY)
+    compresor = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compresor.compress(datos) + compresor.flush()
+
+
+# Caché LRU de cuerpos comprimidos, acotada por la suma de bytes guardados. La clave
+# incluye la ruta, la query y el ETag: el ETag fuerte identifica la representación, pero
+# distintas rutas pueden emitir el mismo valor. Un acierto no revisa el cuerpo, así que
+# cada ETag debe cambiar con todo lo que aparece en la respuesta.
+class CacheCompresion:
+    def __init__(self, nombre: str, max_bytes: int):
+        self.nombre = nombre
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave):
+        with self._lock:
+            comprimido = self._entradas.get(clave)
+            if comprimido is not None:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return comprimido
+            self.misses += 1
+            return None
+
+    def set(self, clave, comprimido: bytes):
+        if len(comprimido) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._entradas[clave] = comprimido
+            self._bytes += len(comprimido)
+            while self._bytes > self.max_bytes:
+                _, eliminado = self._entradas.popitem(last=False)
+                self._bytes -= len(eliminado)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def crear_cache_compresion():
+    if config.COMPRESSION_CACHE_MAX_BYTES <= 0:
+        return None
+    return registrar_cache(CacheCompresion("compresion", config.COMPRESSION_CACHE_MAX_BYTES))
+
+
+# Cabeceras modificables del mensaje de inicio (ASGI permite omitir la lista de cabeceras)
+def _cabeceras(mensaje: dict) -> MutableHeaders:
+    mensaje["headers"] = list(mensaje.get("headers", []))
+    return MutableHeaders(raw=mensaje["headers"])
+
+
+# Indica la codificación en la respuesta. El ETag se debilita (W/): la representación
+# comprimida no es idéntica byte a byte, y etag_coincide acepta la forma débil.
+def _marcar_comprimido(inicio: dict, codificacion: str):
+    headers = _cabeceras(inicio)
+    headers["content-encoding"] = codificacion
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+    return headers
+
+
+# Middleware ASGI de compresión. Agrega Vary: Accept-Encoding a todas las respuestas
+# comprimibles, se compriman o no, para que los proxies no mezclen las representaciones.
+class MiddlewareCompresion:
+    def __init__(self, app, cache: CacheCompresion = None):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers_peticion = Headers(scope=scope)
+        codificacion = None
+        if scope.get("method") != "HEAD":
+            codificacion = elegir_codificacion(headers_peticion.get("accept-encoding", ""))
+
+        inicio = None
+        pendiente = bytearray()
+        compresor = None
+        # None: aún no se decide; False: se envía sin comprimir; True: se comprime
+        comprimiendo = None
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor, comprimiendo
+            if mensaje["type"] == "http.response.start":
+                headers = _cabeceras(mensaje)
+                comprimible = (
+                    es_comprimible(headers.get("content-type", ""))
+                    and "content-encoding" not in headers
+                    and mensaje["status"] not in (204, 304)
+                    and mensaje["status"] >= 200
+                )
+                if comprimible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not comprimible or codificacion is None:
+                    comprimiendo = False
+                    await send(mensaje)
+                    return
+                # Se retiene el inicio hasta saber si el cuerpo alcanza el tamaño mínimo
+                inicio = mensaje
+                return
+
+            if mensaje["type"] != "http.response.body" or comprimiendo is False:
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if comprimiendo:
+                datos = compresor.bloque(cuerpo) if cuerpo else b""
+                if not mas:
+                    datos += compresor.finalizar()
+                if datos or not mas:
+                    await send({"type": "http.response.body", "body": datos, "more_body": mas})
+                return
+
+            pendiente.extend(cuerpo)
+            if not mas:
+                # Respuesta completa: se comprime de una vez (o se toma de la caché)
+                if len(pendiente) < config.COMPRESSION_MIN_SIZE:
+                    comprimiendo = False
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": bytes(pendiente)})
+                    return
+                comprimiendo = True
+                datos = await self._comprimir_completo(scope, inicio, bytes(pendiente), codificacion)
+                headers = _marcar_comprimido(inicio, codificacion)
+                headers["content-length"] = str(len(datos))
+                await send(inicio)
+                await send({"type": "http.response.body", "body": datos})
+                return
+
+            if len(pendiente) >= config.COMPRESSION_MIN_SIZE:
+                # Streaming: se comprime bloque a bloque sin conocer el tamaño total
+                comprimiendo = True
+                compresor = Compresor(codificacion)
+                headers = _marcar_comprimido(inicio, codificacion)
+                del headers["content-length"]
+                await send(inicio)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": compresor.bloque(bytes(pendiente)),
+                        "more_body": True,
+                    }
+                )
+                pendiente.clear()
+
+        await self.app(scope, receive, enviar)
+
+    async def _comprimir_completo(self, scope, inicio, cuerpo: bytes, codificacion: str) -> bytes:
+        en_hilo = len(cuerpo) >= TAMANO_COMPRESION_EN_HILO
+        etag = _cabeceras(inicio).get("etag")
+        clave = None
+        # Solo un ETag fuerte garantiza el mismo cuerpo byte a byte
+        fuerte = etag and not etag.startswith("W/")
+        if self.cache is not None and fuerte and inicio["status"] == 200 and scope["method"] == "GET":
+            clave = (scope["path"], scope.get("query_string", b""), etag, codificacion)
+            datos = self.cache.get(clave)
+            if datos is not None:
+                return datos
+
+        if en_hilo:
+            datos = await run_blocking(comprimir, cuerpo, codificacion)
+        else:
+            datos = comprimir(cuerpo, codificacion)
+        if clave is not None:
+            self.cache.set(clave, datos)
+        return datos
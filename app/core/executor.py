@@ -0,0 +1,60 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import config
+
+# Pool acotado de hilos donde se ejecutan los servicios bloqueantes (SQLAlchemy síncrono,
+# bcrypt, SMTP) para que las rutas async no detengan el event loop de uvicorn.
+_executor = None
+_lock = threading.Lock()
+_en_curso = 0
+
+
+# Retorna el pool de hilos, creándolo si aún no existe (o si fue liberado).
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.BLOCKING_POOL_SIZE, thread_name_prefix="servicios"
+            )
+        return _executor
+
+
+# Ejecuta una función bloqueante en el pool y espera su resultado sin bloquear el loop.
+# Se copia el contexto actual para que las variables de contexto lleguen al hilo.
+async def run_blocking(func, *args, **kwargs):
+    global _en_curso
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+
+    executor = get_executor()
+    with _lock:
+        _en_curso += 1
+    try:
+        return await loop.run_in_executor(executor, call)
+    finally:
+        with _lock:
+            _en_curso -= 1
+
+
+# Retorna el estado actual del pool (tamaño, tareas en curso y tareas en espera).
+def get_executor_stats():
+    return {
+        "workers": config.BLOCKING_POOL_SIZE,
+        "en_curso": _en_curso,
+        "en_cola": _executor._work_queue.qsize() if _executor is not None else 0,
+    }
+
+
+# Libera los hilos del pool al detener la aplicación.
+def shutdown_executor():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
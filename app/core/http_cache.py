@@ -0,0 +1,48 @@
+import secrets
+from fastapi import Request, Response
+from ..config import config
+from .cache import get_version
+
+# GET condicional (ETag / If-None-Match) basado en el registro de versiones de la caché.
+# Las versiones viven en memoria y reinician en cada arranque, por eso el ETag incluye
+# un identificador del proceso: un ETag emitido antes de reiniciar nunca vuelve a coincidir.
+_EPOCA = secrets.token_hex(4)
+
+
+# ETag fuerte a partir de las versiones actuales de las claves indicadas. Debe calcularse
+# antes de consultar la base: una escritura concurrente deja el ETag obsoleto, nunca el cuerpo.
+def calcular_etag(*claves: str) -> str:
+    versiones = ".".join(str(get_version(clave)) for clave in claves)
+    return f'"{_EPOCA}-{versiones}"'
+
+
+# Indica si el cliente ya tiene la representación actual (comparación débil, RFC 9110)
+def etag_coincide(request: Request, etag: str) -> bool:
+    valor = request.headers.get("if-none-match")
+    if not valor:
+        return False
+    candidatos = [candidato.strip() for candidato in valor.split(",")]
+    return "*" in candidatos or etag in candidatos or f"W/{etag}" in candidatos
+
+
+# ETag de un contenido identificado por su fecha de actualización (snapshot de estadísticas).
+# Las claves opcionales agregan las versiones de los catálogos cuyos datos también forman
+# parte del cuerpo (por ejemplo, los nombres de ciudades), que no cambian la fecha.
+def calcular_etag_fecha(fecha, *claves: str) -> str:
+    etag = f"{int(fecha.timestamp() * 1_000_000):x}"
+    if claves:
+        etag += "-" + calcular_etag(*claves).strip('"')
+    return f'"{etag}"'
+
+
+def cabeceras_cache(etag: str, privado: bool = False) -> dict:
+    alcance = "private" if privado else "public"
+    return {
+        "ETag": etag,
+        "Cache-Control": f"{alcance}, max-age={config.CATALOG_CACHE_MAX_AGE}, must-revalidate",
+    }
+
+
+# Respuesta 304 sin cuerpo; no se consulta la base de datos
+def respuesta_no_modificada(etag: str, privado: bool = False) -> Response:
+    return Response(status_code=304, headers=cabeceras_cache(etag, privado))
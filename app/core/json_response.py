@@ -0,0 +1,22 @@
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+# Respuestas JSON serializadas con orjson. ORJSONResponse es la clase por defecto de la
+# aplicación, pero FastAPI igual recorre con jsonable_encoder todo lo que retorna una ruta;
+# en listados grandes ese recorrido cuesta más que la consulta. Las rutas con listados
+# grandes retornan respuesta_json(...), que serializa directamente los dicts del servicio
+# (orjson convierte fechas y datetimes con el mismo formato ISO 8601 que jsonable_encoder).
+
+
+# Respuesta JSON ya serializada. `http_response` es el Response que FastAPI inyecta en la
+# ruta: sus cabeceras (ETag, cursor, fecha del snapshot) se copian a la respuesta, porque
+# FastAPI solo las agrega cuando la ruta no retorna un Response propio.
+def respuesta_json(contenido, http_response: Response = None, status_code: int = 200):
+    respuesta = ORJSONResponse(contenido, status_code=status_code)
+    if http_response is not None:
+        respuesta.headers.raw.extend(
+            (nombre, valor)
+            for nombre, valor in http_response.headers.raw
+            if nombre != b"content-length"
+        )
+    return respuesta
@@ -0,0 +1,329 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from .executor import get_executor_stats
+from .password_pool import get_password_pool_stats
+
+# Métricas de la API en formato de texto de Prometheus (sin dependencias externas).
+# Los contadores e histogramas se actualizan en memoria y los medidores (pool de hilos,
+# pool de hashing, cachés y conexiones) se calculan al momento de exportar.
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites de los histogramas en segundos (los mismos que usan los clientes de Prometheus)
+LIMITES_POR_DEFECTO = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+# Peticiones que no coinciden con ninguna ruta: se agrupan para no crear una serie por URL
+RUTA_DESCONOCIDA = "sin_ruta"
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatear_etiquetas(etiquetas: dict) -> str:
+    if not etiquetas:
+        return ""
+    pares = ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in etiquetas.items())
+    return "{" + pares + "}"
+
+
+def _formatear_valor(valor) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+
+    def valor(self, *valores_etiquetas):
+        with self._lock:
+            return self._valores.get(valores_etiquetas, 0)
+
+    def muestras(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        return [
+            (self.nombre, dict(zip(self.etiquetas, claves)), valor) for claves, valor in valores
+        ]
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=(), limites=LIMITES_POR_DEFECTO):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(sorted(limites))
+        # Por serie: [conteos por límite (no acumulados), suma, total]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = [[0] * len(self.limites), 0.0, 0]
+            for indice, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[0][indice] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            return serie[2] if serie else 0
+
+    def muestras(self):
+        with self._lock:
+            series = [
+                (claves, list(serie[0]), serie[1], serie[2])
+                for claves, serie in self._series.items()
+            ]
+        resultado = []
+        for claves, conteos, suma, total in series:
+            etiquetas = dict(zip(self.etiquetas, claves))
+            acumulado = 0
+            for limite, conteo in zip(self.limites, conteos):
+                acumulado += conteo
+                le = _formatear_valor(float(limite))
+                resultado.append((f"{self.nombre}_bucket", {**etiquetas, "le": le}, acumulado))
+            resultado.append((f"{self.nombre}_bucket", {**etiquetas, "le": "+Inf"}, total))
+            resultado.append((f"{self.nombre}_sum", etiquetas, suma))
+            resultado.append((f"{self.nombre}_count", etiquetas, total))
+        return resultado
+
+
+# Medidor calculado al exportar: `funcion` retorna una lista de (valores_etiquetas, valor)
+class Medidor:
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, funcion, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.funcion = funcion
+
+    def muestras(self):
+        return [
+            (self.nombre, dict(zip(self.etiquetas, claves)), valor)
+            for claves, valor in self.funcion()
+        ]
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    # Registra la métrica; si ya existe una con el mismo nombre se reemplaza
+    def registrar(self, metrica):
+        with self._lock:
+            self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    # Texto en el formato de exposición de Prometheus (versión 0.0.4)
+    def exportar(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        lineas = []
+        for metrica in metricas:
+            try:
+                muestras = metrica.muestras()
+            except Exception as ex:
+                # Un medidor que falla no debe impedir exportar el resto
+                print(f"Error al calcular la métrica {metrica.nombre}: {ex}")
+                continue
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            for nombre, etiquetas, valor in muestras:
+                lineas.append(
+                    f"{nombre}{_formatear_etiquetas(etiquetas)} {_formatear_valor(valor)}"
+                )
+        return "\n".join(lineas) + "\n"
+
+
+registro = RegistroMetricas()
+
+# Peticiones HTTP por ruta (plantilla de la ruta, no la URL con sus parámetros)
+PETICIONES_HTTP = registro.registrar(
+    Contador("http_requests_total", "Peticiones HTTP atendidas.", ("metodo", "ruta", "estado"))
+)
+DURACION_HTTP = registro.registrar(
+    Histograma(
+        "http_request_duration_seconds", "Duración de las peticiones HTTP.", ("metodo", "ruta")
+    )
+)
+
+# Consultas SQL ejecutadas por el engine y espera por una conexión del pool
+CONSULTAS_DB = registro.registrar(
+    Contador("db_queries_total", "Consultas SQL ejecutadas.", ("operacion",))
+)
+DURACION_CONSULTAS_DB = registro.registrar(
+    Histograma("db_query_duration_seconds", "Duración de las consultas SQL.", ("operacion",))
+)
+ESPERA_CONEXION_DB = registro.registrar(
+    Histograma(
+        "db_pool_checkout_wait_seconds",
+        "Tiempo de espera para obtener una conexión del pool.",
+        limites=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+    )
+)
+
+
+# Pool de hilos de los servicios bloqueantes
+def _estado_executor():
+    estado = get_executor_stats()
+    return [((clave,), estado[clave]) for clave in ("workers", "en_curso", "en_cola")]
+
+
+registro.registrar(
+    Medidor(
+        "executor_threads",
+        "Estado del pool de hilos de los servicios.",
+        _estado_executor,
+        ("estado",),
+    )
+)
+
+
+# Pool de procesos de hashing de contraseñas
+def _estado_password_pool():
+    estado = get_password_pool_stats()
+    return [((clave,), valor) for clave, valor in estado.items()]
+
+
+registro.registrar(
+    Medidor(
+        "password_pool",
+        "Estado del pool de hashing de contraseñas.",
+        _estado_password_pool,
+        ("estado",),
+    )
+)
+
+
+# Cachés en memoria (VersionedCache, TokenCache): cualquier objeto con stats()
+_caches = []
+
+
+def registrar_cache(cache):
+    _caches.append(cache)
+    return cache
+
+
+def _estadisticas_caches(campo: str):
+    def calcular():
+        resultado = []
+        for cache in list(_caches):
+            stats = cache.stats()
+            if campo == "hit_ratio":
+                consultas = stats["hits"] + stats["misses"]
+                valor = stats["hits"] / consultas if consultas else 0.0
+            else:
+                valor = stats[campo]
+            resultado.append(((stats["nombre"],), valor))
+        return resultado
+
+    return calcular
+
+
+for _nombre, _campo, _ayuda in (
+    ("cache_hits", "hits", "Aciertos de las cachés en memoria."),
+    ("cache_misses", "misses", "Fallos de las cachés en memoria."),
+    ("cache_entries", "entradas", "Entradas guardadas en las cachés."),
+    ("cache_hit_ratio", "hit_ratio", "Proporción de aciertos de las cachés."),
+):
+    registro.registrar(Medidor(_nombre, _ayuda, _estadisticas_caches(_campo), ("cache",)))
+
+
+# Tipo de sentencia usado como etiqueta (SELECT, INSERT, UPDATE, DELETE u OTRA)
+def _operacion_sql(statement: str) -> str:
+    palabra = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if palabra == "WITH":
+        return "SELECT"
+    return palabra if palabra in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTRA"
+
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metricas_inicio = time.perf_counter()
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_metricas_inicio", None)
+    if inicio is None:
+        return
+    operacion = _operacion_sql(statement)
+    CONSULTAS_DB.inc(operacion)
+    DURACION_CONSULTAS_DB.observar(time.perf_counter() - inicio, operacion)
+
+
+# Mide las consultas del engine y publica el estado de su pool de conexiones
+def instrumentar_engine(engine):
+    event.listen(engine, "before_cursor_execute", _antes_de_consulta)
+    event.listen(engine, "after_cursor_execute", _despues_de_consulta)
+
+    def estado_pool():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return []
+        return [(("en_uso",), pool.checkedout()), (("tamano",), pool.size())]
+
+    registro.registrar(
+        Medidor("db_pool_connections", "Estado del pool de conexiones.", estado_pool, ("estado",))
+    )
+
+
+def observar_espera_conexion(segundos: float):
+    ESPERA_CONEXION_DB.observar(segundos)
+
+
+# Middleware ASGI que registra cantidad y duración de las peticiones por ruta. La ruta se
+# obtiene después de atender la petición, cuando el router ya la dejó en el scope.
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            ruta = getattr(scope.get("route"), "path", None) or RUTA_DESCONOCIDA
+            metodo = scope.get("method", "")
+            PETICIONES_HTTP.inc(metodo, ruta, str(estado))
+            DURACION_HTTP.observar(time.perf_counter() - inicio, metodo, ruta)
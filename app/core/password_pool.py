@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from ..config import config
+
+# Crea el contexto de hashing con el costo configurado. Los hashes con un costo distinto
+# siguen siendo válidos, pero needs_update los marca para recalcularlos.
+def crear_contexto_hashing(rounds=None):
+    rounds = rounds or config.HASHING_BCRYPT_ROUNDS
+    opciones = {}
+    if config.HASHING_SCHEMES == "bcrypt":
+        opciones = {
+            "bcrypt__default_rounds": rounds,
+            "bcrypt__min_rounds": rounds,
+            "bcrypt__max_rounds": rounds,
+        }
+    return CryptContext(
+        schemes=[config.HASHING_SCHEMES], deprecated=config.HASHING_DEPRECATED, **opciones
+    )
+
+
+# Configuración del hashing (compartida por la API y los procesos del pool)
+pwd_context = crear_contexto_hashing()
+
+
+# Funciones ejecutadas dentro de los procesos del pool
+def _hash_password(password):
+    return pwd_context.hash(password)
+
+
+def _verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+# Pool de procesos dedicado a bcrypt: cada hash consume CPU durante cientos de milisegundos,
+# así que se reparte entre los núcleos disponibles y con un límite de solicitudes en vuelo.
+_workers = config.PASSWORD_POOL_WORKERS or os.cpu_count() or 1
+_capacidad = threading.BoundedSemaphore(_workers + config.PASSWORD_POOL_QUEUE_SIZE)
+_pool = None
+_lock = threading.Lock()
+_metricas = {
+    "en_curso": 0, "completadas": 0, "fallidas": 0, "rechazadas": 0, "segundos_totales": 0.0
+}
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # "spawn" evita heredar los hilos y conexiones abiertas del proceso de la API
+            _pool = ProcessPoolExecutor(
+                max_workers=_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+# Ejecuta una operación de hashing en el pool. Si ya hay demasiadas operaciones en vuelo
+# se rechaza de inmediato con 429 en lugar de acumular espera.
+def ejecutar_hashing(func, *args):
+    if not _capacidad.acquire(blocking=False):
+        with _lock:
+            _metricas["rechazadas"] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="El servicio de autenticación está saturado. Intente de nuevo en unos segundos.",
+            headers={"Retry-After": "1"},
+        )
+
+    inicio = time.perf_counter()
+    resultado = "fallidas"
+    with _lock:
+        _metricas["en_curso"] += 1
+    try:
+        if not config.PASSWORD_POOL_ENABLED:
+            valor = func(*args)
+        else:
+            valor = _get_pool().submit(func, *args).result()
+        resultado = "completadas"
+        return valor
+    finally:
+        with _lock:
+            _metricas["en_curso"] -= 1
+            _metricas[resultado] += 1
+            _metricas["segundos_totales"] += time.perf_counter() - inicio
+        _capacidad.release()
+
+
+def hash_password(password):
+    return ejecutar_hashing(_hash_password, password)
+
+
+def verify_password_hash(plain_password, hashed_password):
+    return ejecutar_hashing(_verify_password, plain_password, hashed_password)
+
+
+# Indica si el hash fue generado con un esquema o costo distinto al configurado.
+# Solo analiza el hash, por lo que no necesita pasar por el pool.
+def password_hash_needs_update(hashed_password):
+    return pwd_context.needs_update(hashed_password)
+
+
+# Retorna las métricas del pool de hashing.
+def get_password_pool_stats():
+    with _lock:
+        return {
+            "workers": _workers,
+            "capacidad": _workers + config.PASSWORD_POOL_QUEUE_SIZE,
+            **_metricas,
+        }
+
+
+# Libera los procesos del pool al detener la aplicación.
+def shutdown_password_pool():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
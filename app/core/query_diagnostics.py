@@ -0,0 +1,169 @@
+import contextvars
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import event
+
+from ..config import config
+
+# Diagnóstico de consultas SQL: registro de consultas lentas y conteo de consultas por
+# petición. El diagnóstico de la petición viaja en una variable de contexto, que
+# run_blocking copia al hilo donde se ejecuta el servicio, así las consultas hechas
+# en el pool de hilos se atribuyen a la petición que las originó.
+
+_diagnostico_actual = contextvars.ContextVar("diagnostico_consultas", default=None)
+
+# Tablas cuyos parámetros no se escriben en el registro de consultas lentas (contraseñas,
+# hashes, correos electrónicos y cuerpos de la bandeja de salida)
+_TABLAS_SENSIBLES = re.compile(r"\b(usuarios|correos_salientes)\b", re.IGNORECASE)
+
+# Presupuestos de consultas por ruta (plantilla de la ruta); el resto usa QUERY_BUDGET_DEFAULT
+_presupuestos = {}
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    pass
+
+
+class DiagnosticoConsultas:
+    def __init__(self, ruta: str, presupuesto: int = 0):
+        self.ruta = ruta
+        self.presupuesto = presupuesto
+        self.total = 0
+        self.segundos = 0.0
+        self.sentencias = Counter()
+
+    def registrar(self, statement: str, segundos: float):
+        self.total += 1
+        self.segundos += segundos
+        self.sentencias[statement] += 1
+
+    # Sentencias idénticas repetidas dentro de la petición (probable N+1)
+    def repetidas(self, umbral: int = None):
+        umbral = umbral or config.QUERY_N_PLUS_ONE_THRESHOLD
+        return [(sql, veces) for sql, veces in self.sentencias.most_common() if veces >= umbral]
+
+    def excede_presupuesto(self) -> bool:
+        return self.presupuesto > 0 and self.total > self.presupuesto
+
+
+def _resumir(valor, largo: int = 300) -> str:
+    texto = " ".join(str(valor).split())
+    return texto if len(texto) <= largo else texto[:largo] + "..."
+
+
+def definir_presupuesto_consultas(ruta: str, maximo: int):
+    _presupuestos[ruta] = maximo
+
+
+def obtener_presupuesto_consultas(ruta: str) -> int:
+    return _presupuestos.get(ruta, config.QUERY_BUDGET_DEFAULT)
+
+
+def diagnostico_actual():
+    return _diagnostico_actual.get()
+
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._diagnostico_inicio = time.perf_counter()
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_diagnostico_inicio", None)
+    if inicio is None:
+        return
+    segundos = time.perf_counter() - inicio
+
+    diagnostico = _diagnostico_actual.get()
+    if diagnostico is not None:
+        diagnostico.registrar(statement, segundos)
+
+    if config.SLOW_QUERY_MS > 0 and segundos * 1000 >= config.SLOW_QUERY_MS:
+        ruta = f" en {diagnostico.ruta}" if diagnostico is not None else ""
+        if _TABLAS_SENSIBLES.search(statement):
+            parametros = "(omitidos: tabla con datos sensibles)"
+        elif executemany:
+            # Solo las primeras filas: la lista completa puede tener cientos de miles
+            parametros = f"{len(parameters)} filas, primeras: {_resumir(list(parameters[:3]))}"
+        else:
+            parametros = _resumir(parameters)
+        print(
+            f"Consulta lenta ({segundos * 1000:.1f} ms){ruta}: {_resumir(statement)} "
+            f"-- parámetros: {parametros}"
+        )
+
+
+# Registra los eventos del engine para medir cada consulta
+def instrumentar_diagnostico(engine):
+    event.listen(engine, "before_cursor_execute", _antes_de_consulta)
+    event.listen(engine, "after_cursor_execute", _despues_de_consulta)
+
+
+# Informa las sentencias repetidas y el presupuesto excedido. Con QUERY_BUDGET_STRICT
+# el exceso lanza PresupuestoConsultasExcedido para que falle la prueba que lo provocó.
+def reportar_diagnostico(diagnostico: DiagnosticoConsultas):
+    for sql, veces in diagnostico.repetidas():
+        print(
+            f"Posible N+1 en {diagnostico.ruta}: {veces} ejecuciones de la misma consulta: "
+            f"{_resumir(sql)}"
+        )
+    if diagnostico.excede_presupuesto():
+        mensaje = (
+            f"{diagnostico.ruta} ejecutó {diagnostico.total} consultas "
+            f"(presupuesto: {diagnostico.presupuesto})."
+        )
+        if config.QUERY_BUDGET_STRICT:
+            raise PresupuestoConsultasExcedido(mensaje)
+        print(f"Presupuesto de consultas excedido: {mensaje}")
+
+
+# Cuenta las consultas ejecutadas dentro del bloque. Con `maximo` falla si se excede:
+#     with presupuesto_consultas(3):
+#         list_respuestas_usuario(1, usuario)
+@contextmanager
+def presupuesto_consultas(maximo: int = 0, ruta: str = "bloque"):
+    diagnostico = DiagnosticoConsultas(ruta, maximo)
+    token = _diagnostico_actual.set(diagnostico)
+    try:
+        yield diagnostico
+    finally:
+        _diagnostico_actual.reset(token)
+    if diagnostico.excede_presupuesto():
+        raise PresupuestoConsultasExcedido(
+            f"{ruta} ejecutó {diagnostico.total} consultas (presupuesto: {maximo})."
+        )
+
+
+# Middleware ASGI que abre un diagnóstico por petición. Agrega la cabecera X-Query-Count
+# (consultas hechas antes de enviar la respuesta) y reporta N+1 y presupuesto al terminar.
+class MiddlewareDiagnosticoConsultas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        diagnostico = DiagnosticoConsultas(scope.get("path", ""))
+        token = _diagnostico_actual.set(diagnostico)
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                cabeceras = list(mensaje.get("headers", []))
+                cabeceras.append((b"x-query-count", str(diagnostico.total).encode()))
+                mensaje = {**mensaje, "headers": cabeceras}
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _diagnostico_actual.reset(token)
+        # El router deja la ruta en el scope: se usa su plantilla para agrupar y presupuestar
+        ruta = getattr(scope.get("route"), "path", None)
+        if ruta:
+            diagnostico.ruta = ruta
+            diagnostico.presupuesto = obtener_presupuesto_consultas(ruta)
+        reportar_diagnostico(diagnostico)
@@ -0,0 +1,59 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# Caché LRU de tokens JWT ya verificados. La clave es el SHA-256 del token (el token no
+# se guarda en memoria) y cada entrada vence en el `exp` del propio token, de modo que
+# un token expirado siempre vuelve a decodificarse y se rechaza como antes.
+
+
+class TokenCache:
+    def __init__(self, nombre: str, max_entries: int = 4096):
+        self.nombre = nombre
+        self.max_entries = max_entries
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _clave(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        clave = self._clave(token)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if entrada[0] > time.time():
+                    self._entradas.move_to_end(clave)
+                    self.hits += 1
+                    return entrada[1]
+                del self._entradas[clave]
+            self.misses += 1
+            return None
+
+    # Guarda los datos del token hasta `expira` (segundos desde epoch, el claim exp)
+    def set(self, token: str, datos: dict, expira: float):
+        if self.max_entries <= 0 or expira <= time.time():
+            return
+        clave = self._clave(token)
+        with self._lock:
+            self._entradas[clave] = (expira, datos)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "entradas": len(self._entradas),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from ..config import config
+from .database import PERFIL_TUNED, aplicar_pragmas_sqlite
+
+# Ruta asíncrona opcional (ASYNC_DATABASE_ENABLED=true): usa el driver aiosqlite para
+# consultar la base de datos directamente desde el event loop, sin ocupar hilos del pool.
+async_engine = None
+AsyncSessionLocal = None
+
+
+def get_async_database_url(url: str) -> str:
+    # Convierte la URL síncrona de SQLite en su equivalente con el driver aiosqlite
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+if config.ASYNC_DATABASE_ENABLED:
+    async_engine = create_async_engine(get_async_database_url(config.DATABASE_URL))
+    if config.SQLITE_PROFILE == PERFIL_TUNED:
+        event.listen(async_engine.sync_engine, "connect", aplicar_pragmas_sqlite)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+# Crea y retorna una sesión asíncrona de base de datos, asegurando su cierre.
+async def get_async_db_session():
+    if AsyncSessionLocal is None:
+        raise RuntimeError(
+            "La ruta asíncrona está deshabilitada. Defina ASYNC_DATABASE_ENABLED=true."
+        )
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -1,10 +1,129 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.pool import QueuePool
 from ..config import config
+from ..core.metrics import instrumentar_engine, observar_espera_conexion
+from ..core.query_diagnostics import instrumentar_diagnostico
+
+# Perfiles disponibles para el engine de SQLite
+PERFIL_TUNED = "tuned"
+PERFIL_DEFAULT = "default"
+
+
+# Indica si la URL apunta a un archivo SQLite (no a una base de datos en memoria)
+def es_sqlite_en_archivo(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+# Aplica los pragmas del perfil "tuned" a cada conexión nueva.
+def aplicar_pragmas_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL permite lectores concurrentes mientras un escritor confirma cambios
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+        # Un valor negativo expresa el tamaño de la caché en KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+# QueuePool que mide cuánto espera cada sesión hasta obtener una conexión
+class QueuePoolConMetricas(QueuePool):
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observar_espera_conexion(time.perf_counter() - inicio)
+
+
+# Crea el engine según el perfil configurado.
+def create_database_engine(url=None, profile=None):
+    url = url or config.DATABASE_URL
+    profile = profile or config.SQLITE_PROFILE
+    options = {}
+
+    if profile == PERFIL_TUNED and es_sqlite_en_archivo(url):
+        # Conexiones lectoras reutilizables; el escritor único se controla en la sesión
+        options.update(
+            poolclass=QueuePoolConMetricas if config.METRICS_ENABLED else QueuePool,
+            pool_size=config.SQLITE_POOL_SIZE,
+            max_overflow=config.SQLITE_MAX_OVERFLOW,
+            pool_timeout=config.SQLITE_POOL_TIMEOUT,
+            pool_pre_ping=False,
+        )
+
+    new_engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+    if profile == PERFIL_TUNED:
+        event.listen(new_engine, "connect", aplicar_pragmas_sqlite)
+    if config.METRICS_ENABLED:
+        instrumentar_engine(new_engine)
+    if config.SLOW_QUERY_MS > 0 or config.QUERY_DIAGNOSTICS_ENABLED:
+        instrumentar_diagnostico(new_engine)
+    return new_engine
+
+
+# Escritor único: SQLite admite un solo escritor a la vez, así que las sesiones del proceso
+# esperan su turno aquí en lugar de competir por el bloqueo del archivo.
+_writer_lock = threading.Lock()
+
+
+def _tomar_escritor(session):
+    if session.info.get("escritor"):
+        return
+    # Si no se obtiene a tiempo se continúa y SQLite aplica busy_timeout por su cuenta
+    timeout = config.SQLITE_BUSY_TIMEOUT_MS / 1000
+    session.info["escritor"] = _writer_lock.acquire(timeout=timeout)
+
+
+def _adquirir_escritor(session, flush_context, instances):
+    _tomar_escritor(session)
+
+
+# Indica si la sentencia escribe: INSERT/UPDATE/DELETE masivos (Query.update, insert(...))
+# o texto SQL que no es una consulta de lectura
+def _es_escritura(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        return True
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        return not statement.text.lstrip().upper().startswith(("SELECT", "WITH", "PRAGMA"))
+    return False
+
+
+# Las escrituras masivas no pasan por el flush, así que toman el escritor al ejecutarse
+def _adquirir_escritor_en_sentencia(orm_execute_state):
+    if _es_escritura(orm_execute_state):
+        _tomar_escritor(orm_execute_state.session)
+
+
+def _liberar_escritor(session, transaction):
+    # Solo al terminar la transacción principal (commit, rollback o close)
+    if transaction.parent is None and session.info.pop("escritor", False):
+        _writer_lock.release()
+
+
+def registrar_escritor_unico(session_factory):
+    event.listen(session_factory, "before_flush", _adquirir_escritor)
+    event.listen(session_factory, "do_orm_execute", _adquirir_escritor_en_sentencia)
+    event.listen(session_factory, "after_transaction_end", _liberar_escritor)
+
 
 # Creación del engine y sesión
-engine = create_engine(config.DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_database_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if config.SQLITE_PROFILE == PERFIL_TUNED:
+    registrar_escritor_unico(SessionLocal)
 
 # Crea y retorna una sesión de base de datos, asegurando su cierre.
 def get_db_session():
@@ -12,4 +131,4 @@ def get_db_session():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,71 @@
+# Depura las respuestas de usuario duplicadas (la misma pregunta respondida varias veces por
+# un usuario), que impiden crear el índice único uq_respuestas_usuario_usuario_pregunta.
+# Conserva la respuesta más reciente de cada pregunta, crea el índice y recalcula el progreso
+# y la vocación de los usuarios afectados: python -m app.db.depurar_respuestas_duplicadas
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
+from ..services.progreso_test_service import reconstruir_progreso_tests
+from ..services.vocacion_usuario_service import create_or_update_vocacion_usuario_service
+from .database import engine, get_db_session
+
+INDICE_UNICO = "uq_respuestas_usuario_usuario_pregunta"
+
+# Filas que sobran: todas menos la de mayor id por (usuario, pregunta)
+_DUPLICADAS = (
+    "FROM respuestas_de_usuario WHERE id NOT IN "
+    "(SELECT MAX(id) FROM respuestas_de_usuario GROUP BY usuario_id, pregunta_id)"
+)
+
+
+# Elimina los duplicados y crea el índice único en la transacción de `connection`.
+# Retorna la cantidad de filas eliminadas y los pares (usuario_id, test_id) afectados.
+def eliminar_respuestas_duplicadas(connection):
+    afectados = {
+        (fila.usuario_id, fila.test_id)
+        for fila in connection.execute(text(f"SELECT DISTINCT usuario_id, test_id {_DUPLICADAS}"))
+    }
+    eliminadas = connection.execute(text(f"DELETE {_DUPLICADAS}")).rowcount
+
+    indice = next(i for i in RespuestaDeUsuario.__table__.indexes if i.name == INDICE_UNICO)
+    indice.create(bind=connection, checkfirst=True)
+    return eliminadas, afectados
+
+
+# Recalcula la vocación de cada usuario afectado; los tests que quedaron incompletos
+# conservan la vocación anterior y se informan para revisarlos.
+def recalcular_vocaciones(afectados):
+    recalculadas = 0
+    for usuario_id, test_id in sorted(afectados):
+        try:
+            create_or_update_vocacion_usuario_service(test_id, {"user_id": usuario_id})
+            recalculadas += 1
+        except HTTPException as ex:
+            print(f"No se recalculó la vocación del usuario {usuario_id} en el test {test_id}: {ex.detail}")
+    return recalculadas
+
+
+def depurar_respuestas_duplicadas():
+    with engine.begin() as connection:
+        eliminadas, afectados = eliminar_respuestas_duplicadas(connection)
+    print(f"Se eliminaron {eliminadas} respuestas duplicadas; índice '{INDICE_UNICO}' creado.")
+    if not eliminadas:
+        return
+
+    db = next(get_db_session())
+    try:
+        reconstruir_progreso_tests(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    recalculadas = recalcular_vocaciones(afectados)
+    print(f"Vocaciones recalculadas: {recalculadas} de {len(afectados)} tests afectados.")
+
+
+if __name__ == "__main__":
+    depurar_respuestas_duplicadas()
@@ -0,0 +1,8 @@
+# Reconstruye el índice de búsqueda de texto completo de reseñas a partir de los datos
+# existentes: python -m app.db.reindexar_resenas
+from ..services.busqueda_resenas_service import refrescar_indice_resenas
+
+
+if __name__ == "__main__":
+    total = refrescar_indice_resenas()
+    print(f"Índice de búsqueda de reseñas reconstruido ({total} reseñas).")
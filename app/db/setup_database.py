@@ -3,11 +3,16 @@ import os
 from datetime import datetime, timezone
 from sqlalchemy import inspect, text
 from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
 from sqlalchemy.schema import DropTable
 from sqlalchemy.ext.compiler import compiles
 
 # Importar servicios y configuraciones
 from ..services.auth_service import get_password_hash
+from ..services.progreso_test_service import reconstruir_progreso_tests
+from ..services.estadisticas_snapshot_service import refrescar_snapshot_estadisticas
+from ..services.resumen_resenas_service import refrescar_resumen_resenas
+from ..services.busqueda_resenas_service import es_tabla_fts, refrescar_indice_resenas
 from ..config import config
 
 # Importar modelos
@@ -22,6 +27,10 @@ from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
 from ..schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
 from ..schemas.sch_resena import Resena
 from ..schemas.sch_recurso import Recurso
+from ..schemas.sch_progreso import ProgresoTestUsuario
+from ..schemas.sch_estadistica import EstadisticaSnapshot, EstadisticaVocacion
+from ..schemas.sch_resumen_resena import ResumenResenas
+from ..schemas.sch_correo import CorreoSaliente
 
 # Importar configuración de la base de datos
 from .database import engine, get_db_session
@@ -48,6 +57,18 @@ def initialize_database():
     # Insertar datos iniciales
     insert_initial_data()
 
+    # Calcular el progreso de los usuarios si la tabla se acaba de crear
+    sync_progreso_tests()
+
+    # Recalcular el snapshot de estadísticas con los datos actuales
+    sync_estadisticas_snapshot()
+
+    # Recalcular el resumen de puntuaciones de reseñas
+    sync_resumen_resenas()
+
+    # Crear o reconstruir el índice de búsqueda de reseñas
+    sync_indice_busqueda_resenas()
+
 
 def create_schema():
     # Crea el esquema inicial de la base de datos.
@@ -63,8 +84,9 @@ def sync_schema():
     existing_tables = inspector.get_table_names()
 
     # Eliminar tablas que no están en los modelos
+    # (el índice FTS5 de reseñas no es un modelo y se administra aparte)
     for table_name in existing_tables:
-        if table_name not in Base.metadata.tables:
+        if table_name not in Base.metadata.tables and not es_tabla_fts(table_name):
             print(f"Tabla '{table_name}' no está en los modelos. Eliminándola...")
             with engine.connect() as connection:
                 connection.execute(DropTable(Base.metadata.tables.get(table_name)))
@@ -97,6 +119,10 @@ def sync_schema():
                         )
                         alter_table_add_column(connection, table_name, column)
 
+    # Sincronizar índices en una transacción propia
+    with engine.begin() as connection:
+        sync_indexes(connection)
+
 
 def alter_table_add_column(connection, table_name, column):
     # Agrega una columna a una tabla existente.
@@ -118,9 +144,55 @@ def alter_table_add_column(connection, table_name, column):
         )
 
 
-def insert_initial_data():
+def sync_indexes(connection):
+    # Sincroniza los índices declarados en los modelos:
+    # Elimina los índices que ya no están definidos y crea los que faltan.
+    # Un índice único no se crea si la tabla tiene filas duplicadas: nunca se borran datos al
+    # arrancar, la depuración se ejecuta de forma explícita (app/db/depurar_respuestas_duplicadas.py).
+    inspector = inspect(connection)
+    existing_tables = inspector.get_table_names()
+    for table_name, table in Base.metadata.tables.items():
+        if table_name not in existing_tables:
+            continue
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table_name)}
+        declared_indexes = {index.name for index in table.indexes}
+
+        for index_name in existing_indexes - declared_indexes:
+            print(f"Índice '{index_name}' no está en el modelo de la tabla '{table_name}'. Eliminándolo...")
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if index.unique:
+                duplicadas = count_duplicate_rows(connection, table, index)
+                if duplicadas:
+                    print(
+                        f"No se creó el índice único '{index.name}': la tabla '{table_name}' tiene "
+                        f"{duplicadas} filas duplicadas. Depúrelas con "
+                        "python -m app.db.depurar_respuestas_duplicadas y reinicie la aplicación."
+                    )
+                    continue
+            print(f"Índice '{index.name}' no encontrado en la tabla '{table_name}'. Creándolo...")
+            index.create(bind=connection)
+
+
+def count_duplicate_rows(connection, table, index):
+    # Cuenta las filas que violarían un índice único (todas menos una por grupo).
+    columns = ", ".join(column.name for column in index.columns)
+    return connection.execute(
+        text(
+            f"SELECT COALESCE(SUM(cantidad - 1), 0) FROM (SELECT COUNT(*) AS cantidad "
+            f"FROM {table.name} GROUP BY {columns} HAVING COUNT(*) > 1)"
+        )
+    ).scalar()
+
+
+def insert_initial_data(bind=None):
     # Inserta datos iniciales si no existen, evitando duplicados.
-    session_generator = get_db_session()
+    # Con `bind` se pobla otra base (por ejemplo, la de datos sintéticos) en lugar de la de la aplicación.
+    session_generator = get_db_session() if bind is None else iter([Session(bind=bind)])
     session = next(session_generator)
     try:
         # Insertar ciudades
@@ -216,5 +288,53 @@ def insert_initial_data():
         next(session_generator, None)
 
 
+def sync_progreso_tests():
+    # Reconstruye el progreso por usuario y test a partir de las respuestas existentes
+    # cuando la tabla de progreso está vacía (por ejemplo, tras agregarla a una base existente).
+    session_generator = get_db_session()
+    session = next(session_generator)
+    try:
+        if session.query(ProgresoTestUsuario).first():
+            return
+        total = reconstruir_progreso_tests(session)
+        session.commit()
+        print(f"Progreso de tests reconstruido para {total} combinaciones usuario-test.")
+    except Exception as e:
+        session.rollback()
+        print(f"Error al reconstruir el progreso de tests: {e}")
+    finally:
+        session.close()
+        next(session_generator, None)
+
+
+def sync_estadisticas_snapshot():
+    # Reconstruye el snapshot de estadísticas del panel de administración.
+    try:
+        total = refrescar_snapshot_estadisticas()
+        print(f"Snapshot de estadísticas reconstruido ({total} filas).")
+    except Exception as e:
+        print(f"Error al reconstruir el snapshot de estadísticas: {e}")
+
+
+def sync_resumen_resenas():
+    # Reconstruye el resumen de puntuaciones de reseñas.
+    try:
+        total = refrescar_resumen_resenas()
+        print(f"Resumen de reseñas reconstruido ({total} reseñas).")
+    except Exception as e:
+        print(f"Error al reconstruir el resumen de reseñas: {e}")
+
+
+def sync_indice_busqueda_resenas():
+    # Crea el índice de texto completo de reseñas si no existe y lo reconstruye.
+    if not config.RESENAS_FTS_ENABLED:
+        return
+    try:
+        total = refrescar_indice_resenas()
+        print(f"Índice de búsqueda de reseñas reconstruido ({total} reseñas).")
+    except Exception as e:
+        print(f"Error al reconstruir el índice de búsqueda de reseñas: {e}")
+
+
 if __name__ == "__main__":
     initialize_database()
@@ -0,0 +1,372 @@
+# Generador de datos sintéticos con volúmenes de producción para benchmarks y pruebas de
+# planes de consulta. Es determinista: la misma semilla produce exactamente los mismos datos.
+#     python -m app.db.synthetic_data --database-url sqlite:///sinteticos.db --usuarios 500000
+# La base de destino se indica siempre de forma explícita: nunca se usa DATABASE_URL, porque
+# los usuarios sintéticos comparten una contraseña conocida.
+# Las filas se insertan por lotes con executemany (sin objetos del ORM) y las tablas derivadas
+# (progreso, snapshot de estadísticas, resumen e índice de reseñas) quedan consistentes.
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import config
+from ..core.password_pool import pwd_context
+from ..services.busqueda_resenas_service import reconstruir_indice_resenas
+from ..services.estadisticas_snapshot_service import reconstruir_snapshot_estadisticas
+from ..services.resumen_resenas_service import reconstruir_resumen_resenas
+from ..schemas.sch_base import Base
+from .database import create_database_engine
+
+VOCACIONES = [
+    "Ingeniería",
+    "Salud",
+    "Artes",
+    "Ciencias sociales",
+    "Administración",
+    "Educación",
+]
+SEXOS = ["Masculino", "Femenino"]
+FECHA_BASE = date(2024, 1, 1)
+DIAS_DE_DATOS = 365
+
+# Contraseña compartida por los usuarios sintéticos (para iniciar sesión en las pruebas de carga)
+CONTRASENA_SINTETICA = "Sintetico123"
+EMAIL_SINTETICO = "sintetico{numero}@datos.local"
+DOMINIO_SINTETICO = "@datos.local"
+
+FRASES_RESENA = [
+    "El test de orientación me ayudó mucho",
+    "Las preguntas son claras",
+    "Muy lento al cargar las preguntas",
+    "Me gustaría ver más carreras recomendadas",
+    "Excelente herramienta para decidir mi carrera",
+    "El resultado coincidió con lo que esperaba",
+    "No entendí algunas preguntas",
+    "La plataforma es fácil de usar",
+    "Recomendaría el test a mis compañeros",
+    "El resultado de vocación fue sorprendente",
+]
+
+
+# Hash de la contraseña compartida. Con bcrypt se usa una sal fija para que la base generada
+# sea idéntica entre ejecuciones con la misma semilla.
+def _hash_contrasena_sintetica():
+    esquema = pwd_context.handler()
+    if esquema.name == "bcrypt":
+        return esquema.using(salt="SinteticoDatosPruebas.").hash(CONTRASENA_SINTETICA)
+    return pwd_context.hash(CONTRASENA_SINTETICA)
+
+
+def _siguiente_id(conexion, tabla: str) -> int:
+    return conexion.execute(text(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabla}")).scalar()
+
+
+# Inserta las filas (tuplas) en un solo executemany del driver
+def _insertar(conexion, tabla: str, columnas, filas):
+    if not filas:
+        return
+    marcadores = ", ".join("?" for _ in columnas)
+    conexion.exec_driver_sql(
+        f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({marcadores})", filas
+    )
+
+
+def _fecha_aleatoria(rnd) -> str:
+    return (FECHA_BASE + timedelta(days=rnd.randrange(DIAS_DE_DATOS))).isoformat()
+
+
+# Moda y segunda moda con el mismo criterio que calcular_distribucion_vocaciones:
+# mayor conteo primero y, ante empates, orden alfabético
+def _modas(conteo: Counter):
+    ordenadas = sorted(conteo.items(), key=lambda item: (-item[1], item[0]))
+    moda = ordenadas[0][0]
+    return moda, ordenadas[1][0] if len(ordenadas) > 1 else moda
+
+
+# Crea los tests con sus preguntas y respuestas. Retorna por test la lista de preguntas,
+# cada una con sus opciones {vocacion: respuesta_id}.
+def _generar_tests(
+    conexion, rnd, tests, preguntas_min, preguntas_max, respuestas_min, respuestas_max
+):
+    test_id = _siguiente_id(conexion, "tests")
+    pregunta_id = _siguiente_id(conexion, "preguntas")
+    respuesta_id = _siguiente_id(conexion, "respuestas")
+
+    filas_tests, filas_preguntas, filas_respuestas = [], [], []
+    estructura = []
+    for numero in range(1, tests + 1):
+        fecha = _fecha_aleatoria(rnd)
+        filas_tests.append(
+            (
+                test_id,
+                f"Test sintético {numero}",
+                f"Test de orientación sintético {numero}",
+                fecha,
+                fecha,
+            )
+        )
+        preguntas = []
+        for orden in range(1, rnd.randint(preguntas_min, preguntas_max) + 1):
+            filas_preguntas.append((pregunta_id, test_id, f"Pregunta {orden} del test {numero}"))
+            opciones = {}
+            vocaciones = rnd.sample(VOCACIONES, rnd.randint(respuestas_min, respuestas_max))
+            for letra, vocacion in zip("abcdef", vocaciones):
+                filas_respuestas.append(
+                    (respuesta_id, pregunta_id, f"Opción {letra} ({vocacion})", vocacion)
+                )
+                opciones[vocacion] = respuesta_id
+                respuesta_id += 1
+            preguntas.append((pregunta_id, opciones))
+            pregunta_id += 1
+        estructura.append((test_id, preguntas))
+        test_id += 1
+
+    _insertar(
+        conexion,
+        "tests",
+        ("id", "nombre", "descripcion", "fecha_creacion", "fecha_actualizacion"),
+        filas_tests,
+    )
+    _insertar(conexion, "preguntas", ("id", "test_id", "enunciado"), filas_preguntas)
+    _insertar(
+        conexion, "respuestas", ("id", "pregunta_id", "respuesta", "vocacion"), filas_respuestas
+    )
+    return estructura
+
+
+# Reconstruye las tablas derivadas a partir de los datos generados
+def _reconstruir_derivados(conexion):
+    with Session(bind=conexion) as db:
+        reconstruir_snapshot_estadisticas(db)
+        reconstruir_resumen_resenas(db)
+        if config.RESENAS_FTS_ENABLED and conexion.dialect.name == "sqlite":
+            reconstruir_indice_resenas(db)
+        db.flush()
+
+
+def generar_datos_sinteticos(
+    bind,
+    usuarios: int = 500_000,
+    tests: int = 4,
+    tests_por_usuario: int = 1,
+    preguntas_min: int = 50,
+    preguntas_max: int = 120,
+    respuestas_min: int = 4,
+    respuestas_max: int = 6,
+    proporcion_incompletos: float = 0.05,
+    proporcion_resenas: float = 0.2,
+    semilla: int = 42,
+    lote: int = 5000,
+):
+    """
+    Agrega usuarios, tests, respuestas de usuario, vocaciones, progreso y reseñas sintéticas
+    sobre las ciudades e instituciones existentes en `bind`, que es obligatorio: nunca se
+    escribe en la base de DATABASE_URL. Retorna la cantidad de filas por tabla.
+    """
+    if bind is None:
+        raise ValueError("Indique el engine de la base de destino de los datos sintéticos.")
+    rnd = random.Random(semilla)
+    contrasena = _hash_contrasena_sintetica()
+    totales = Counter()
+
+    with bind.begin() as conexion:
+        # Una segunda ejecución repetiría los mismos correos: se rechaza antes de escribir nada
+        existentes = conexion.execute(
+            text("SELECT COUNT(*) FROM usuarios WHERE email LIKE :dominio"),
+            {"dominio": f"%{DOMINIO_SINTETICO}"},
+        ).scalar()
+        if existentes:
+            raise ValueError(
+                f"La base ya tiene {existentes} usuarios sintéticos: use una base nueva."
+            )
+        ciudades = conexion.execute(text("SELECT id FROM ciudades ORDER BY id")).scalars().all()
+        instituciones = (
+            conexion.execute(text("SELECT id FROM instituciones ORDER BY id")).scalars().all()
+        )
+        estructura = _generar_tests(
+            conexion, rnd, tests, preguntas_min, preguntas_max, respuestas_min, respuestas_max
+        )
+        ids = {
+            tabla: _siguiente_id(conexion, tabla)
+            for tabla in (
+                "usuarios",
+                "respuestas_de_usuario",
+                "vocaciones_de_usuario_por_test",
+                "progreso_tests_usuario",
+                "resenas",
+            )
+        }
+    totales["tests"] = len(estructura)
+    totales["preguntas"] = sum(len(preguntas) for _, preguntas in estructura)
+    tests_por_usuario = min(tests_por_usuario, len(estructura))
+
+    # Una transacción por lote de usuarios: la memoria y el WAL se mantienen acotados
+    for inicio in range(0, usuarios, lote):
+        filas = {tabla: [] for tabla in ids}
+        for numero in range(inicio, min(inicio + lote, usuarios)):
+            usuario_id = ids["usuarios"]
+            ids["usuarios"] += 1
+            filas["usuarios"].append(
+                (
+                    usuario_id,
+                    f"Usuario sintético {numero}",
+                    EMAIL_SINTETICO.format(numero=numero),
+                    rnd.choice(SEXOS),
+                    contrasena,
+                    "comun",
+                    rnd.choice(ciudades) if ciudades else None,
+                    rnd.choice(instituciones) if instituciones and rnd.random() < 0.6 else None,
+                    _fecha_aleatoria(rnd),
+                )
+            )
+
+            # Cada usuario tiene una vocación preferida que elige en la mitad de las preguntas
+            preferida = rnd.choice(VOCACIONES)
+            for test_id, preguntas in rnd.sample(estructura, tests_por_usuario):
+                completo = rnd.random() >= proporcion_incompletos or len(preguntas) < 2
+                contestadas = (
+                    preguntas if completo else preguntas[: rnd.randint(1, len(preguntas) - 1)]
+                )
+                conteo = Counter()
+                for pregunta_id, opciones in contestadas:
+                    if preferida in opciones and rnd.random() < 0.5:
+                        vocacion = preferida
+                    else:
+                        vocacion = rnd.choice(list(opciones))
+                    conteo[vocacion] += 1
+                    filas["respuestas_de_usuario"].append(
+                        (
+                            ids["respuestas_de_usuario"],
+                            test_id,
+                            pregunta_id,
+                            opciones[vocacion],
+                            usuario_id,
+                        )
+                    )
+                    ids["respuestas_de_usuario"] += 1
+
+                filas["progreso_tests_usuario"].append(
+                    (
+                        ids["progreso_tests_usuario"],
+                        usuario_id,
+                        test_id,
+                        len(contestadas),
+                        len(preguntas),
+                        completo,
+                    )
+                )
+                ids["progreso_tests_usuario"] += 1
+                if completo:
+                    moda, moda2 = _modas(conteo)
+                    filas["vocaciones_de_usuario_por_test"].append(
+                        (ids["vocaciones_de_usuario_por_test"], usuario_id, test_id, moda, moda2)
+                    )
+                    ids["vocaciones_de_usuario_por_test"] += 1
+
+            if rnd.random() < proporcion_resenas:
+                comentario = ". ".join(rnd.sample(FRASES_RESENA, rnd.randint(1, 3))) + "."
+                filas["resenas"].append(
+                    (
+                        ids["resenas"],
+                        usuario_id,
+                        comentario,
+                        rnd.choices([1, 2, 3, 4, 5], weights=[5, 7, 15, 35, 38])[0],
+                        _fecha_aleatoria(rnd),
+                    )
+                )
+                ids["resenas"] += 1
+
+        with bind.begin() as conexion:
+            _insertar(
+                conexion,
+                "usuarios",
+                ("id", "nombre", "email", "sexo", "contrasena", "tipo_usuario",
+                 "id_ciudad", "id_institucion", "fecha_registro"),
+                filas["usuarios"],
+            )
+            _insertar(
+                conexion,
+                "respuestas_de_usuario",
+                ("id", "test_id", "pregunta_id", "respuesta_id", "usuario_id"),
+                filas["respuestas_de_usuario"],
+            )
+            _insertar(
+                conexion,
+                "progreso_tests_usuario",
+                ("id", "usuario_id", "test_id", "respuestas_contestadas", "total_preguntas",
+                 "completado"),
+                filas["progreso_tests_usuario"],
+            )
+            _insertar(
+                conexion,
+                "vocaciones_de_usuario_por_test",
+                ("id", "id_usuario", "id_test", "moda_vocacion", "moda_vocacion2"),
+                filas["vocaciones_de_usuario_por_test"],
+            )
+            _insertar(
+                conexion,
+                "resenas",
+                ("id", "id_usuario", "comentario", "puntuacion", "fecha_creacion"),
+                filas["resenas"],
+            )
+        for tabla, filas_tabla in filas.items():
+            totales[tabla] += len(filas_tabla)
+
+    with bind.begin() as conexion:
+        _reconstruir_derivados(conexion)
+    return dict(totales)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos")
+    parser.add_argument("--database-url", required=True,
+                        help="base de destino (por ejemplo sqlite:///sinteticos.db); no se usa DATABASE_URL")
+    parser.add_argument("--usuarios", type=int, default=500_000)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--tests-por-usuario", type=int, default=1)
+    parser.add_argument("--preguntas-min", type=int, default=50)
+    parser.add_argument("--preguntas-max", type=int, default=120)
+    parser.add_argument("--respuestas-min", type=int, default=4)
+    parser.add_argument("--respuestas-max", type=int, default=6)
+    parser.add_argument("--incompletos", type=float, default=0.05)
+    parser.add_argument("--resenas", type=float, default=0.2)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Esquema y datos iniciales (ciudades, instituciones y administrador) en la base de destino
+    from .setup_database import insert_initial_data
+
+    destino = create_database_engine(args.database_url)
+    Base.metadata.create_all(bind=destino)
+    insert_initial_data(destino)
+
+    inicio = time.perf_counter()
+    try:
+        totales = generar_datos_sinteticos(
+            destino,
+            usuarios=args.usuarios,
+            tests=args.tests,
+            tests_por_usuario=args.tests_por_usuario,
+            preguntas_min=args.preguntas_min,
+            preguntas_max=args.preguntas_max,
+            respuestas_min=args.respuestas_min,
+            respuestas_max=args.respuestas_max,
+            proporcion_incompletos=args.incompletos,
+            proporcion_resenas=args.resenas,
+            semilla=args.semilla,
+            lote=args.lote,
+        )
+    except ValueError as ex:
+        raise SystemExit(str(ex))
+    totales["segundos"] = round(time.perf_counter() - inicio, 1)
+    print(json.dumps(totales, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+
+from .config import config
+from .core.compression import MiddlewareCompresion, crear_cache_compresion
+from .core.executor import shutdown_executor
+from .core.metrics import MiddlewareMetricas
+from .core.query_diagnostics import MiddlewareDiagnosticoConsultas
+from .core.password_pool import shutdown_password_pool
+from .services.estadisticas_snapshot_service import refrescar_snapshot_periodicamente
+from .services.correo_service import procesar_correos_periodicamente
 
 from .routers import (
     auth,
@@ -14,10 +26,35 @@ from .routers import (
     ciudad,
     recursos,
     institucion,
-    csv
+    csv,
+    metricas,
 )
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reconstruir periódicamente el snapshot de estadísticas del panel de administración
+    tareas = []
+    if config.STATICS_SNAPSHOT_REFRESH_SECONDS > 0:
+        tareas.append(
+            asyncio.create_task(
+                refrescar_snapshot_periodicamente(config.STATICS_SNAPSHOT_REFRESH_SECONDS)
+            )
+        )
+    # Entregar en segundo plano los correos de la bandeja de salida
+    if config.OUTBOX_POLL_SECONDS > 0:
+        tareas.append(
+            asyncio.create_task(procesar_correos_periodicamente(config.OUTBOX_POLL_SECONDS))
+        )
+    yield
+    for tarea in tareas:
+        tarea.cancel()
+    # Liberar los hilos usados por los servicios bloqueantes y los procesos de hashing
+    shutdown_executor()
+    shutdown_password_pool()
+
+
+# orjson como serializador por defecto; los listados grandes usan respuesta_json (core/json_response)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Incluir routers
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
@@ -33,6 +70,8 @@ app.include_router(ciudad.router, prefix="/city", tags=["Ciudades"])
 app.include_router(recursos.router, prefix="/recurso", tags=["Recursos"])
 app.include_router(institucion.router, prefix="/institucion", tags=["Institucion"])
 app.include_router(csv.router, prefix="/csv", tags=["Csv"])
+if config.METRICS_ENABLED:
+    app.include_router(metricas.router, tags=["Métricas"])
 
 app.add_middleware(
         CORSMiddleware,
@@ -40,4 +79,18 @@ app.add_middleware(
         allow_credentials=True,
         allow_methods=["*"],  
         allow_headers=["*"],  
-    )
\ No newline at end of file
+        # Cabeceras propias que el frontend necesita leer
+        expose_headers=["X-Next-Cursor", "X-Estadisticas-Actualizadas", "ETag"],
+    )
+
+# Comprimir las respuestas según Accept-Encoding (gzip; brotli si el paquete está instalado)
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(MiddlewareCompresion, cache=crear_cache_compresion())
+
+# Contar las consultas SQL de cada petición y detectar posibles N+1 (desarrollo y pruebas)
+if config.QUERY_DIAGNOSTICS_ENABLED:
+    app.add_middleware(MiddlewareDiagnosticoConsultas)
+
+# Registrar cantidad y duración de las peticiones por ruta (incluye el tiempo de CORS)
+if config.METRICS_ENABLED:
+    app.add_middleware(MiddlewareMetricas)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -54,3 +54,44 @@ class RespuestaDeUsuarioUpdate(BaseModel):
                 "El ID de la respuesta debe ser un número entero positivo."
             )
         return value
+
+
+# Elemento de un envío por lotes: una respuesta seleccionada para una pregunta
+class RespuestaDeUsuarioItem(BaseModel):
+    pregunta_id: int
+    respuesta_id: int
+
+    @field_validator("pregunta_id")
+    def validate_pregunta_id(cls, value):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("El ID de la pregunta debe ser un número entero positivo.")
+        return value
+
+    @field_validator("respuesta_id")
+    def validate_respuesta_id(cls, value):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(
+                "El ID de la respuesta debe ser un número entero positivo."
+            )
+        return value
+
+
+# Modelo para registrar varias respuestas de un mismo test en una sola petición
+class RespuestaDeUsuarioBatchCreate(BaseModel):
+    test_id: int = Field(default=1)
+    respuestas: List[RespuestaDeUsuarioItem]
+
+    @field_validator("test_id")
+    def validate_test_id(cls, value):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("El ID del test debe ser un número entero positivo.")
+        return value
+
+    @field_validator("respuestas")
+    def validate_respuestas(cls, value):
+        if not value:
+            raise ValueError("Debe enviar al menos una respuesta.")
+        preguntas = [item.pregunta_id for item in value]
+        if len(preguntas) != len(set(preguntas)):
+            raise ValueError("No se puede responder la misma pregunta más de una vez en el lote.")
+        return value
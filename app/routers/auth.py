@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from ..core.executor import run_blocking
 from ..models.mdl_user import RecoverPasswordRequest, UsuarioCreate, UsuarioLogin
 from ..services.user_services import *
 
@@ -7,7 +8,7 @@ router = APIRouter()
 @router.post("/register")
 async def register(user: UsuarioCreate):
     try:
-        response = register_user(user)
+        response = await run_blocking(register_user, user)
         return response
     except HTTPException as e:
         raise e
@@ -17,7 +18,7 @@ async def register(user: UsuarioCreate):
 @router.post("/login")
 async def login(user: UsuarioLogin):
     try:
-        response = login_user(user.email, user.password)
+        response = await run_blocking(login_user, user.email, user.password)
         return response
     except HTTPException as e:
         raise e
@@ -27,7 +28,7 @@ async def login(user: UsuarioLogin):
 @router.post("/recover-password")
 async def recover_password(request: RecoverPasswordRequest):
     try:
-        response = reset_password_service(request.email)
+        response = await run_blocking(reset_password_service, request.email)
         return response
     except HTTPException as e:
         raise e
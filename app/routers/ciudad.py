@@ -1,26 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from ..core.executor import run_blocking
+from ..core.http_cache import cabeceras_cache, calcular_etag, etag_coincide, respuesta_no_modificada
 from ..models.mdl_ciudad import CiudadCreate, CiudadUpdate
-from ..services.ciudad_service import delete_city_service, list_ciudades_service, register_city_service, update_city_service
-from ..services.auth_service import verify_jwt_token
+from ..services.ciudad_service import VERSION_CIUDADES, delete_city_service, list_ciudades_service, register_city_service, update_city_service
+from ..services.auth_service import get_current_user
 
 router = APIRouter()
 
-# Configuración del esquema de seguridad HTTPBearer
-security = HTTPBearer()
 
 @router.post("/register")
 async def register_city(
     city: CiudadCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para registrar la ciudad
-        response = register_city_service(city, user_info)
+        response = await run_blocking(register_city_service, city, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -31,15 +26,11 @@ async def register_city(
 async def update_city(
     city_id: int,
     city: CiudadUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para actualizar la ciudad
-        response = update_city_service(city_id, city, user_info)
+        response = await run_blocking(update_city_service, city_id, city, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -49,15 +40,11 @@ async def update_city(
 @router.delete("/delete/{city_id}")
 async def delete_city(
     city_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para eliminar la ciudad
-        response = delete_city_service(city_id, user_info)
+        response = await run_blocking(delete_city_service, city_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -65,9 +52,15 @@ async def delete_city(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 @router.get("/list")
-async def list_ciudades():
+async def list_ciudades(request: Request, http_response: Response):
     try:
-        response = list_ciudades_service()
+        # Si el cliente tiene la versión actual se responde 304 sin consultar la base
+        etag = calcular_etag(VERSION_CIUDADES)
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag)
+
+        response = await run_blocking(list_ciudades_service)
+        http_response.headers.update(cabeceras_cache(etag))
         return response
     except HTTPException as e:
         raise e
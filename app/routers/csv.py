@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.responses import StreamingResponse
-from io import StringIO
-from app.services.auth_service import verify_jwt_token
+from app.core.executor import run_blocking
+from app.services.auth_service import get_current_user
 from app.services.csv_service import (
     get_all_respuestas_by_usuario_csv_service,
     get_users_vocations_csv_service,
@@ -12,19 +11,16 @@ from app.services.csv_service import (
 )
 
 router = APIRouter()
-security = HTTPBearer()
 
 @router.get("/users-vocations")
 async def download_users_vocations_csv(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         if user_info.get("tipo_usuario") != "admin":
             raise HTTPException(status_code=403, detail="No tiene privilegios suficientes.")
-        csv_data = get_users_vocations_csv_service()
-        return StreamingResponse(StringIO(csv_data), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=users_vocations.csv"})
+        csv_stream = await run_blocking(get_users_vocations_csv_service)
+        return StreamingResponse(csv_stream, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=users_vocations.csv"})
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -32,15 +28,13 @@ async def download_users_vocations_csv(
 
 @router.get("/cities-common-vocation")
 async def download_cities_common_vocation_csv(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         if user_info.get("tipo_usuario") != "admin":
             raise HTTPException(status_code=403, detail="No tiene privilegios suficientes.")
-        csv_data = get_cities_common_vocation_csv_service(user_info)
-        return StreamingResponse(StringIO(csv_data), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=cities_common_vocation.csv"})
+        csv_stream = await run_blocking(get_cities_common_vocation_csv_service, user_info)
+        return StreamingResponse(csv_stream, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=cities_common_vocation.csv"})
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -48,15 +42,13 @@ async def download_cities_common_vocation_csv(
 
 @router.get("/vocation-percentages")
 async def download_vocation_percentages_csv(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         if user_info.get("tipo_usuario") != "admin":
             raise HTTPException(status_code=403, detail="No tiene privilegios suficientes.")
-        csv_data = get_vocation_percentages_csv_service(user_info)
-        return StreamingResponse(StringIO(csv_data), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=vocation_percentages.csv"})
+        csv_stream = await run_blocking(get_vocation_percentages_csv_service, user_info)
+        return StreamingResponse(csv_stream, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=vocation_percentages.csv"})
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -64,15 +56,13 @@ async def download_vocation_percentages_csv(
 
 @router.get("/users-by-city")
 async def download_users_by_city_csv(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         if user_info.get("tipo_usuario") != "admin":
             raise HTTPException(status_code=403, detail="No tiene privilegios suficientes.")
-        csv_data = get_users_by_city_csv_service(user_info)
-        return StreamingResponse(StringIO(csv_data), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=users_by_city.csv"})
+        csv_stream = await run_blocking(get_users_by_city_csv_service, user_info)
+        return StreamingResponse(csv_stream, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=users_by_city.csv"})
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -80,17 +70,15 @@ async def download_users_by_city_csv(
 
 @router.get("/respuestas-usuarios", summary="Descargar CSV de respuestas individuales de usuario agrupadas")
 async def download_respuestas_usuarios_csv(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         # Validar que solo administradores puedan acceder a este recurso
         if user_info.get("tipo_usuario") != "admin":
             raise HTTPException(status_code=403, detail="No tiene privilegios suficientes.")
-        csv_data = get_all_respuestas_by_usuario_csv_service()
+        csv_stream = await run_blocking(get_all_respuestas_by_usuario_csv_service)
         return StreamingResponse(
-            StringIO(csv_data),
+            csv_stream,
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=all_respuestas_por_usuario.csv"}
         )
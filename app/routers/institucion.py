@@ -1,29 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from ..core.executor import run_blocking
+from ..core.http_cache import cabeceras_cache, calcular_etag, etag_coincide, respuesta_no_modificada
 from ..models.mdl_institucion import InstitucionCreate, InstitucionUpdate
 from ..services.institucion_service import (
+    VERSION_INSTITUCIONES,
     register_institucion_service,
     update_institucion_service,
     delete_institucion_service,
     list_instituciones_service,
 )
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
 
 router = APIRouter()
 
-# Configuración del esquema de seguridad HTTPBearer
-security = HTTPBearer()
-
 
 @router.post("/register")
 async def register_institucion(
     institucion: InstitucionCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = register_institucion_service(institucion, user_info)
+        response = await run_blocking(register_institucion_service, institucion, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -34,12 +31,10 @@ async def register_institucion(
 async def update_institucion(
     id: int,
     institucion: InstitucionUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = update_institucion_service(id, institucion, user_info)
+        response = await run_blocking(update_institucion_service, id, institucion, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -49,12 +44,10 @@ async def update_institucion(
 @router.delete("/delete/{id}")
 async def delete_institucion(
     id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = delete_institucion_service(id, user_info)
+        response = await run_blocking(delete_institucion_service, id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -62,9 +55,15 @@ async def delete_institucion(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 @router.get("/list")
-async def list_instituciones():
+async def list_instituciones(request: Request, http_response: Response):
     try:
-        response = list_instituciones_service()
+        # Si el cliente tiene la versión actual se responde 304 sin consultar la base
+        etag = calcular_etag(VERSION_INSTITUCIONES)
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag)
+
+        response = await run_blocking(list_instituciones_service)
+        http_response.headers.update(cabeceras_cache(etag))
         return response
     except HTTPException as e:
         raise e
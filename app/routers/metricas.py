@@ -0,0 +1,30 @@
+import secrets
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from ..config import config
+from ..core.metrics import TIPO_CONTENIDO, registro
+from ..services.auth_service import security, verify_jwt_token
+
+router = APIRouter()
+
+
+# Las métricas exponen las rutas, el tráfico y el estado interno de pools y cachés: se permiten
+# con el token de METRICS_TOKEN (recolector de Prometheus) o con el token de un administrador.
+async def autorizar_metricas(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    if config.METRICS_TOKEN and secrets.compare_digest(
+        token.encode(), config.METRICS_TOKEN.encode()
+    ):
+        return
+    user_info = verify_jwt_token(token)
+    if user_info["tipo_usuario"] != "admin":
+        raise HTTPException(
+            status_code=403, detail="No tiene privilegios para realizar esta acción."
+        )
+
+
+# Métricas en formato de texto de Prometheus (peticiones, consultas, pools y cachés)
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(autorizar_metricas)])
+async def get_metrics():
+    return PlainTextResponse(registro.exportar(), media_type=TIPO_CONTENIDO)
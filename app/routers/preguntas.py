@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from ..services.auth_service import verify_jwt_token
+from ..core.executor import run_blocking
+from ..services.auth_service import get_current_user
 from ..services.pregunta_service import (
     list_preguntas_by_test,
     search_pregunta_by_id,
@@ -13,21 +13,16 @@ from ..models.mdl_pregunta import PreguntaCreate, PreguntaUpdate
 # Crear el router
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
 
 # 1. Endpoint para listar preguntas por Test_ID sin paginación
 @router.get("/list/{test_id}")
 async def get_preguntas_by_test(
     test_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Obtener las preguntas asociadas al test
-        response = list_preguntas_by_test(test_id, user_info)
+        response = await run_blocking(list_preguntas_by_test, test_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -38,12 +33,10 @@ async def get_preguntas_by_test(
 @router.get("/search/{pregunta_id}")
 async def get_pregunta_by_id(
     pregunta_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = search_pregunta_by_id(pregunta_id, user_info)
+        response = await run_blocking(search_pregunta_by_id, pregunta_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -54,12 +47,10 @@ async def get_pregunta_by_id(
 @router.post("/create")
 async def create_pregunta(
     pregunta: PreguntaCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = create_pregunta_service(pregunta, user_info)
+        response = await run_blocking(create_pregunta_service, pregunta, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -71,12 +62,10 @@ async def create_pregunta(
 async def update_pregunta(
     pregunta_id: int,
     pregunta: PreguntaUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = update_pregunta_service(pregunta,pregunta_id, user_info)
+        response = await run_blocking(update_pregunta_service, pregunta,pregunta_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -87,12 +76,10 @@ async def update_pregunta(
 @router.delete("/delete/{pregunta_id}")
 async def delete_pregunta(
     pregunta_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = delete_pregunta_service(pregunta_id, user_info)
+        response = await run_blocking(delete_pregunta_service, pregunta_id, user_info)
         return response
     except HTTPException as e:
         raise e
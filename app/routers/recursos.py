@@ -1,33 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from ..core.executor import run_blocking
+from ..core.http_cache import cabeceras_cache, calcular_etag, etag_coincide, respuesta_no_modificada
 from ..models.mdl_recurso import RecursoCreate, RecursoUpdate
 from ..services.recurso_service import (
+    VERSION_RECURSOS,
     delete_recurso_service,
     edit_recurso_service,
     get_total_recursos,
     list_recursos_service,
     register_recurso_service,
 )
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
 
 router = APIRouter()
 
-# Configuración del esquema de seguridad HTTPBearer
-security = HTTPBearer()
-
 
 @router.post("/register")
 async def register_recurso(
     recurso: RecursoCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para registrar el recurso
-        response = register_recurso_service(recurso, user_info)
+        response = await run_blocking(register_recurso_service, recurso, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -38,12 +33,10 @@ async def register_recurso(
 async def edit_recurso(
     recurso_id: int,
     recurso_data: RecursoUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = edit_recurso_service(recurso_id, recurso_data, user_info)
+        response = await run_blocking(edit_recurso_service, recurso_id, recurso_data, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -52,12 +45,10 @@ async def edit_recurso(
 
 @router.delete("/borrar/{recurso_id}")
 async def delete_recurso(
-    recurso_id: int, credentials: HTTPAuthorizationCredentials = Depends(security)
+    recurso_id: int, user_info: dict = Depends(get_current_user)
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = delete_recurso_service(recurso_id, user_info)
+        response = await run_blocking(delete_recurso_service, recurso_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -65,11 +56,19 @@ async def delete_recurso(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 @router.get("/listar")
-async def list_recursos(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def list_recursos(
+    request: Request,
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
+):
     try:
-        token = credentials.credentials
-        verify_jwt_token(token)  # Verificar JWT
-        response = list_recursos_service()  # Obtener todos los recursos
+        # Si el cliente tiene la versión actual se responde 304 sin consultar la base
+        etag = calcular_etag(VERSION_RECURSOS)
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag, privado=True)
+
+        response = await run_blocking(list_recursos_service)  # Obtener todos los recursos
+        http_response.headers.update(cabeceras_cache(etag, privado=True))
         return response
     except HTTPException as e:
         raise e
@@ -79,13 +78,11 @@ async def list_recursos(credentials: HTTPAuthorizationCredentials = Depends(secu
 
 @router.get("/total")
 async def get_total_recursos_endpoint(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        verify_jwt_token(token)
         # Obtener el total de recursos
-        response = get_total_recursos()
+        response = await run_blocking(get_total_recursos)
         return response
     except HTTPException as e:
         raise e
@@ -1,8 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from ..config import config
+from ..core.executor import run_blocking
+from ..core.json_response import respuesta_json
 from ..models.mdl_resena import ResenaCreate
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
+from ..services.busqueda_resenas_service import buscar_resenas_service
 from ..services.resena_service import (
     create_resena_service,
     get_resenas_paginated_desc_service,
@@ -10,35 +14,28 @@ from ..services.resena_service import (
     get_resenas_by_rating_service,
     get_resenas_by_user_id_service,
     get_average_rating_service,
+    get_resenas_summary_service,
     edit_resena_service,
     delete_resena_service,
     count_total_resenas_service,
     count_resenas_by_rating_service,
-    get_all_reviews_service
+    get_all_reviews_service,
+    get_all_reviews_page_service,
+    stream_all_reviews_service,
+    siguiente_cursor_resenas,
 )
 
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
-
 
 @router.post("/register")
 async def create_resena(
     resena: ResenaCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(
-        security
-    ),  # Dependencia para extraer el token
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar si el token es válido
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para crear la reseña
-        response = create_resena_service(resena, user_info)
+        response = await run_blocking(create_resena_service, resena, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -46,13 +43,33 @@ async def create_resena(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 
+# Parámetros de paginación: `cursor` (cabecera X-Next-Cursor de la respuesta anterior)
+# tiene prioridad sobre `page`, que se conserva por compatibilidad
+def _limite_pagina():
+    return Query(config.RESENAS_PAGE_SIZE, gt=0, le=config.RESENAS_MAX_PAGE_SIZE)
+
+
+# Informa en la cabecera el cursor de la página siguiente, si la hay
+def agregar_cursor_siguiente(response: Response, resenas: list, limit: int):
+    cursor = siguiente_cursor_resenas(resenas, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+
+
 # Consultar reseñas de más reciente a más antigua
 @router.get("/recent")
 async def get_recent_reviews(
+    http_response: Response,
     page: int = Query(1, gt=0),  # Validar que skip sea no negativo
+    limit: int = _limite_pagina(),
+    cursor: Optional[str] = Query(None),
 ):
     try:
-        return get_resenas_paginated_desc_service(page=page)
+        resenas = await run_blocking(
+            get_resenas_paginated_desc_service, page=page, limit=limit, cursor=cursor
+        )
+        agregar_cursor_siguiente(http_response, resenas, limit)
+        return respuesta_json(resenas, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -62,10 +79,17 @@ async def get_recent_reviews(
 # Consultar reseñas de más antigua a más reciente
 @router.get("/oldest")
 async def get_oldest_reviews(
+    http_response: Response,
     page: int = Query(1, gt=0),
+    limit: int = _limite_pagina(),
+    cursor: Optional[str] = Query(None),
 ):
     try:
-        return get_resenas_paginated_asc_service(page=page)
+        resenas = await run_blocking(
+            get_resenas_paginated_asc_service, page=page, limit=limit, cursor=cursor
+        )
+        agregar_cursor_siguiente(http_response, resenas, limit)
+        return respuesta_json(resenas, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -75,11 +99,18 @@ async def get_oldest_reviews(
 # Filtrar reseñas por calificación
 @router.get("/filter_rating")
 async def filter_reviews_by_rating(
+    http_response: Response,
     rating: int,
     page: int = Query(1, gt=0),
+    limit: int = _limite_pagina(),
+    cursor: Optional[str] = Query(None),
 ):
     try:
-        return get_resenas_by_rating_service(rating=rating, page=page)
+        resenas = await run_blocking(
+            get_resenas_by_rating_service, rating=rating, page=page, limit=limit, cursor=cursor
+        )
+        agregar_cursor_siguiente(http_response, resenas, limit)
+        return respuesta_json(resenas, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -89,11 +120,10 @@ async def filter_reviews_by_rating(
 # 4. Consultar reseñas por ID de usuario (token)
 @router.get("/user")
 async def get_reviews_by_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        user_info = verify_jwt_token(credentials.credentials)
-        return get_resenas_by_user_id_service(user_id=user_info["user_id"])
+        return await run_blocking(get_resenas_by_user_id_service, user_id=user_info["user_id"])
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -105,7 +135,40 @@ async def get_reviews_by_user(
 async def get_reviews_average(
 ):
     try:
-        return {"average_rating": get_average_rating_service()}
+        return {"average_rating": await run_blocking(get_average_rating_service)}
+    except HTTPException as e:
+        raise e
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
+
+# Buscar reseñas por texto del comentario (solo admin), ordenadas por relevancia
+@router.get("/search")
+async def search_reviews(
+    http_response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    rating: Optional[int] = Query(None),
+    limit: int = _limite_pagina(),
+    cursor: Optional[str] = Query(None),
+    user_info: dict = Depends(get_current_user),
+):
+    try:
+        resultado = await run_blocking(
+            buscar_resenas_service, q, user_info, rating=rating, limit=limit, cursor=cursor
+        )
+        if resultado["next_cursor"]:
+            http_response.headers["X-Next-Cursor"] = resultado["next_cursor"]
+        return respuesta_json(resultado["data"], http_response)
+    except HTTPException as e:
+        raise e
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
+
+
+# Resumen de puntuaciones (total, promedio e histograma) en una sola llamada
+@router.get("/summary")
+async def get_reviews_summary():
+    try:
+        return await run_blocking(get_resenas_summary_service)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -116,17 +179,11 @@ async def get_reviews_average(
 async def edit_resena(
     resena_id: int,
     resena: ResenaCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar si el token es válido y obtener la información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para editar la reseña
-        response = edit_resena_service(resena_id, resena, user_info)
+        response = await run_blocking(edit_resena_service, resena_id, resena, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -139,17 +196,11 @@ async def edit_resena(
 @router.delete("/delete/{resena_id}")
 async def delete_resena(
     resena_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar si el token es válido y obtener la información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para eliminar la reseña
-        response = delete_resena_service(resena_id, user_info)
+        response = await run_blocking(delete_resena_service, resena_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -163,7 +214,7 @@ async def delete_resena(
 @router.get("/count")
 async def count_total_resenas():
     try:
-        total = count_total_resenas_service()
+        total = await run_blocking(count_total_resenas_service)
         return {"total_resenas": total}
     except HTTPException as e:
         raise e
@@ -177,7 +228,7 @@ async def count_total_resenas():
 @router.get("/count_by_rating")
 async def count_resenas_by_rating(rating: int):
     try:
-        count = count_resenas_by_rating_service(rating=rating)
+        count = await run_blocking(count_resenas_by_rating_service, rating=rating)
         return {"rating": rating, "count": count}
     except HTTPException as e:
         raise e
@@ -186,10 +237,47 @@ async def count_resenas_by_rating(rating: int):
             status_code=500, detail=f"Error interno: {str(ex)}"
         )
 
+# Listado completo de reseñas (de más antigua a más reciente):
+# - formato=ndjson (o Accept: application/x-ndjson): streaming de una reseña por línea
+# - limit / cursor: paginación por cursor con la cabecera X-Next-Cursor
+# - campos=id,puntuacion,...: proyección; largo_comentario recorta el comentario
 @router.get("/all")
-async def get_all_reviews():
+async def get_all_reviews(
+    request: Request,
+    http_response: Response,
+    formato: str = Query("json", pattern="^(json|ndjson)$"),
+    campos: Optional[str] = Query(None),
+    largo_comentario: Optional[int] = Query(None, gt=0),
+    limit: Optional[int] = Query(None, gt=0, le=config.RESENAS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+):
     try:
-        return get_all_reviews_service()
+        lista_campos = [campo.strip() for campo in campos.split(",") if campo.strip()] if campos else None
+        if formato == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+            ndjson_stream = await run_blocking(
+                stream_all_reviews_service,
+                cursor=cursor,
+                campos=lista_campos,
+                largo_comentario=largo_comentario,
+            )
+            return StreamingResponse(ndjson_stream, media_type="application/x-ndjson")
+
+        if limit or cursor:
+            pagina = await run_blocking(
+                get_all_reviews_page_service,
+                limit=limit or config.RESENAS_PAGE_SIZE,
+                cursor=cursor,
+                campos=lista_campos,
+                largo_comentario=largo_comentario,
+            )
+            if pagina["next_cursor"]:
+                http_response.headers["X-Next-Cursor"] = pagina["next_cursor"]
+            return respuesta_json(pagina["data"], http_response)
+
+        resenas = await run_blocking(
+            get_all_reviews_service, campos=lista_campos, largo_comentario=largo_comentario
+        )
+        return respuesta_json(resenas)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from ..services.auth_service import verify_jwt_token
+from ..core.executor import run_blocking
+from ..services.auth_service import get_current_user
 from ..services.respuesta_usuario_service import (
     list_respuestas_usuario,
     create_respuesta_usuario_service,
+    create_respuestas_usuario_batch_service,
     update_respuesta_usuario_service,
     delete_respuestas_usuario_admin_service,
 )
 from ..models.mdl_respuesta_usuario import (
+    RespuestaDeUsuarioBatchCreate,
     RespuestaDeUsuarioCreate,
     RespuestaDeUsuarioUpdate,
 )
@@ -15,19 +17,15 @@ from ..models.mdl_respuesta_usuario import (
 # Crear el router
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
 
 # 1. Listar respuestas de usuario (usuarios comunes)
 @router.get("/list/user")
 async def get_respuestas_usuario(
     test_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = list_respuestas_usuario(test_id, user_info)
+        response = await run_blocking(list_respuestas_usuario, test_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -40,11 +38,9 @@ async def get_respuestas_usuario(
 async def get_respuestas_usuario_admin(
     test_id: int,
     usuario_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
         response = list_respuestas_usuario_admin(test_id, usuario_id, user_info)
         return response
     except HTTPException as e:
@@ -57,17 +53,26 @@ async def get_respuestas_usuario_admin(
 @router.post("/create")
 async def create_respuesta_usuario(
     respuesta_data: RespuestaDeUsuarioCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),  # Uso de HTTPBearer
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
+        # Llamar al servicio para manejar la lógica de creación
+        response = await run_blocking(create_respuesta_usuario_service, respuesta_data, user_info)
+        return response
+    except HTTPException as e:
+        raise e
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
 
-        # Llamar al servicio para manejar la lógica de creación
-        response = create_respuesta_usuario_service(respuesta_data, user_info)
+# 3.1 Crear o actualizar en lote las respuestas de un test
+@router.post("/create/batch")
+async def create_respuestas_usuario_batch(
+    batch_data: RespuestaDeUsuarioBatchCreate,
+    user_info: dict = Depends(get_current_user),
+):
+    try:
+        response = await run_blocking(create_respuestas_usuario_batch_service, batch_data, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -80,12 +85,10 @@ async def create_respuesta_usuario(
 async def update_respuesta_usuario(
     test_id:int,
     respuesta_data: RespuestaDeUsuarioUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = update_respuesta_usuario_service(respuesta_data,test_id, user_info)
+        response = await run_blocking(update_respuesta_usuario_service, respuesta_data,test_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -97,12 +100,10 @@ async def update_respuesta_usuario(
 @router.delete("/delete")
 async def delete_respuestas_usuario_admin(
     test_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = delete_respuestas_usuario_admin_service(test_id, user_info)
+        response = await run_blocking(delete_respuestas_usuario_admin_service, test_id, user_info)
         return response
     except HTTPException as e:
         raise e
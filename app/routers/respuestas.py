@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from ..core.executor import run_blocking
 
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
 from ..services.respuesta_service import (
     list_respuestas_by_pregunta,
     search_respuesta_by_id,
@@ -14,19 +14,15 @@ from ..models.mdl_respuesta import RespuestaCreate, RespuestaUpdate
 # Crear el router
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
 
 # 1. Listar respuestas por pregunta_id
 @router.get("/list/{pregunta_id}")
 async def get_respuestas_by_pregunta(
     pregunta_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = list_respuestas_by_pregunta(pregunta_id, user_info)
+        response = await run_blocking(list_respuestas_by_pregunta, pregunta_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -38,12 +34,10 @@ async def get_respuestas_by_pregunta(
 @router.get("/search/{respuesta_id}")
 async def get_respuesta_by_id(
     respuesta_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = search_respuesta_by_id(respuesta_id, user_info)
+        response = await run_blocking(search_respuesta_by_id, respuesta_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -55,12 +49,10 @@ async def get_respuesta_by_id(
 @router.post("/create")
 async def create_respuesta(
     respuesta: RespuestaCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = create_respuesta_service(respuesta, user_info)
+        response = await run_blocking(create_respuesta_service, respuesta, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -73,12 +65,10 @@ async def create_respuesta(
 async def update_respuesta(
     respuesta_id:int,
     respuesta: RespuestaUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = update_respuesta_service(respuesta,respuesta_id, user_info)
+        response = await run_blocking(update_respuesta_service, respuesta,respuesta_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -90,12 +80,10 @@ async def update_respuesta(
 @router.delete("/delete/{respuesta_id}")
 async def delete_respuesta(
     respuesta_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = delete_respuesta_service(respuesta_id, user_info)
+        response = await run_blocking(delete_respuesta_service, respuesta_id, user_info)
         return response
     except HTTPException as e:
         raise e
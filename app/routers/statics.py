@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Response
+from ..core.executor import run_blocking
+from ..core.http_cache import calcular_etag_fecha
+from ..core.json_response import respuesta_json
 from ..services.statics_service import (
     contar_total_tests,
     count_completed_tests_service,
@@ -13,24 +15,33 @@ from ..services.statics_service import (
     obtener_moda_vocacion_mas_comun,
     vocacion_mas_comun_por_ciudad_service,
 )
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
+from ..services.ciudad_service import VERSION_CIUDADES
+from ..services.institucion_service import VERSION_INSTITUCIONES
+from ..services.estadisticas_snapshot_service import obtener_fecha_snapshot_estadisticas
 
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
+
+# Informa en la cabecera la fecha de la última actualización del snapshot de estadísticas y
+# un ETag derivado de ella (la compresión guarda el cuerpo comprimido por ETag). El ETag
+# incluye las versiones de ciudades e instituciones, cuyos nombres aparecen en el cuerpo.
+# Se llama antes de consultar: una actualización concurrente deja la fecha obsoleta, nunca el cuerpo.
+async def agregar_fecha_snapshot(response: Response):
+    fecha = await run_blocking(obtener_fecha_snapshot_estadisticas)
+    if fecha:
+        response.headers["X-Estadisticas-Actualizadas"] = fecha.isoformat()
+        response.headers["ETag"] = calcular_etag_fecha(fecha, VERSION_CIUDADES, VERSION_INSTITUCIONES)
 
 
 # 1. Listar ciudades con usuarios (solo admin)
 @router.get("/list/cities")
 async def get_cities_with_users(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = list_cities_with_users_service(user_info)
-        return response
+        response = await run_blocking(list_cities_with_users_service, user_info)
+        return respuesta_json(response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -40,18 +51,12 @@ async def get_cities_with_users(
 # 2. Endpoint para obtener usuarios por institución
 @router.get("/instituciones/usuarios")
 async def get_usuarios_por_institucion(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para obtener los datos
-        response = list_usuarios_por_institucion_service(user_info)
-        return response
+        response = await run_blocking(list_usuarios_por_institucion_service, user_info)
+        return respuesta_json(response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -61,13 +66,13 @@ async def get_usuarios_por_institucion(
 # 3. Vocación más común (solo admin)
 @router.get("/common-vocation")
 async def get_moda_vocacion_mas_comun(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = obtener_moda_vocacion_mas_comun(user_info)
-        return response
+        await agregar_fecha_snapshot(http_response)
+        response = await run_blocking(obtener_moda_vocacion_mas_comun, user_info)
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -76,12 +81,10 @@ async def get_moda_vocacion_mas_comun(
 # 4. Total de test creados (solo admin)
 @router.get("/total-tests")
 async def get_total_tests(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = contar_total_tests(user_info)
+        response = await run_blocking(contar_total_tests, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -91,13 +94,13 @@ async def get_total_tests(
 # 5. Vocación más común por ciudad (solo admin)
 @router.get("/city-common-vocation")
 async def get_vocacion_mas_comun_por_ciudad(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = vocacion_mas_comun_por_ciudad_service(user_info)
-        return response
+        await agregar_fecha_snapshot(http_response)
+        response = await run_blocking(vocacion_mas_comun_por_ciudad_service, user_info)
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -106,16 +109,14 @@ async def get_vocacion_mas_comun_por_ciudad(
 # 6. Vocación más común por institución (solo admin)
 @router.get("/institution/vocation")
 async def get_most_common_vocation_per_institution(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Obtener vocación más común por institución
-        response = get_most_common_vocation_per_institution_service(user_info)
-        return response
+        await agregar_fecha_snapshot(http_response)
+        response = await run_blocking(get_most_common_vocation_per_institution_service, user_info)
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -124,16 +125,14 @@ async def get_most_common_vocation_per_institution(
 # 7. Vocación más común por sexo (solo admin)
 @router.get("/gender/vocation")
 async def get_most_common_vocation_per_gender(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Obtener vocación más común por sexo
-        response = get_most_common_vocation_per_gender_service(user_info)
-        return response
+        await agregar_fecha_snapshot(http_response)
+        response = await run_blocking(get_most_common_vocation_per_gender_service, user_info)
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -142,15 +141,11 @@ async def get_most_common_vocation_per_gender(
 # 8. cantidad de usuarios registrados
 @router.get("/users/count")
 async def get_non_admin_user_count(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token y obtener la información del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Obtener el total de usuarios no administradores
-        return count_non_admin_users_service(user_info)
+        return await run_blocking(count_non_admin_users_service, user_info)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -159,15 +154,11 @@ async def get_non_admin_user_count(
 # 9. cantidad de test completados
 @router.get("/user-tests/completed")
 async def count_completed_tests_endpoint(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_info: dict = Depends(get_current_user)
 ):
     try:
-        # Extraer y verificar el token
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        
         # Llamar al servicio para obtener el total de test completados
-        response = count_completed_tests_service(user_info)
+        response = await run_blocking(count_completed_tests_service, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -175,24 +166,21 @@ async def count_completed_tests_endpoint(
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 @router.get("/vocations/percentages")
-async def get_vocation_percentages(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_vocation_percentages(http_response: Response, user_info: dict = Depends(get_current_user)):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = get_vocation_percentages_service(user_info)
-        return response
+        await agregar_fecha_snapshot(http_response)
+        response = await run_blocking(get_vocation_percentages_service, user_info)
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
 
 @router.get("/tests/completed")
-async def get_completed_tests_by_test_endpoint(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_completed_tests_by_test_endpoint(user_info: dict = Depends(get_current_user)):
     try:
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-        response = get_completed_tests_by_test_service(user_info)
-        return response
+        response = await run_blocking(get_completed_tests_by_test_service, user_info)
+        return respuesta_json(response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from ..services.auth_service import verify_jwt_token
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from ..config import config
+from ..core.executor import run_blocking
+from ..core.http_cache import cabeceras_cache, calcular_etag, etag_coincide, respuesta_no_modificada
+from ..core.json_response import respuesta_json
+from ..services.auth_service import get_current_user
 from ..services.test_service import (
+    VERSION_TESTS,
+    clave_version_test,
     create_test_service,
     get_test_by_id_service,
+    get_test_bundle_service,
     list_tests_service,
+    list_tests_async_service,
     delete_test_service,
     update_test_service,
 )
@@ -14,25 +21,16 @@ from ..models.mdl_test import TestCreate
 
 router = APIRouter()
 
-# Configurar el esquema de seguridad HTTPBearer
-security = HTTPBearer()
-
 
 # 1. registrar test
 @router.post("/register")
 async def create_test(
     test: TestCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para crear el test
-        response = create_test_service(test, user_info)
+        response = await run_blocking(create_test_service, test, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -42,18 +40,23 @@ async def create_test(
 # 2. Listar tests
 @router.get("/list")
 async def list_tests(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request,
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
+        # Si el cliente tiene la versión actual se responde 304 sin consultar la base
+        etag = calcular_etag(VERSION_TESTS)
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag, privado=True)
 
         # Llamar al servicio para listar todos los tests sin paginación
-        response = list_tests_service()
-        return response
+        if config.ASYNC_DATABASE_ENABLED:
+            response = await list_tests_async_service()
+        else:
+            response = await run_blocking(list_tests_service)
+        http_response.headers.update(cabeceras_cache(etag, privado=True))
+        return respuesta_json(response, http_response)
     except HTTPException as e:
         raise e
     except Exception as ex:
@@ -61,24 +64,39 @@ async def list_tests(
 
 # Obterner test por id
 @router.get("/{test_id}", response_model=dict)
-def get_test_by_id(test_id: int):
-    return get_test_by_id_service(test_id)
+async def get_test_by_id(test_id: int):
+    return await run_blocking(get_test_by_id_service, test_id)
+
+# Obtener el test completo (preguntas y respuestas) en una sola llamada
+@router.get("/{test_id}/bundle")
+async def get_test_bundle(
+    test_id: int,
+    request: Request,
+    http_response: Response,
+    user_info: dict = Depends(get_current_user),
+):
+    try:
+        etag = calcular_etag(clave_version_test(test_id))
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag, privado=True)
+
+        response = await run_blocking(get_test_bundle_service, test_id, user_info)
+        http_response.headers.update(cabeceras_cache(etag, privado=True))
+        return respuesta_json(response, http_response)
+    except HTTPException as e:
+        raise e
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
 # 3. Eliminar tests
 @router.delete("/{test_id}")
 async def delete_test(
     test_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para eliminar el test
-        response = delete_test_service(test_id, user_info)
+        response = await run_blocking(delete_test_service, test_id, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -90,17 +108,11 @@ async def delete_test(
 async def update_test(
     test_id: int,
     test: TestCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Extraer el token del encabezado
-        token = credentials.credentials
-
-        # Verificar el token y obtener información del usuario
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para actualizar el test
-        response = update_test_service(test_id, test, user_info)
+        response = await run_blocking(update_test_service, test_id, test, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from ..core.executor import run_blocking
 
 from ..models.mdl_user import PasswordChangeRequest, UsuarioUpdate
 from ..services.user_services import (
@@ -7,23 +7,16 @@ from ..services.user_services import (
     edit_user_service,
     get_user_data_service,
 )
-from ..services.auth_service import verify_jwt_token
+from ..services.auth_service import get_current_user
 
 router = APIRouter()
 
-# Configuración del esquema de seguridad HTTPBearer
-security = HTTPBearer()
-
 
 @router.get("/data")
-async def get_user_data(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_user_data(user_info: dict = Depends(get_current_user)):
     try:
-        # Verificar token del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Obtener los datos del usuario
-        response = get_user_data_service(user_info)
+        response = await run_blocking(get_user_data_service, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -33,15 +26,11 @@ async def get_user_data(credentials: HTTPAuthorizationCredentials = Depends(secu
 @router.put("/change-password")
 async def change_password(
     password_request: PasswordChangeRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token y obtener la información del usuario
-        token = credentials.credentials
-        user_info = verify_jwt_token(token)
-
         # Llamar al servicio para cambiar la contraseña
-        response = change_password_service(password_request, user_info)
+        response = await run_blocking(change_password_service, password_request, user_info)
         return response
     except HTTPException as e:
         raise e
@@ -51,15 +40,11 @@ async def change_password(
 @router.put("/edit")
 async def edit_user(
     user_data: UsuarioUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user),
 ):
     try:
-        # Verificar el token y obtener la información del usuario
-        token = credentials.credentials
-        current_user = verify_jwt_token(token)
-
         # Llamar al servicio para editar el usuario
-        response = edit_user_service(user_data, current_user)
+        response = await run_blocking(edit_user_service, user_data, current_user)
         return response
     except HTTPException as e:
         raise e
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from .sch_base import Base
+
+class CorreoSaliente(Base):
+    # Bandeja de salida: correos confirmados junto con la operación que los origina
+    # y entregados por el worker de envío en segundo plano
+    __tablename__ = "correos_salientes"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    destinatario = Column(String, nullable=False)
+    asunto = Column(String, nullable=False)
+    # El cuerpo se borra al entregarse o descartarse. Los correos con datos sensibles no lo
+    # guardan: indican una plantilla y el usuario, y el cuerpo se construye al enviarlos
+    cuerpo = Column(Text, nullable=True)
+    plantilla = Column(String, nullable=True)
+    # Sin clave foránea: un correo pendiente no debe impedir eliminar al usuario
+    usuario_id = Column(Integer, nullable=True)
+    estado = Column(String, nullable=False, default="pendiente")
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False)
+    ultimo_error = Column(Text, nullable=True)
+    creado_en = Column(DateTime, nullable=False)
+    enviado_en = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_correos_salientes_estado_proximo", "estado", "proximo_intento"),
+    )
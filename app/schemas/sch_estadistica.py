@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+from .sch_base import Base
+
+class EstadisticaVocacion(Base):
+    # Conteo materializado de vocaciones por dimensión (global, ciudad, institución, sexo)
+    __tablename__ = "estadisticas_vocacion"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    dimension = Column(String, nullable=False)
+    clave = Column(String, nullable=False, default="")
+    vocacion = Column(String, nullable=False)
+    conteo = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "dimension", "clave", "vocacion", name="uq_estadistica_dimension_clave_vocacion"
+        ),
+    )
+
+
+class EstadisticaSnapshot(Base):
+    # Metadatos de cada snapshot: última reconstrucción completa y última actualización
+    __tablename__ = "estadisticas_snapshot"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    nombre = Column(String, nullable=False, unique=True)
+    reconstruido_en = Column(DateTime, nullable=False)
+    actualizado_en = Column(DateTime, nullable=False)
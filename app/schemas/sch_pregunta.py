@@ -5,7 +5,7 @@ from .sch_base import Base
 class Pregunta(Base):
     __tablename__ = "preguntas"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
     enunciado = Column(String, nullable=False)
 
     test = relationship("Test",backref="preguntas")
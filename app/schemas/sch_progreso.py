@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from .sch_base import Base
+
+class ProgresoTestUsuario(Base):
+    __tablename__ = "progreso_tests_usuario"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
+    respuestas_contestadas = Column(Integer, nullable=False, default=0)
+    total_preguntas = Column(Integer, nullable=False, default=0)
+    completado = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "test_id", name="uq_progreso_usuario_test"),
+    )
+
+    usuario = relationship("Usuario",backref="progreso_tests")
+    test = relationship("Test",backref="progreso_usuarios")
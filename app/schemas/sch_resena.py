@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Text
+from sqlalchemy import DDL, Column, Index, Integer, ForeignKey, Date, Text, event
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .sch_base import Base
+from ..config import config
 
 class Resena(Base):
     __tablename__ = "resenas"
@@ -11,4 +12,28 @@ class Resena(Base):
     puntuacion = Column(Integer, nullable=False)
     fecha_creacion = Column(Date, default=datetime.now(timezone.utc))
 
-    usuario = relationship("Usuario",backref="resenas")
\ No newline at end of file
+    # Paginación por cursor sobre (fecha_creacion, id), también filtrando por puntuación
+    __table_args__ = (
+        Index("ix_resenas_fecha_creacion_id", "fecha_creacion", "id"),
+        Index("ix_resenas_puntuacion_fecha_creacion_id", "puntuacion", "fecha_creacion", "id"),
+    )
+
+    usuario = relationship("Usuario",backref="resenas")
+
+
+# Índice de texto completo (FTS5) sobre los comentarios. Es una tabla virtual de contenido
+# externo (los textos se leen de `resenas`) que mantienen los servicios de reseñas.
+RESENAS_FTS = "resenas_fts"
+RESENAS_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RESENAS_FTS} USING fts5("
+    "comentario, content='resenas', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+event.listen(
+    Resena.__table__,
+    "after_create",
+    DDL(RESENAS_FTS_DDL).execute_if(
+        dialect="sqlite", callable_=lambda *args, **kwargs: config.RESENAS_FTS_ENABLED
+    ),
+)
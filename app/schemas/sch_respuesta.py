@@ -6,7 +6,7 @@ from .sch_base import Base
 class Respuesta(Base):
         __tablename__ = "respuestas"
         id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-        pregunta_id = Column(Integer, ForeignKey("preguntas.id"), nullable=False)
+        pregunta_id = Column(Integer, ForeignKey("preguntas.id"), nullable=False, index=True)
         respuesta = Column(String, nullable=False)
         vocacion = Column(String, nullable=False)
         
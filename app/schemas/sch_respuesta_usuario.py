@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Index, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from .sch_base import Base
 
@@ -10,6 +10,13 @@ class RespuestaDeUsuario(Base):
     respuesta_id = Column(Integer, ForeignKey("respuestas.id"), nullable=False)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
 
+    __table_args__ = (
+        # Listado, cálculo de vocación y borrado por test (incluye respuesta_id para cubrir el JOIN)
+        Index("ix_respuestas_usuario_test_usuario", "test_id", "usuario_id", "respuesta_id"),
+        # Un usuario responde cada pregunta una sola vez; también cubre la búsqueda al editar
+        Index("uq_respuestas_usuario_usuario_pregunta", "usuario_id", "pregunta_id", unique=True),
+    )
+
     pregunta = relationship("Pregunta",backref="respuestas_de_usuario")
     test = relationship("Test",backref="respuestas_de_usuario")
     respuesta = relationship("Respuesta",backref="respuestas_de_usuario")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer
+from .sch_base import Base
+
+class ResumenResenas(Base):
+    # Resumen materializado de las puntuaciones de reseñas (una sola fila)
+    __tablename__ = "resumen_resenas"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(Integer, nullable=False, default=0)
+    suma = Column(Integer, nullable=False, default=0)
+    estrellas_1 = Column(Integer, nullable=False, default=0)
+    estrellas_2 = Column(Integer, nullable=False, default=0)
+    estrellas_3 = Column(Integer, nullable=False, default=0)
+    estrellas_4 = Column(Integer, nullable=False, default=0)
+    estrellas_5 = Column(Integer, nullable=False, default=0)
+    actualizado_en = Column(DateTime, nullable=False)
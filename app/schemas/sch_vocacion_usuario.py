@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from .sch_base import Base
 
@@ -9,6 +9,10 @@ class VocacionDeUsuarioPorTest(Base):
     id_test = Column(Integer, ForeignKey("tests.id"), nullable=False)
     moda_vocacion = Column(String, nullable=False)
     moda_vocacion2 = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_vocaciones_usuario_usuario_test", "id_usuario", "id_test"),
+    )
     
     usuario = relationship("Usuario",backref="vocaciones_de_usuario_por_test")
     test = relationship("Test",backref="vocaciones_de_usuario_por_test")
\ No newline at end of file
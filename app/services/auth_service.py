@@ -1,20 +1,33 @@
-from fastapi import HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta, timezone
 from ..config import config
+from ..core.metrics import registrar_cache
+from ..core.token_cache import TokenCache
+from ..core.password_pool import (
+    hash_password,
+    password_hash_needs_update,
+    pwd_context,
+    verify_password_hash,
+)
 
 # Esquema de autenticacion
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-# Configuración del hashing
-pwd_context = CryptContext(schemes=[config.HASHING_SCHEMES], deprecated=config.HASHING_DEPRECATED)
+security = HTTPBearer()
 
+# Tokens verificados recientemente: el mismo token se envía en cada petición del cliente
+_token_cache = registrar_cache(TokenCache("tokens", config.TOKEN_CACHE_SIZE))
+
+# El hashing y la verificación se ejecutan en el pool de procesos dedicado a bcrypt
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_password_hash(plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password):
+    return password_hash_needs_update(hashed_password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -24,6 +37,9 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 def verify_jwt_token(token: str):
+    user_info = _token_cache.get(token)
+    if user_info is not None:
+        return dict(user_info)
     try:
         # Decodificar el token
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
@@ -33,9 +49,16 @@ def verify_jwt_token(token: str):
             "email": payload.get("email"),
             "tipo_usuario": payload.get("tipo_usuario"),
         }
+        # Solo se guardan tokens con expiración; los inválidos nunca entran en la caché
+        if payload.get("exp") is not None:
+            _token_cache.set(token, user_info, payload["exp"])
 
-        return user_info
+        return dict(user_info)
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="El token ha expirado.")
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido o mal formado.")
+
+# Dependencia para las rutas autenticadas: extrae el token Bearer y retorna la información del usuario
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return verify_jwt_token(credentials.credentials)
@@ -0,0 +1,168 @@
+import base64
+import re
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from ..config import config
+from ..schemas.sch_resena import RESENAS_FTS, RESENAS_FTS_DDL
+from ..db.database import get_db_session
+
+# Búsqueda de texto completo en los comentarios de reseñas (SQLite FTS5).
+# Las funciones que reciben la sesión se ejecutan dentro de la transacción del servicio
+# que las invoca, de modo que el índice se confirma junto con la reseña.
+
+
+def es_tabla_fts(nombre_tabla: str) -> bool:
+    # La tabla virtual y sus tablas internas (resenas_fts_data, _idx, _docsize, _config)
+    return nombre_tabla == RESENAS_FTS or nombre_tabla.startswith(f"{RESENAS_FTS}_")
+
+
+# Agrega la reseña al índice (después de flush, cuando ya tiene id).
+def indexar_resena(db, resena_id: int, comentario: str):
+    if not config.RESENAS_FTS_ENABLED:
+        return
+    db.execute(
+        text(f"INSERT INTO {RESENAS_FTS}(rowid, comentario) VALUES (:id, :comentario)"),
+        {"id": resena_id, "comentario": comentario},
+    )
+
+
+# Quita la reseña del índice. Con contenido externo FTS5 requiere el texto indexado.
+def desindexar_resena(db, resena_id: int, comentario: str):
+    if not config.RESENAS_FTS_ENABLED:
+        return
+    db.execute(
+        text(
+            f"INSERT INTO {RESENAS_FTS}({RESENAS_FTS}, rowid, comentario) "
+            "VALUES ('delete', :id, :comentario)"
+        ),
+        {"id": resena_id, "comentario": comentario},
+    )
+
+
+# Crea el índice si no existe y lo reconstruye a partir de la tabla de reseñas.
+def reconstruir_indice_resenas(db):
+    db.execute(text(RESENAS_FTS_DDL))
+    db.execute(text(f"INSERT INTO {RESENAS_FTS}({RESENAS_FTS}) VALUES ('rebuild')"))
+    return db.execute(text(f"SELECT count(*) FROM {RESENAS_FTS}")).scalar()
+
+
+# Reconstruye el índice en su propia sesión (inicialización de la base y comando manual).
+def refrescar_indice_resenas():
+    db = next(get_db_session())
+    try:
+        total = reconstruir_indice_resenas(db)
+        db.commit()
+        return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# Convierte el texto del usuario en una consulta FTS5 segura: cada palabra se busca como
+# prefijo entre comillas (sin operadores), y todas deben aparecer en el comentario.
+def _consulta_fts(q: str) -> str:
+    palabras = re.findall(r"\w+", q or "")
+    if not palabras:
+        raise HTTPException(status_code=400, detail="Debe indicar un texto de búsqueda.")
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+
+# Cursor de la búsqueda: posición (relevancia, id) de la última reseña entregada
+def _codificar_cursor_busqueda(rango: float, resena_id: int) -> str:
+    valor = f"{rango!r}|{resena_id}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor_busqueda(cursor: str):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        rango, resena_id = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return float(rango), int(resena_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido.")
+
+
+# Buscar reseñas por texto, ordenadas por relevancia (bm25) y paginadas por cursor.
+# Retorna las reseñas y el cursor de la página siguiente (None si no hay más).
+# bm25 depende de las estadísticas de todo el índice: si una reseña se crea, edita o elimina
+# entre páginas, la relevancia de todas cambia y el cursor ya no indica una posición válida.
+# El cursor es una instantánea de mejor esfuerzo: cada página verifica que la última reseña
+# entregada conserve su relevancia y, si cambió, responde 409 para volver a la primera página.
+def buscar_resenas_service(
+    q: str, current_user, rating: int = None, limit: int = 10, cursor: str = None
+):
+    if not current_user or current_user.get("tipo_usuario") != "admin":
+        raise HTTPException(
+            status_code=403,
+            detail="No tiene los privilegios necesarios para buscar reseñas.",
+        )
+    if not config.RESENAS_FTS_ENABLED:
+        raise HTTPException(status_code=503, detail="La búsqueda de reseñas no está habilitada.")
+    if rating is not None and (rating < 1 or rating > 5):
+        raise HTTPException(status_code=400, detail="La puntuación debe estar entre 1 y 5.")
+
+    parametros = {"consulta": _consulta_fts(q), "limit": limit}
+    filtros = ""
+    if rating is not None:
+        filtros += " AND r.puntuacion = :rating"
+        parametros["rating"] = rating
+    posicion = ""
+    if cursor:
+        parametros["rango"], parametros["id"] = _decodificar_cursor_busqueda(cursor)
+        posicion = "WHERE (rango, id) > (:rango, :id)"
+
+    coincidencias = (
+        " SELECT r.id, r.comentario, r.puntuacion, r.fecha_creacion,"
+        " u.nombre AS nombre_usuario, bm25(" + RESENAS_FTS + ") AS rango"
+        " FROM " + RESENAS_FTS +
+        " JOIN resenas r ON r.id = " + RESENAS_FTS + ".rowid"
+        " JOIN usuarios u ON u.id = r.id_usuario"
+        " WHERE " + RESENAS_FTS + " MATCH :consulta" + filtros
+    )
+
+    db = next(get_db_session())
+    try:
+        if cursor:
+            rango_actual = db.execute(
+                text("SELECT rango FROM (" + coincidencias + " AND r.id = :id)"), parametros
+            ).scalar()
+            if rango_actual != parametros["rango"]:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Las reseñas cambiaron durante la búsqueda. Vuelva a la primera página.",
+                )
+
+        filas = db.execute(
+            text(
+                "SELECT * FROM (" + coincidencias + ") " + posicion +
+                " ORDER BY rango, id LIMIT :limit"
+            ),
+            parametros,
+        ).all()
+
+        siguiente = None
+        if len(filas) == limit:
+            siguiente = _codificar_cursor_busqueda(filas[-1].rango, filas[-1].id)
+
+        return {
+            "data": [
+                {
+                    "id": fila.id,
+                    "comentario": fila.comentario,
+                    "puntuacion": fila.puntuacion,
+                    "fecha_creacion": fila.fecha_creacion,
+                    "nombre_usuario": fila.nombre_usuario,
+                }
+                for fila in filas
+            ],
+            "next_cursor": siguiente,
+        }
+    except HTTPException as http_ex:
+        raise http_ex
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=str(ex))
+    finally:
+        db.close()
@@ -1,8 +1,12 @@
 from fastapi import HTTPException
 from ..db.database import get_db_session
 from ..schemas.sch_ciudad import Ciudad
+from ..core.cache import bump_version
 from ..models.mdl_ciudad import CiudadCreate, CiudadUpdate
 
+# Versión del catálogo en el registro de versiones (ETag de los listados)
+VERSION_CIUDADES = "ciudades"
+
 
 def register_city_service(city: CiudadCreate, current_user):
     # Verificar si el usuario tiene privilegios de administrador
@@ -31,6 +35,7 @@ def register_city_service(city: CiudadCreate, current_user):
         # Guardar en la base de datos
         db.add(nueva_ciudad)
         db.commit()
+        bump_version(VERSION_CIUDADES)
         db.refresh(nueva_ciudad)
 
         return {"message": "Ciudad registrada exitosamente", "id": nueva_ciudad.id}
@@ -73,6 +78,7 @@ def update_city_service(city_id: int, city: CiudadUpdate, current_user):
 
         # Guardar los cambios en la base de datos
         db.commit()
+        bump_version(VERSION_CIUDADES)
         db.refresh(ciudad_existente)
 
         return {"message": "Ciudad actualizada exitosamente", "id": ciudad_existente.id}
@@ -105,6 +111,7 @@ def delete_city_service(city_id: int, current_user):
         # Eliminar la ciudad
         db.delete(ciudad)
         db.commit()
+        bump_version(VERSION_CIUDADES)
 
         return {"message": f"Ciudad con ID {city_id} eliminada exitosamente."}
     except HTTPException as http_ex:
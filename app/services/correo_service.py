@@ -0,0 +1,234 @@
+import asyncio
+import smtplib
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from ..config import config
+from ..core.executor import run_blocking
+from ..db.database import get_db_session
+from ..schemas.sch_correo import CorreoSaliente
+
+# Bandeja de salida de correos. Los servicios encolan el correo en su propia transacción
+# (se confirma junto con el cambio que lo origina) y un worker en segundo plano lo entrega
+# reutilizando una conexión SMTP, con reintentos y espera exponencial ante fallos.
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_ENVIADO = "enviado"
+ESTADO_FALLIDO = "fallido"
+
+# Plantillas de correos cuyo cuerpo no se guarda en la bandeja (por ejemplo, contraseñas
+# temporales). Cada una recibe la sesión y el correo y retorna el cuerpo y una función que
+# se ejecuta solo si el envío tuvo éxito, dentro de la misma transacción.
+_plantillas = {}
+
+
+def registrar_plantilla_correo(nombre: str, construir):
+    _plantillas[nombre] = construir
+
+
+# Agrega un correo a la bandeja de salida dentro de la transacción del servicio que lo invoca.
+# Se indica el cuerpo o bien una plantilla registrada y el usuario al que se refiere.
+def encolar_correo(db, destinatario: str, asunto: str, cuerpo: str = None,
+                   plantilla: str = None, usuario_id: int = None):
+    ahora = datetime.now(timezone.utc)
+    correo = CorreoSaliente(
+        destinatario=destinatario,
+        asunto=asunto,
+        cuerpo=cuerpo,
+        plantilla=plantilla,
+        usuario_id=usuario_id,
+        estado=ESTADO_PENDIENTE,
+        intentos=0,
+        proximo_intento=ahora,
+        creado_en=ahora,
+    )
+    db.add(correo)
+    return correo
+
+
+# Conexión SMTP reutilizada entre envíos; se abre al primer envío y se reabre si el
+# servidor la cerró. Solo la usa el worker de la bandeja de salida.
+class ConexionSMTP:
+    def __init__(self):
+        self._smtp = None
+
+    def _abrir(self):
+        smtp = smtplib.SMTP(
+            config.SMTP_SERVER, config.SMTP_PORT, timeout=config.SMTP_TIMEOUT_SECONDS
+        )
+        try:
+            if config.SMTP_STARTTLS:
+                smtp.starttls()
+            if config.SMTP_USERNAME:
+                smtp.login(config.SMTP_USERNAME, config.SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def enviar(self, mensaje: EmailMessage):
+        if self._smtp is not None:
+            try:
+                self._smtp.send_message(mensaje)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # La conexión reutilizada expiró: se abre una nueva y se reintenta una vez
+                self.cerrar()
+            except Exception:
+                self.cerrar()
+                raise
+        self._smtp = self._abrir()
+        try:
+            self._smtp.send_message(mensaje)
+        except Exception:
+            self.cerrar()
+            raise
+
+    def cerrar(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+
+_conexion = ConexionSMTP()
+
+
+def _sin_cambios():
+    pass
+
+
+# Cuerpo del correo y acción a confirmar tras enviarlo (de la plantilla, si tiene una)
+def _construir_cuerpo(db, correo):
+    if not correo.plantilla:
+        return correo.cuerpo, _sin_cambios
+    construir = _plantillas.get(correo.plantilla)
+    if construir is None:
+        raise ValueError(f"Plantilla de correo desconocida: {correo.plantilla}")
+    return construir(db, correo)
+
+
+def _crear_mensaje(correo, cuerpo: str) -> EmailMessage:
+    mensaje = EmailMessage()
+    mensaje["Subject"] = correo.asunto
+    mensaje["From"] = config.FROM_EMAIL
+    mensaje["To"] = correo.destinatario
+    mensaje.set_content(cuerpo)
+    return mensaje
+
+
+def calcular_espera_reintento(intentos: int) -> timedelta:
+    return timedelta(seconds=config.OUTBOX_BACKOFF_SECONDS * 2 ** (intentos - 1))
+
+
+# Reserva el correo moviendo su próximo intento hacia adelante: si el proceso termina
+# durante el envío, el correo vuelve a estar disponible cuando vence la reserva.
+def _reservar_correo(db, correo_id: int, ahora: datetime) -> bool:
+    reserva = ahora + timedelta(seconds=config.SMTP_TIMEOUT_SECONDS * 3)
+    reservados = (
+        db.query(CorreoSaliente)
+        .filter(
+            CorreoSaliente.id == correo_id,
+            CorreoSaliente.estado == ESTADO_PENDIENTE,
+            CorreoSaliente.proximo_intento <= ahora,
+        )
+        .update({CorreoSaliente.proximo_intento: reserva}, synchronize_session=False)
+    )
+    db.commit()
+    return reservados == 1
+
+
+def _entregar_correo(db, conexion: ConexionSMTP, correo_id: int) -> bool:
+    if not _reservar_correo(db, correo_id, datetime.now(timezone.utc)):
+        return False
+
+    correo = db.get(CorreoSaliente, correo_id)
+    correo.intentos += 1
+    try:
+        cuerpo, confirmar = _construir_cuerpo(db, correo)
+        conexion.enviar(_crear_mensaje(correo, cuerpo))
+        confirmar()
+        correo.estado = ESTADO_ENVIADO
+        correo.enviado_en = datetime.now(timezone.utc)
+        correo.cuerpo = None
+        correo.ultimo_error = None
+        return True
+    except Exception as ex:
+        correo.ultimo_error = str(ex)[:500]
+        if correo.intentos >= config.OUTBOX_MAX_ATTEMPTS:
+            correo.estado = ESTADO_FALLIDO
+            correo.cuerpo = None
+        else:
+            correo.proximo_intento = datetime.now(timezone.utc) + calcular_espera_reintento(
+                correo.intentos
+            )
+        return False
+    finally:
+        db.commit()
+
+
+# Entrega los correos pendientes cuyo intento ya venció. Retorna cuántos se enviaron.
+def procesar_cola_correos(conexion: ConexionSMTP = None):
+    conexion = conexion or _conexion
+    db = next(get_db_session())
+    try:
+        pendientes = (
+            db.query(CorreoSaliente.id)
+            .filter(
+                CorreoSaliente.estado == ESTADO_PENDIENTE,
+                CorreoSaliente.proximo_intento <= datetime.now(timezone.utc),
+            )
+            .order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id)
+            .limit(config.OUTBOX_BATCH_SIZE)
+            .all()
+        )
+        enviados = sum(1 for (correo_id,) in pendientes if _entregar_correo(db, conexion, correo_id))
+        if len(pendientes) < config.OUTBOX_BATCH_SIZE:
+            # Sin más correos por ahora: no mantener la conexión abierta mientras está inactiva
+            conexion.cerrar()
+        return enviados
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# El worker se despierta de inmediato cuando un servicio encola un correo
+_loop = None
+_despertar = None
+
+
+# Avisa al worker que hay correos nuevos; puede llamarse desde los hilos de los servicios.
+def notificar_correo_pendiente():
+    loop, evento = _loop, _despertar
+    if loop is not None and evento is not None:
+        loop.call_soon_threadsafe(evento.set)
+
+
+# Tarea de fondo que entrega la bandeja de salida al recibir un aviso o cada `intervalo` segundos.
+async def procesar_correos_periodicamente(intervalo: int):
+    global _loop, _despertar
+    _loop = asyncio.get_running_loop()
+    _despertar = asyncio.Event()
+    try:
+        while True:
+            _despertar.clear()
+            try:
+                enviados = await run_blocking(procesar_cola_correos)
+                if enviados:
+                    print(f"Bandeja de salida: {enviados} correos enviados.")
+            except Exception as ex:
+                print(f"Error al procesar la bandeja de salida: {ex}")
+            try:
+                await asyncio.wait_for(_despertar.wait(), timeout=intervalo)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _loop = None
+        _despertar = None
+        _conexion.cerrar()
@@ -2,12 +2,46 @@ import csv
 import io
 from fastapi import HTTPException
 from sqlalchemy import func
+from ..config import config
 from ..db.database import get_db_session
 from ..schemas.sch_usuario import Usuario
 from ..schemas.sch_ciudad import Ciudad
 from ..schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
 from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
 
+
+# Ejecuta la consulta con un cursor del lado del servidor que entrega filas por lotes.
+# La consulta se ejecuta aquí para que los errores se detecten antes de iniciar la respuesta.
+def _abrir_cursor(query):
+    return iter(query.yield_per(config.CSV_BATCH_SIZE))
+
+
+# Genera el CSV en bloques de CSV_BATCH_SIZE filas sin acumular el archivo completo en memoria.
+# La cabecera se emite de inmediato y la sesión se cierra al terminar (o abandonar) el recorrido.
+def _stream_csv(db, filas, encabezado, convertir_fila=None, delimiter=";"):
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter)
+        writer.writerow(encabezado)
+        # La cabecera sale sola para que el cliente reciba el primer byte sin esperar un lote
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        pendientes = 0
+        for fila in filas:
+            writer.writerow(convertir_fila(fila) if convertir_fila else fila)
+            pendientes += 1
+            if pendientes >= config.CSV_BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                pendientes = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
 def get_users_vocations_csv_service():
     db = next(get_db_session())
     try:
@@ -22,18 +56,15 @@ def get_users_vocations_csv_service():
             )
             .join(VocacionDeUsuarioPorTest, Usuario.id == VocacionDeUsuarioPorTest.id_usuario)
             .filter(Usuario.tipo_usuario != 'admin')
-            .all()
         )
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=";")
-        writer.writerow(["User ID", "Nombre", "Email", "Vocacion Principal", "Vocacion Secundaria"])
-        for row in results:
-            writer.writerow(row)
-        return output.getvalue()
+        return _stream_csv(
+            db,
+            _abrir_cursor(results),
+            ["User ID", "Nombre", "Email", "Vocacion Principal", "Vocacion Secundaria"],
+        )
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=str(ex))
-    finally:
         db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
 
 def get_cities_common_vocation_csv_service(current_user: dict):
     db = next(get_db_session())
@@ -57,18 +88,16 @@ def get_cities_common_vocation_csv_service(current_user: dict):
                 Ciudad.longitud,
                 VocacionDeUsuarioPorTest.moda_vocacion
             )
-            .all()
         )
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=";")
-        writer.writerow(["City ID", "City Name", "Latitud", "Longitud", "Vocacion Principal"])
-        for r in results:
-            writer.writerow([r.city_id, r.city_name, r.latitud, r.longitud, r.moda_vocacion])
-        return output.getvalue()
+        return _stream_csv(
+            db,
+            _abrir_cursor(results),
+            ["City ID", "City Name", "Latitud", "Longitud", "Vocacion Principal"],
+            lambda r: [r.city_id, r.city_name, r.latitud, r.longitud, r.moda_vocacion],
+        )
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=str(ex))
-    finally:
         db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
 
 def get_vocation_percentages_csv_service(current_user: dict):
     db = next(get_db_session())
@@ -86,19 +115,20 @@ def get_vocation_percentages_csv_service(current_user: dict):
             .join(Usuario, Usuario.id == VocacionDeUsuarioPorTest.id_usuario)
             .filter(Usuario.tipo_usuario != 'admin')
             .group_by(VocacionDeUsuarioPorTest.moda_vocacion)
-            .all()
         )
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Vocacion", "Porcentaje"])
-        for vocacion, count in results:
-            percentage = round((count / total_users) * 100)
-            writer.writerow([vocacion, percentage])
-        return output.getvalue()
+        return _stream_csv(
+            db,
+            _abrir_cursor(results),
+            ["Vocacion", "Porcentaje"],
+            lambda r: [r.moda_vocacion, round((r.count / total_users) * 100)],
+            delimiter=",",
+        )
+    except HTTPException as http_ex:
+        db.close()
+        raise http_ex
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=str(ex))
-    finally:
         db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
 
 def get_users_by_city_csv_service(current_user: dict):
     db = next(get_db_session())
@@ -114,23 +144,21 @@ def get_users_by_city_csv_service(current_user: dict):
             )
             .join(Usuario, Ciudad.id == Usuario.id_ciudad)
             .filter(Usuario.tipo_usuario != 'admin')
-            .all()
         )
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=";")
-        writer.writerow(["City ID", "City Name", "User ID", "User Name", "Email"])
-        for r in results:
-            writer.writerow([r.city_id, r.city_name, r.user_id, r.user_name, r.email])
-        return output.getvalue()
+        return _stream_csv(
+            db,
+            _abrir_cursor(results),
+            ["City ID", "City Name", "User ID", "User Name", "Email"],
+        )
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=str(ex))
-    finally:
         db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
 
 def get_all_respuestas_by_usuario_csv_service():
     """
     Obtiene todas las respuestas de usuario agrupadas de forma plana,
     es decir, cada fila representa una respuesta junto con los datos del usuario.
+    Retorna un generador que produce el CSV por bloques.
     """
     db = next(get_db_session())
     try:
@@ -146,24 +174,13 @@ def get_all_respuestas_by_usuario_csv_service():
             )
             .join(Usuario, RespuestaDeUsuario.usuario_id == Usuario.id)
             .order_by(Usuario.id)
-            .all()
         )
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=";")
-        # Escribir cabecera
-        writer.writerow(["User ID", "User Name", "Email", "Respuesta Usuario ID", "Test ID", "Pregunta ID", "Respuesta ID"])
-        for row in results:
-            writer.writerow([
-                row.user_id,
-                row.user_name,
-                row.email,
-                row.respuesta_usuario_id,
-                row.test_id,
-                row.pregunta_id,
-                row.respuesta_id
-            ])
-        return output.getvalue()
+        # Las columnas de la consulta ya están en el orden de la cabecera
+        return _stream_csv(
+            db,
+            _abrir_cursor(results),
+            ["User ID", "User Name", "Email", "Respuesta Usuario ID", "Test ID", "Pregunta ID", "Respuesta ID"],
+        )
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=str(ex))
-    finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
\ No newline at end of file
@@ -0,0 +1,178 @@
+import asyncio
+from datetime import datetime, timezone
+from sqlalchemy import String, cast, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from ..core.executor import run_blocking
+from ..schemas.sch_estadistica import EstadisticaSnapshot, EstadisticaVocacion
+from ..schemas.sch_usuario import Usuario
+from ..schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
+from ..db.database import get_db_session
+
+# Snapshot materializado de las estadísticas de vocaciones del panel de administración.
+# Las funciones que reciben la sesión se ejecutan dentro de la transacción del servicio
+# que las invoca, de modo que el snapshot se confirma junto con la vocación del usuario.
+
+SNAPSHOT_VOCACIONES = "vocaciones"
+DIMENSION_GLOBAL = "global"
+DIMENSION_CIUDAD = "ciudad"
+DIMENSION_INSTITUCION = "institucion"
+DIMENSION_SEXO = "sexo"
+
+
+def _obtener_snapshot(db):
+    return (
+        db.query(EstadisticaSnapshot)
+        .filter(EstadisticaSnapshot.nombre == SNAPSHOT_VOCACIONES)
+        .first()
+    )
+
+
+# Consultas agregadas que alimentan el snapshot, una por dimensión.
+def _consultas_por_dimension():
+    vocacion = VocacionDeUsuarioPorTest.moda_vocacion
+    conteo = func.count(VocacionDeUsuarioPorTest.id)
+
+    def por_usuario(dimension, columna):
+        return (
+            select(literal(dimension), cast(columna, String), vocacion, conteo)
+            .select_from(VocacionDeUsuarioPorTest)
+            .join(Usuario, Usuario.id == VocacionDeUsuarioPorTest.id_usuario)
+            .where(columna.is_not(None))
+            .group_by(columna, vocacion)
+        )
+
+    return [
+        select(literal(DIMENSION_GLOBAL), literal(""), vocacion, conteo).group_by(vocacion),
+        por_usuario(DIMENSION_CIUDAD, Usuario.id_ciudad),
+        por_usuario(DIMENSION_INSTITUCION, Usuario.id_institucion),
+        por_usuario(DIMENSION_SEXO, Usuario.sexo),
+    ]
+
+
+# Reconstruye por completo el snapshot a partir de las vocaciones registradas.
+# Retorna la cantidad de filas agregadas almacenadas.
+def reconstruir_snapshot_estadisticas(db):
+    # Borrar primero toma el bloqueo de escritura, así el resto lee un estado consistente
+    db.query(EstadisticaVocacion).delete(synchronize_session=False)
+    columnas = ["dimension", "clave", "vocacion", "conteo"]
+    for consulta in _consultas_por_dimension():
+        db.execute(insert(EstadisticaVocacion).from_select(columnas, consulta))
+
+    ahora = datetime.now(timezone.utc)
+    snapshot = _obtener_snapshot(db)
+    if snapshot:
+        snapshot.reconstruido_en = ahora
+        snapshot.actualizado_en = ahora
+    else:
+        db.add(
+            EstadisticaSnapshot(
+                nombre=SNAPSHOT_VOCACIONES, reconstruido_en=ahora, actualizado_en=ahora
+            )
+        )
+    return db.query(EstadisticaVocacion).count()
+
+
+# Retorna el snapshot, construyéndolo si aún no existe (por ejemplo, en una base nueva).
+def asegurar_snapshot_estadisticas(db):
+    snapshot = _obtener_snapshot(db)
+    if snapshot is None:
+        try:
+            reconstruir_snapshot_estadisticas(db)
+            db.commit()
+        except IntegrityError:
+            # Otra petición lo construyó al mismo tiempo
+            db.rollback()
+        snapshot = _obtener_snapshot(db)
+    return snapshot
+
+
+def _sumar_conteo(db, dimension: str, clave: str, vocacion: str, delta: int):
+    stmt = sqlite_insert(EstadisticaVocacion).values(
+        dimension=dimension, clave=clave, vocacion=vocacion, conteo=delta
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["dimension", "clave", "vocacion"],
+            set_={"conteo": EstadisticaVocacion.conteo + delta},
+        )
+    )
+
+
+# Actualiza incrementalmente el snapshot cuando se crea o cambia la vocación de un usuario.
+def registrar_vocacion_en_snapshot(db, id_usuario: int, vocacion: str, vocacion_anterior=None):
+    if vocacion == vocacion_anterior:
+        return
+    snapshot = _obtener_snapshot(db)
+    if snapshot is None:
+        # Aún no se ha construido: la primera lectura lo calculará completo
+        return
+
+    claves = [(DIMENSION_GLOBAL, "")]
+    usuario = (
+        db.query(Usuario.id_ciudad, Usuario.id_institucion, Usuario.sexo)
+        .filter(Usuario.id == id_usuario)
+        .first()
+    )
+    if usuario:
+        for dimension, valor in (
+            (DIMENSION_CIUDAD, usuario.id_ciudad),
+            (DIMENSION_INSTITUCION, usuario.id_institucion),
+            (DIMENSION_SEXO, usuario.sexo),
+        ):
+            if valor is not None:
+                claves.append((dimension, str(valor)))
+
+    for dimension, clave in claves:
+        _sumar_conteo(db, dimension, clave, vocacion, 1)
+        if vocacion_anterior is not None:
+            _sumar_conteo(db, dimension, clave, vocacion_anterior, -1)
+
+    if vocacion_anterior is not None:
+        # Las combinaciones sin usuarios no aparecen en las estadísticas
+        db.query(EstadisticaVocacion).filter(
+            EstadisticaVocacion.vocacion == vocacion_anterior,
+            EstadisticaVocacion.conteo <= 0,
+        ).delete(synchronize_session=False)
+
+    snapshot.actualizado_en = datetime.now(timezone.utc)
+
+
+# Reconstruye el snapshot en su propia sesión (tarea programada e inicialización de la base).
+def refrescar_snapshot_estadisticas():
+    db = next(get_db_session())
+    try:
+        total = reconstruir_snapshot_estadisticas(db)
+        db.commit()
+        return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# Retorna la fecha (UTC) de la última actualización del snapshot o None si no existe.
+def obtener_fecha_snapshot_estadisticas():
+    db = next(get_db_session())
+    try:
+        snapshot = _obtener_snapshot(db)
+        if snapshot is None:
+            return None
+        fecha = snapshot.actualizado_en
+        return fecha.replace(tzinfo=timezone.utc) if fecha.tzinfo is None else fecha
+    finally:
+        db.close()
+
+
+# Tarea de fondo que reconstruye el snapshot cada `intervalo` segundos.
+async def refrescar_snapshot_periodicamente(intervalo: int):
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            total = await run_blocking(refrescar_snapshot_estadisticas)
+            print(f"Snapshot de estadísticas reconstruido ({total} filas).")
+        except Exception as ex:
+            print(f"Error al reconstruir el snapshot de estadísticas: {ex}")
+
@@ -2,8 +2,12 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from ..db.database import get_db_session
 from ..schemas.sch_institucion import Institucion
+from ..core.cache import bump_version
 from ..models.mdl_institucion import InstitucionCreate, InstitucionUpdate
 
+# Versión del catálogo en el registro de versiones (ETag de los listados)
+VERSION_INSTITUCIONES = "instituciones"
+
 
 def register_institucion_service(institucion_data: InstitucionCreate, current_user):
 
@@ -34,6 +38,7 @@ def register_institucion_service(institucion_data: InstitucionCreate, current_us
 
         db.add(nueva_institucion)
         db.commit()
+        bump_version(VERSION_INSTITUCIONES)
         db.refresh(nueva_institucion)
 
         return {
@@ -72,6 +77,7 @@ def update_institucion_service(
         institucion.telefono = institucion_data.telefono or institucion.telefono
 
         db.commit()
+        bump_version(VERSION_INSTITUCIONES)
         db.refresh(institucion)
 
         return {"message": "Institución actualizada exitosamente", "id": institucion.id}
@@ -109,6 +115,7 @@ def delete_institucion_service(id: int, current_user):
 
         db.delete(institucion)
         db.commit()
+        bump_version(VERSION_INSTITUCIONES)
 
         return {"message": "Institución eliminada exitosamente"}
     except HTTPException as e:
@@ -4,6 +4,8 @@ from ..schemas.sch_pregunta import Pregunta
 from ..schemas.sch_respuesta import Respuesta
 from ..schemas.sch_test import Test
 from ..db.database import get_db_session
+from ..services.progreso_test_service import ajustar_total_preguntas_progreso
+from ..services.test_service import invalidar_cache_test
 from ..models.mdl_pregunta import PreguntaCreate, PreguntaUpdate
 
 
@@ -95,7 +97,9 @@ def create_pregunta_service(pregunta: PreguntaCreate, current_user):
             test_id=pregunta.test_id, enunciado=pregunta.enunciado
         )
         db.add(nueva_pregunta)
+        ajustar_total_preguntas_progreso(db, pregunta.test_id, 1)
         db.commit()
+        invalidar_cache_test(pregunta.test_id)
 
         return {
             "message": "Pregunta creada exitosamente.",
@@ -133,7 +137,9 @@ def update_pregunta_service(pregunta_r: PreguntaUpdate,pregunta_id, current_user
 
         # Actualizar enunciado
         pregunta.enunciado = pregunta_r.enunciado
+        test_id = pregunta.test_id
         db.commit()
+        invalidar_cache_test(test_id)
 
         return {"message": "Pregunta actualizada exitosamente."}
     except HTTPException as http_ex:
@@ -171,8 +177,11 @@ def delete_pregunta_service(pregunta_id: int, current_user):
                 detail="No se puede eliminar la pregunta porque tiene respuestas asociadas.",
             )
 
+        test_id = pregunta.test_id
         db.delete(pregunta)
+        ajustar_total_preguntas_progreso(db, test_id, -1)
         db.commit()
+        invalidar_cache_test(test_id)
 
         return {"message": "Pregunta eliminada exitosamente."}
     except HTTPException as http_ex:
@@ -0,0 +1,117 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..schemas.sch_progreso import ProgresoTestUsuario
+from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
+from ..schemas.sch_pregunta import Pregunta
+
+# Estas funciones reciben la sesión del servicio que las invoca para que el progreso
+# se actualice dentro de la misma transacción que las respuestas del usuario.
+
+
+# Registra respuestas nuevas en el progreso del usuario y retorna el registro actualizado.
+# El incremento se hace en SQL (no leyendo y reescribiendo el valor en Python) para que dos
+# peticiones simultáneas del mismo usuario no pierdan respuestas. Si el progreso aún no
+# existe, se inicializa contando una única vez preguntas y respuestas.
+def registrar_respuestas_en_progreso(db, usuario_id: int, test_id: int, nuevas: int):
+    # Las respuestas pendientes se escriben primero: así la transacción toma el escritor
+    # antes de leer el progreso y son visibles para el conteo inicial
+    db.flush()
+    filtro = (
+        ProgresoTestUsuario.usuario_id == usuario_id,
+        ProgresoTestUsuario.test_id == test_id,
+    )
+
+    contestadas = ProgresoTestUsuario.respuestas_contestadas + nuevas
+    completado = (ProgresoTestUsuario.total_preguntas > 0) & (
+        contestadas >= ProgresoTestUsuario.total_preguntas
+    )
+    actualizados = (
+        db.query(ProgresoTestUsuario)
+        .filter(*filtro)
+        .update(
+            {
+                ProgresoTestUsuario.respuestas_contestadas: contestadas,
+                ProgresoTestUsuario.completado: completado,
+            },
+            synchronize_session=False,
+        )
+    )
+
+    if not actualizados:
+        respuestas = (
+            db.query(RespuestaDeUsuario)
+            .filter(
+                RespuestaDeUsuario.usuario_id == usuario_id,
+                RespuestaDeUsuario.test_id == test_id,
+            )
+            .count()
+        )
+        total_preguntas = db.query(Pregunta).filter(Pregunta.test_id == test_id).count()
+        stmt = sqlite_insert(ProgresoTestUsuario).values(
+            usuario_id=usuario_id,
+            test_id=test_id,
+            respuestas_contestadas=respuestas,
+            total_preguntas=total_preguntas,
+            completado=0 < total_preguntas <= respuestas,
+        )
+        # Si otra petición creó el registro al mismo tiempo, su conteo no incluye las
+        # respuestas de esta transacción (aún no confirmadas): se suman como incremento
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["usuario_id", "test_id"],
+                set_={"respuestas_contestadas": contestadas, "completado": completado},
+            )
+        )
+
+    # Se vuelve a leer para obtener los valores calculados por la base
+    return db.query(ProgresoTestUsuario).filter(*filtro).populate_existing().one()
+
+
+# Ajusta el total de preguntas de todos los progresos de un test cuando cambian sus preguntas.
+def ajustar_total_preguntas_progreso(db, test_id: int, delta: int):
+    nuevo_total = ProgresoTestUsuario.total_preguntas + delta
+    db.query(ProgresoTestUsuario).filter(ProgresoTestUsuario.test_id == test_id).update(
+        {
+            ProgresoTestUsuario.total_preguntas: nuevo_total,
+            ProgresoTestUsuario.completado: (nuevo_total > 0)
+            & (ProgresoTestUsuario.respuestas_contestadas >= nuevo_total),
+        },
+        synchronize_session=False,
+    )
+
+
+# Elimina el progreso de todos los usuarios de un test (por ejemplo, al borrar sus respuestas).
+def eliminar_progreso_test(db, test_id: int):
+    db.query(ProgresoTestUsuario).filter(ProgresoTestUsuario.test_id == test_id).delete(
+        synchronize_session=False
+    )
+
+
+# Reconstruye todos los registros de progreso a partir de las respuestas existentes.
+def reconstruir_progreso_tests(db):
+    total_preguntas = dict(
+        db.query(Pregunta.test_id, func.count(Pregunta.id)).group_by(Pregunta.test_id).all()
+    )
+    contestadas = (
+        db.query(
+            RespuestaDeUsuario.usuario_id,
+            RespuestaDeUsuario.test_id,
+            func.count(RespuestaDeUsuario.id).label("cantidad"),
+        )
+        .group_by(RespuestaDeUsuario.usuario_id, RespuestaDeUsuario.test_id)
+        .all()
+    )
+
+    db.query(ProgresoTestUsuario).delete(synchronize_session=False)
+    db.add_all(
+        ProgresoTestUsuario(
+            usuario_id=fila.usuario_id,
+            test_id=fila.test_id,
+            respuestas_contestadas=fila.cantidad,
+            total_preguntas=total_preguntas.get(fila.test_id, 0),
+            completado=0 < total_preguntas.get(fila.test_id, 0) <= fila.cantidad,
+        )
+        for fila in contestadas
+    )
+    return len(contestadas)
@@ -2,8 +2,12 @@ from fastapi import HTTPException
 from sqlalchemy import func
 from ..db.database import get_db_session
 from ..schemas.sch_recurso import Recurso
+from ..core.cache import bump_version
 from ..models.mdl_recurso import RecursoCreate, RecursoUpdate
 
+# Versión del catálogo en el registro de versiones (ETag de los listados)
+VERSION_RECURSOS = "recursos"
+
 
 def register_recurso_service(recurso: RecursoCreate, current_user):
     # Verificar si el usuario tiene privilegios de administrador
@@ -28,6 +32,7 @@ def register_recurso_service(recurso: RecursoCreate, current_user):
         # Guardar en la base de datos
         db.add(nuevo_recurso)
         db.commit()
+        bump_version(VERSION_RECURSOS)
         db.refresh(nuevo_recurso)
 
         return {"message": "Recurso registrado exitosamente", "id": nuevo_recurso.id}
@@ -60,6 +65,7 @@ def edit_recurso_service(recurso_id: int, recurso_data: RecursoUpdate, current_u
         recurso.enlace = recurso_data.enlace if recurso_data.enlace is not None else recurso.enlace
 
         db.commit()
+        bump_version(VERSION_RECURSOS)
         db.refresh(recurso)
 
         return {"message": "Recurso actualizado exitosamente", "id": recurso.id}
@@ -86,6 +92,7 @@ def delete_recurso_service(recurso_id: int, current_user):
 
         db.delete(recurso)
         db.commit()
+        bump_version(VERSION_RECURSOS)
         return {"message": "Recurso eliminado exitosamente", "id": recurso_id}
     except HTTPException as http_ex:
         raise http_ex
@@ -1,11 +1,72 @@
-from sqlalchemy import func
+import base64
+import orjson
+from sqlalchemy import func, tuple_
 from fastapi import HTTPException
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
+from ..config import config
 from ..models.mdl_resena import ResenaCreate
 from ..schemas.sch_resena import Resena
 from ..schemas.sch_usuario import Usuario
 from ..db.database import get_db_session
+from .resumen_resenas_service import obtener_resumen_resenas, registrar_puntuacion_en_resumen
+from .busqueda_resenas_service import desindexar_resena, indexar_resena
+
+
+# Paginación por cursor (keyset) sobre (fecha_creacion, id): el cursor codifica la última
+# reseña entregada y la siguiente página continúa desde ella usando el índice, sin OFFSET.
+def codificar_cursor_resena(fecha_creacion, resena_id: int) -> str:
+    if isinstance(fecha_creacion, datetime):
+        fecha_creacion = fecha_creacion.date()
+    valor = f"{fecha_creacion.isoformat()}|{resena_id}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor_resena(cursor: str):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, resena_id = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return date.fromisoformat(fecha), int(resena_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido.")
+
+
+# Cursor de la página siguiente, o None si la página no está completa (no hay más reseñas)
+def siguiente_cursor_resenas(resenas: list, limit: int):
+    if len(resenas) < limit or not resenas:
+        return None
+    ultima = resenas[-1]
+    if ultima["fecha_creacion"] is None:
+        return None
+    return codificar_cursor_resena(ultima["fecha_creacion"], ultima["id"])
+
+
+# Ordena y limita la consulta: con cursor continúa después de la última reseña entregada;
+# sin cursor conserva la paginación por número de página.
+def _paginar_resenas(query, ascendente: bool, page: int, limit: int, cursor: str = None):
+    clave = tuple_(Resena.fecha_creacion, Resena.id)
+    if cursor:
+        posicion = decodificar_cursor_resena(cursor)
+        query = query.filter(clave > posicion if ascendente else clave < posicion)
+
+    if ascendente:
+        query = query.order_by(Resena.fecha_creacion.asc(), Resena.id.asc())
+    else:
+        query = query.order_by(Resena.fecha_creacion.desc(), Resena.id.desc())
+
+    if not cursor:
+        query = query.offset((page - 1) * limit)
+    return query.limit(limit).all()
+
+
+def _consulta_resenas(db):
+    return db.query(
+        Resena.id,
+        Resena.comentario,
+        Resena.puntuacion,
+        Resena.fecha_creacion,
+        Usuario.nombre.label("nombre_usuario"),
+    ).join(Usuario, Resena.id_usuario == Usuario.id)
 
 
 # Crear reseña
@@ -26,8 +87,11 @@ def create_resena_service(resena_data: ResenaCreate, current_user):
             fecha_creacion=datetime.now(timezone.utc),  # Fecha actual
         )
 
-        # Guardar en la base de datos
+        # Guardar en la base de datos junto con el resumen y el índice de búsqueda
         db.add(nueva_resena)
+        db.flush()
+        registrar_puntuacion_en_resumen(db, puntuacion=resena_data.puntuacion)
+        indexar_resena(db, nueva_resena.id, nueva_resena.comentario)
         db.commit()
         db.refresh(nueva_resena)
 
@@ -48,24 +112,11 @@ def create_resena_service(resena_data: ResenaCreate, current_user):
 
 
 # Consultar reseñas organizadas de más reciente a más antigua
-def get_resenas_paginated_desc_service(page: int, limit: int = 5):
+def get_resenas_paginated_desc_service(page: int = 1, limit: int = 5, cursor: str = None):
     db = next(get_db_session())
     try:
-        # Calcular el offset basado en la página
-        skip = (page - 1) * limit
-        resenas = (
-            db.query(
-                Resena.id,
-                Resena.comentario,
-                Resena.puntuacion,
-                Resena.fecha_creacion,
-                Usuario.nombre.label("nombre_usuario"),
-            )
-            .join(Usuario, Resena.id_usuario == Usuario.id)
-            .order_by(Resena.fecha_creacion.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        resenas = _paginar_resenas(
+            _consulta_resenas(db), ascendente=False, page=page, limit=limit, cursor=cursor
         )
         return [
             {
@@ -90,24 +141,11 @@ def get_resenas_paginated_desc_service(page: int, limit: int = 5):
 
 
 # Consultar reseñas organizadas de más antigua a más reciente
-def get_resenas_paginated_asc_service(page: int, limit: int = 5):
+def get_resenas_paginated_asc_service(page: int = 1, limit: int = 5, cursor: str = None):
     db = next(get_db_session())
     try:
-        # Calcular el offset basado en la página
-        skip = (page - 1) * limit
-        resenas = (
-            db.query(
-                Resena.id,
-                Resena.comentario,
-                Resena.puntuacion,
-                Resena.fecha_creacion,
-                Usuario.nombre.label("nombre_usuario"),
-            )
-            .join(Usuario, Resena.id_usuario == Usuario.id)
-            .order_by(Resena.fecha_creacion.asc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        resenas = _paginar_resenas(
+            _consulta_resenas(db), ascendente=True, page=page, limit=limit, cursor=cursor
         )
         return [
             {
@@ -132,25 +170,15 @@ def get_resenas_paginated_asc_service(page: int, limit: int = 5):
 
 
 # Filtrar reseñas por calificación
-def get_resenas_by_rating_service(rating: int, page: int, limit: int = 5):
+def get_resenas_by_rating_service(rating: int, page: int = 1, limit: int = 5, cursor: str = None):
     db = next(get_db_session())
     try:
-        # Calcular el offset basado en la página
-        skip = (page - 1) * limit
-        resenas = (
-            db.query(
-                Resena.id,
-                Resena.comentario,
-                Resena.puntuacion,
-                Resena.fecha_creacion,
-                Usuario.nombre.label("nombre_usuario"),
-            )
-            .join(Usuario, Resena.id_usuario == Usuario.id)
-            .filter(Resena.puntuacion == rating)
-            .order_by(Resena.fecha_creacion.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        resenas = _paginar_resenas(
+            _consulta_resenas(db).filter(Resena.puntuacion == rating),
+            ascendente=False,
+            page=page,
+            limit=limit,
+            cursor=cursor,
         )
         return [
             {
@@ -213,22 +241,26 @@ def get_resenas_by_user_id_service(user_id: int):
         db.close()
 
 
-# Calcular el promedio de puntuaciones
+# Calcular el promedio de puntuaciones (desde el resumen materializado)
 def get_average_rating_service() -> float:
-    db = next(get_db_session())
     try:
-        avg_rating = db.query(func.avg(Resena.puntuacion)).scalar()
-        return avg_rating or 0.0
+        return obtener_resumen_resenas()["average_rating"]
     except HTTPException as http_ex:
         # Propagar las excepciones HTTP específicas
-        db.rollback()
         raise http_ex
     except Exception as ex:
         # Propagar las excepciones HTTP no manejadas
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(ex))
-    finally:
-        db.close()
+
+
+# Resumen de puntuaciones: total, promedio e histograma en una sola lectura
+def get_resenas_summary_service():
+    try:
+        return obtener_resumen_resenas()
+    except HTTPException as http_ex:
+        raise http_ex
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=str(ex))
 
 
 # edicion de reseñas
@@ -255,7 +287,13 @@ def edit_resena_service(resena_id: int, resena_data: ResenaCreate, current_user)
                 status_code=400, detail="La puntuación debe estar entre 1 y 5."
             )
 
-        # Actualizar los campos de la reseña
+        # Actualizar los campos de la reseña, el resumen de puntuaciones y el índice de búsqueda
+        registrar_puntuacion_en_resumen(
+            db, puntuacion=resena_data.puntuacion, puntuacion_anterior=resena.puntuacion
+        )
+        if resena.comentario != resena_data.comentario:
+            desindexar_resena(db, resena.id, resena.comentario)
+            indexar_resena(db, resena.id, resena_data.comentario)
         resena.comentario = resena_data.comentario
         resena.puntuacion = resena_data.puntuacion
         resena.fecha_creacion = datetime.now(timezone.utc)  # Fecha de edición
@@ -302,6 +340,8 @@ def delete_resena_service(resena_id: int, current_user):
             )
 
         # Eliminar la reseña
+        registrar_puntuacion_en_resumen(db, puntuacion_anterior=resena.puntuacion)
+        desindexar_resena(db, resena.id, resena.comentario)
         db.delete(resena)
         db.commit()
 
@@ -319,26 +359,20 @@ def delete_resena_service(resena_id: int, current_user):
         db.close()
 
 
-# Contar el total de reseñas
+# Contar el total de reseñas (desde el resumen materializado)
 def count_total_resenas_service() -> int:
-    db = next(get_db_session())
     try:
-        return db.query(Resena).count()
+        return obtener_resumen_resenas()["total_resenas"]
     except HTTPException as http_ex:
         # Propagar las excepciones HTTP específicas
-        db.rollback()
         raise http_ex
     except Exception as ex:
         # Propagar las excepciones HTTP no manejadas
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(ex))
-    finally:
-        db.close()
 
 
-# Contar las reseñas por puntuación específica
+# Contar las reseñas por puntuación específica (desde el histograma del resumen)
 def count_resenas_by_rating_service(rating: int) -> int:
-    db = next(get_db_session())
     try:
         if rating < 1 or rating > 5:
             raise HTTPException(
@@ -346,46 +380,63 @@ def count_resenas_by_rating_service(rating: int) -> int:
                 detail="La puntuación debe estar entre 1 y 5.",
             )
 
-        return db.query(Resena).filter(Resena.puntuacion == rating).count()
+        return obtener_resumen_resenas()["histograma"][str(rating)]
     except HTTPException as http_ex:
         # Propagar las excepciones HTTP específicas
-        db.rollback()
         raise http_ex
     except Exception as ex:
         # Propagar las excepciones HTTP no manejadas
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(ex))
-    finally:
-        db.close()
+
+
+# Campos disponibles en el listado completo de reseñas
+CAMPOS_RESENA = ("id", "comentario", "puntuacion", "fecha_creacion", "nombre_usuario")
+
+
+def _validar_campos_resena(campos):
+    if not campos:
+        return list(CAMPOS_RESENA)
+    invalidos = [campo for campo in campos if campo not in CAMPOS_RESENA]
+    if invalidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {', '.join(invalidos)}. Disponibles: {', '.join(CAMPOS_RESENA)}.",
+        )
+    return list(dict.fromkeys(campos))
+
+
+# Consulta solo las columnas solicitadas (id y fecha_creacion siempre, para el cursor).
+# Con `largo_comentario` el comentario se recorta en la base antes de transferirse.
+def _consulta_resenas_proyectada(db, campos, largo_comentario=None):
+    columnas = [Resena.id, Resena.fecha_creacion]
+    if "comentario" in campos:
+        comentario = Resena.comentario
+        if largo_comentario:
+            comentario = func.substr(Resena.comentario, 1, largo_comentario)
+        columnas.append(comentario.label("comentario"))
+    if "puntuacion" in campos:
+        columnas.append(Resena.puntuacion)
+    if "nombre_usuario" in campos:
+        columnas.append(Usuario.nombre.label("nombre_usuario"))
+    return db.query(*columnas).join(Usuario, Resena.id_usuario == Usuario.id)
+
+
+def _proyectar_resena(fila, campos):
+    return {campo: getattr(fila, campo) for campo in campos}
 
 
 # Consultar todas las reseñas organizadas de más antigua a más reciente
-def get_all_reviews_service():
+def get_all_reviews_service(campos=None, largo_comentario: int = None):
+    campos = _validar_campos_resena(campos)
     db = next(get_db_session())
     try:
         resenas = (
-            db.query(
-                Resena.id,
-                Resena.comentario,
-                Resena.puntuacion,
-                Resena.fecha_creacion,
-                Usuario.nombre.label("nombre_usuario"),
-            )
-            .join(Usuario, Resena.id_usuario == Usuario.id)
-            .order_by(Resena.fecha_creacion.asc())
+            _consulta_resenas_proyectada(db, campos, largo_comentario)
+            .order_by(Resena.fecha_creacion.asc(), Resena.id.asc())
             .all()
         )
 
-        return [
-            {
-                "id": r.id,
-                "comentario": r.comentario,
-                "puntuacion": r.puntuacion,
-                "fecha_creacion": r.fecha_creacion,
-                "nombre_usuario": r.nombre_usuario,
-            }
-            for r in resenas
-        ]
+        return [_proyectar_resena(r, campos) for r in resenas]
     except HTTPException as http_ex:
         db.rollback()
         raise http_ex
@@ -394,3 +445,72 @@ def get_all_reviews_service():
         raise HTTPException(status_code=500, detail=str(ex))
     finally:
         db.close()
+
+
+# Página del listado completo por cursor; retorna las reseñas y el cursor siguiente
+def get_all_reviews_page_service(
+    limit: int, cursor: str = None, campos=None, largo_comentario: int = None
+):
+    campos = _validar_campos_resena(campos)
+    db = next(get_db_session())
+    try:
+        resenas = _paginar_resenas(
+            _consulta_resenas_proyectada(db, campos, largo_comentario),
+            ascendente=True,
+            page=1,
+            limit=limit,
+            cursor=cursor,
+        )
+        siguiente = None
+        if len(resenas) == limit and resenas[-1].fecha_creacion is not None:
+            siguiente = codificar_cursor_resena(resenas[-1].fecha_creacion, resenas[-1].id)
+
+        return {
+            "data": [_proyectar_resena(r, campos) for r in resenas],
+            "next_cursor": siguiente,
+        }
+    except HTTPException as http_ex:
+        db.rollback()
+        raise http_ex
+    except Exception as ex:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(ex))
+    finally:
+        db.close()
+
+
+# Genera el listado completo como NDJSON (una reseña por línea) leyendo la consulta por
+# lotes con yield_per; la sesión se cierra al terminar (o abandonar) el recorrido.
+def _stream_ndjson(db, filas, campos):
+    try:
+        lote = []
+        for fila in filas:
+            lote.append(orjson.dumps(_proyectar_resena(fila, campos)))
+            if len(lote) >= config.RESENAS_STREAM_BATCH_SIZE:
+                yield b"\n".join(lote) + b"\n"
+                lote = []
+        if lote:
+            yield b"\n".join(lote) + b"\n"
+    finally:
+        db.close()
+
+
+# Listado completo en streaming (NDJSON), opcionalmente continuando desde un cursor
+def stream_all_reviews_service(cursor: str = None, campos=None, largo_comentario: int = None):
+    campos = _validar_campos_resena(campos)
+    db = next(get_db_session())
+    try:
+        query = _consulta_resenas_proyectada(db, campos, largo_comentario)
+        if cursor:
+            posicion = decodificar_cursor_resena(cursor)
+            query = query.filter(tuple_(Resena.fecha_creacion, Resena.id) > posicion)
+        query = query.order_by(Resena.fecha_creacion.asc(), Resena.id.asc())
+        # La consulta se ejecuta aquí para que los errores se detecten antes de responder
+        filas = iter(query.yield_per(config.RESENAS_STREAM_BATCH_SIZE))
+        return _stream_ndjson(db, filas, campos)
+    except HTTPException as http_ex:
+        db.close()
+        raise http_ex
+    except Exception as ex:
+        db.close()
+        raise HTTPException(status_code=500, detail=str(ex))
@@ -4,9 +4,15 @@ from ..schemas.sch_respuesta import Respuesta
 from ..schemas.sch_pregunta import Pregunta
 from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
 from ..db.database import get_db_session
+from ..services.test_service import invalidar_cache_test
 from ..models.mdl_respuesta import RespuestaCreate, RespuestaUpdate
 
 
+# El test de una respuesta se obtiene a través de su pregunta (para invalidar la caché)
+def _obtener_test_id(db, pregunta_id: int):
+    return db.query(Pregunta.test_id).filter(Pregunta.id == pregunta_id).scalar()
+
+
 # Listar respuestas por pregunta_id
 def list_respuestas_by_pregunta(pregunta_id: int, current_user):
     if not current_user:
@@ -105,7 +111,9 @@ def create_respuesta_service(respuesta: RespuestaCreate, current_user):
             vocacion=respuesta.vocacion,
         )
         db.add(nueva_respuesta)
+        test_id = pregunta.test_id
         db.commit()
+        invalidar_cache_test(test_id)
 
         return {
             "message": "Respuesta creada exitosamente.",
@@ -144,7 +152,9 @@ def update_respuesta_service(respuesta: RespuestaUpdate,respuesta_id, current_us
         # Actualizar campos
         respuesta_db.respuesta = respuesta.respuesta
         respuesta_db.vocacion = respuesta.vocacion
+        test_id = _obtener_test_id(db, respuesta_db.pregunta_id)
         db.commit()
+        invalidar_cache_test(test_id)
 
         return {"message": "Respuesta actualizada exitosamente."}
     except HTTPException as http_ex:
@@ -184,8 +194,10 @@ def delete_respuesta_service(respuesta_id: int, current_user):
                 detail="No se puede eliminar la respuesta porque está asociada a usuarios.",
             )
 
+        test_id = _obtener_test_id(db, respuesta.pregunta_id)
         db.delete(respuesta)
         db.commit()
+        invalidar_cache_test(test_id)
 
         return {"message": "Respuesta eliminada exitosamente."}
     except HTTPException as http_ex:
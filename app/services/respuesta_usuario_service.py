@@ -1,8 +1,13 @@
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from ..services.vocacion_usuario_service import create_or_update_vocacion_usuario_service
+from ..services.progreso_test_service import (
+    eliminar_progreso_test,
+    registrar_respuestas_en_progreso,
+)
 from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
 from ..schemas.sch_test import Test
 from ..schemas.sch_pregunta import Pregunta
@@ -10,6 +15,7 @@ from ..schemas.sch_respuesta import Respuesta
 from ..schemas.sch_usuario import Usuario
 from ..db.database import get_db_session
 from ..models.mdl_respuesta_usuario import (
+    RespuestaDeUsuarioBatchCreate,
     RespuestaDeUsuarioCreate,
     RespuestaDeUsuarioUpdate,
 )
@@ -124,18 +130,17 @@ def create_respuesta_usuario_service(respuesta_data: RespuestaDeUsuarioCreate, c
             usuario_id=current_user["user_id"],
         )
 
-        # Guardar en la base de datos
+        # Guardar en la base de datos junto con el progreso del usuario en el test
         db.add(nueva_respuesta)
+        progreso = registrar_respuestas_en_progreso(
+            db, current_user["user_id"], respuesta_data.test_id, 1
+        )
+        test_completado = progreso.completado
         db.commit()
         db.refresh(nueva_respuesta)
 
         # Verificar si el test está completo
-        total_questions = db.query(Pregunta).filter(Pregunta.test_id == respuesta_data.test_id).count()
-        respuestas = db.query(RespuestaDeUsuario).filter(
-            RespuestaDeUsuario.test_id == respuesta_data.test_id,
-            RespuestaDeUsuario.usuario_id == current_user["user_id"]
-        ).all()
-        if len(respuestas) == total_questions:
+        if test_completado:
             # Si el test está completo, calcular o actualizar la vocación automáticamente.
             vocacion_result = create_or_update_vocacion_usuario_service(respuesta_data.test_id, current_user)
             return {
@@ -144,6 +149,107 @@ def create_respuesta_usuario_service(respuesta_data: RespuestaDeUsuarioCreate, c
             }
         else:
             return {"message": "Respuesta creada exitosamente.", "data": {"id": nueva_respuesta.id}}
+    except IntegrityError:
+        # El índice único (usuario, pregunta) impide responder dos veces la misma pregunta
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="La pregunta ya fue respondida. Utilice la actualización de respuestas.",
+        )
+    except HTTPException as http_ex:
+        db.rollback()
+        raise http_ex
+    except Exception as ex:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(ex))
+    finally:
+        db.close()
+
+
+# 3.1 Crear o actualizar en lote las respuestas de un test
+def create_respuestas_usuario_batch_service(batch_data: RespuestaDeUsuarioBatchCreate, current_user):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="No está autorizado.")
+
+    db = next(get_db_session())
+    try:
+        # Validar con una sola consulta que cada respuesta pertenezca a su pregunta y al test
+        respuesta_ids = {item.respuesta_id for item in batch_data.respuestas}
+        relaciones = (
+            db.query(Respuesta.id, Respuesta.pregunta_id)
+            .join(Pregunta, Pregunta.id == Respuesta.pregunta_id)
+            .filter(
+                Respuesta.id.in_(respuesta_ids),
+                Pregunta.test_id == batch_data.test_id,
+            )
+            .all()
+        )
+        pregunta_por_respuesta = {r.id: r.pregunta_id for r in relaciones}
+        invalidas = [
+            item.pregunta_id
+            for item in batch_data.respuestas
+            if pregunta_por_respuesta.get(item.respuesta_id) != item.pregunta_id
+        ]
+        if invalidas:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Los IDs proporcionados no existen o no están relacionados entre sí (preguntas: {invalidas}).",
+            )
+
+        # Cargar las respuestas ya registradas para aplicar semántica de upsert
+        pregunta_ids = [item.pregunta_id for item in batch_data.respuestas]
+        existentes = {
+            r.pregunta_id: r
+            for r in db.query(RespuestaDeUsuario)
+            .filter(
+                RespuestaDeUsuario.test_id == batch_data.test_id,
+                RespuestaDeUsuario.usuario_id == current_user["user_id"],
+                RespuestaDeUsuario.pregunta_id.in_(pregunta_ids),
+            )
+            .all()
+        }
+
+        nuevas = []
+        for item in batch_data.respuestas:
+            existente = existentes.get(item.pregunta_id)
+            if existente:
+                existente.respuesta_id = item.respuesta_id
+            else:
+                nuevas.append(
+                    RespuestaDeUsuario(
+                        test_id=batch_data.test_id,
+                        pregunta_id=item.pregunta_id,
+                        respuesta_id=item.respuesta_id,
+                        usuario_id=current_user["user_id"],
+                    )
+                )
+
+        # Guardar todo el lote y el progreso del usuario en una única transacción
+        db.add_all(nuevas)
+        progreso = registrar_respuestas_en_progreso(
+            db, current_user["user_id"], batch_data.test_id, len(nuevas)
+        )
+        test_completado = progreso.completado
+        db.commit()
+
+        resumen = {"creadas": len(nuevas), "actualizadas": len(existentes)}
+
+        # Verificar si el test está completo y calcular la vocación una sola vez
+        if test_completado:
+            vocacion_result = create_or_update_vocacion_usuario_service(batch_data.test_id, current_user)
+            return {
+                "message": "Respuestas registradas y test completado. " + vocacion_result["message"],
+                "data": {**resumen, "vocacion": vocacion_result["data"]},
+            }
+        return {"message": "Respuestas registradas exitosamente.", "data": resumen}
+    except IntegrityError:
+        # Otra solicitud del usuario registró al mismo tiempo alguna de estas preguntas y el
+        # índice único (usuario, pregunta) rechazó el lote; al reenviarlo se actualizan
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Otra solicitud registró respuestas a estas preguntas al mismo tiempo. Vuelva a enviar el lote.",
+        )
     except HTTPException as http_ex:
         db.rollback()
         raise http_ex
@@ -176,17 +282,14 @@ def update_respuesta_usuario_service(respuesta_data: RespuestaDeUsuarioUpdate, t
                 status_code=404, detail="No se encontró la respuesta de usuario."
             )
 
-        # Actualizar respuesta
+        # Actualizar respuesta (no cambia la cantidad de preguntas respondidas)
         respuesta_usuario.respuesta_id = respuesta_data.respuesta_id
+        progreso = registrar_respuestas_en_progreso(db, current_user["user_id"], test_id, 0)
+        test_completado = progreso.completado
         db.commit()
 
         # Verificar si el test está completo después de la actualización
-        total_questions = db.query(Pregunta).filter(Pregunta.test_id == test_id).count()
-        respuestas = db.query(RespuestaDeUsuario).filter(
-            RespuestaDeUsuario.test_id == test_id,
-            RespuestaDeUsuario.usuario_id == current_user["user_id"]
-        ).all()
-        if len(respuestas) == total_questions:
+        if test_completado:
             vocacion_result = create_or_update_vocacion_usuario_service(test_id, current_user)
             return {
                 "message": "Respuesta actualizada y test completado. " + vocacion_result["message"],
@@ -226,6 +329,7 @@ def delete_respuestas_usuario_admin_service(test_id: int, current_user):
 
         for respuesta in respuestas:
             db.delete(respuesta)
+        eliminar_progreso_test(db, test_id)
         db.commit()
 
         return {"message": "Respuestas eliminadas exitosamente."}
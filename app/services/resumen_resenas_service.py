@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+
+from ..schemas.sch_resena import Resena
+from ..schemas.sch_resumen_resena import ResumenResenas
+from ..db.database import get_db_session
+
+# Resumen materializado de puntuaciones (total, suma e histograma de 1 a 5 estrellas).
+# Las funciones que reciben la sesión se ejecutan dentro de la transacción del servicio
+# que las invoca, de modo que el resumen se confirma junto con la reseña.
+
+RESUMEN_ID = 1
+PUNTUACIONES = (1, 2, 3, 4, 5)
+
+
+def _columna_estrellas(puntuacion: int):
+    return f"estrellas_{puntuacion}" if puntuacion in PUNTUACIONES else None
+
+
+# Recalcula el resumen completo a partir de las reseñas existentes.
+def reconstruir_resumen_resenas(db):
+    fila = db.query(
+        func.count(Resena.id),
+        func.coalesce(func.sum(Resena.puntuacion), 0),
+        *[func.count(case((Resena.puntuacion == p, 1))) for p in PUNTUACIONES],
+    ).one()
+
+    resumen = db.get(ResumenResenas, RESUMEN_ID)
+    if resumen is None:
+        resumen = ResumenResenas(id=RESUMEN_ID)
+        db.add(resumen)
+    resumen.total, resumen.suma = fila[0], fila[1]
+    for puntuacion, conteo in zip(PUNTUACIONES, fila[2:]):
+        setattr(resumen, _columna_estrellas(puntuacion), conteo)
+    resumen.actualizado_en = datetime.now(timezone.utc)
+    return resumen
+
+
+# Retorna el resumen, construyéndolo si aún no existe (por ejemplo, en una base nueva).
+def asegurar_resumen_resenas(db):
+    resumen = db.get(ResumenResenas, RESUMEN_ID)
+    if resumen is None:
+        try:
+            reconstruir_resumen_resenas(db)
+            db.commit()
+        except IntegrityError:
+            # Otra petición lo construyó al mismo tiempo
+            db.rollback()
+        resumen = db.get(ResumenResenas, RESUMEN_ID)
+    return resumen
+
+
+# Actualiza el resumen con una reseña creada (puntuacion), eliminada (puntuacion_anterior)
+# o editada (ambas). Usa incrementos atómicos en la misma transacción del servicio.
+def registrar_puntuacion_en_resumen(db, puntuacion=None, puntuacion_anterior=None):
+    if puntuacion == puntuacion_anterior:
+        return
+
+    deltas = {"total": 0, "suma": 0}
+    for valor, signo in ((puntuacion, 1), (puntuacion_anterior, -1)):
+        if valor is None:
+            continue
+        deltas["total"] += signo
+        deltas["suma"] += signo * valor
+        columna = _columna_estrellas(valor)
+        if columna:
+            deltas[columna] = deltas.get(columna, 0) + signo
+
+    valores = {
+        getattr(ResumenResenas, columna): getattr(ResumenResenas, columna) + delta
+        for columna, delta in deltas.items()
+        if delta
+    }
+    valores[ResumenResenas.actualizado_en] = datetime.now(timezone.utc)
+    # Si el resumen aún no existe no se actualiza nada: la primera lectura lo calculará completo
+    db.query(ResumenResenas).filter(ResumenResenas.id == RESUMEN_ID).update(
+        valores, synchronize_session=False
+    )
+
+
+# Retorna el resumen como diccionario (lectura de una fila por clave primaria).
+def obtener_resumen_resenas():
+    db = next(get_db_session())
+    try:
+        resumen = asegurar_resumen_resenas(db)
+        return {
+            "total_resenas": resumen.total,
+            "average_rating": resumen.suma / resumen.total if resumen.total else 0.0,
+            "histograma": {
+                str(p): getattr(resumen, _columna_estrellas(p)) for p in PUNTUACIONES
+            },
+            "actualizado_en": resumen.actualizado_en,
+        }
+    finally:
+        db.close()
+
+
+# Recalcula el resumen en su propia sesión (inicialización de la base).
+def refrescar_resumen_resenas():
+    db = next(get_db_session())
+    try:
+        resumen = reconstruir_resumen_resenas(db)
+        db.commit()
+        return resumen.total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,13 +1,19 @@
 from fastapi import HTTPException
-from sqlalchemy import func
+from sqlalchemy import Integer, and_, cast, func
 
-from ..schemas.sch_pregunta import Pregunta
-from ..schemas.sch_respuesta_usuario import RespuestaDeUsuario
 from ..schemas.sch_test import Test
-from ..schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
 from ..schemas.sch_institucion import Institucion
 from ..schemas.sch_ciudad import Ciudad
 from ..schemas.sch_usuario import Usuario
+from ..schemas.sch_progreso import ProgresoTestUsuario
+from ..schemas.sch_estadistica import EstadisticaVocacion
+from .estadisticas_snapshot_service import (
+    DIMENSION_CIUDAD,
+    DIMENSION_GLOBAL,
+    DIMENSION_INSTITUCION,
+    DIMENSION_SEXO,
+    asegurar_snapshot_estadisticas,
+)
 from ..db.database import get_db_session
 
 
@@ -119,14 +125,12 @@ def obtener_moda_vocacion_mas_comun(current_user):
 
     db = next(get_db_session())
     try:
-        # Consultar la moda de la vocación más común
+        # Consultar la moda de la vocación más común desde el snapshot
+        asegurar_snapshot_estadisticas(db)
         moda_vocacion = (
-            db.query(
-                VocacionDeUsuarioPorTest.moda_vocacion,
-                func.count(VocacionDeUsuarioPorTest.moda_vocacion).label("conteo"),
-            )
-            .group_by(VocacionDeUsuarioPorTest.moda_vocacion)
-            .order_by(func.count(VocacionDeUsuarioPorTest.moda_vocacion).desc())
+            db.query(EstadisticaVocacion.vocacion, EstadisticaVocacion.conteo)
+            .filter(EstadisticaVocacion.dimension == DIMENSION_GLOBAL)
+            .order_by(EstadisticaVocacion.conteo.desc())
             .first()
         )
 
@@ -192,29 +196,21 @@ def vocacion_mas_comun_por_ciudad_service(current_user):
 
     db = next(get_db_session())
     try:
-        # Consulta para obtener la vocación más común por ciudad
+        # Consulta el conteo de vocaciones por ciudad desde el snapshot
+        asegurar_snapshot_estadisticas(db)
         resultados = (
             db.query(
                 Ciudad.id.label("id_ciudad"),
                 Ciudad.nombre.label("nombre_ciudad"),
                 Ciudad.latitud,
                 Ciudad.longitud,
-                VocacionDeUsuarioPorTest.moda_vocacion,
-                func.count(VocacionDeUsuarioPorTest.moda_vocacion).label("conteo"),
-            )
-            .join(Usuario, Usuario.id_ciudad == Ciudad.id)
-            .join(
-                VocacionDeUsuarioPorTest,
-                Usuario.id == VocacionDeUsuarioPorTest.id_usuario,
+                EstadisticaVocacion.vocacion.label("moda_vocacion"),
+                EstadisticaVocacion.conteo,
             )
-            .group_by(
-                Ciudad.id,
-                Ciudad.nombre,
-                Ciudad.latitud,
-                Ciudad.longitud,
-                VocacionDeUsuarioPorTest.moda_vocacion,
-            )
-            .order_by(func.count(VocacionDeUsuarioPorTest.moda_vocacion).desc())
+            .select_from(EstadisticaVocacion)
+            .join(Ciudad, Ciudad.id == cast(EstadisticaVocacion.clave, Integer))
+            .filter(EstadisticaVocacion.dimension == DIMENSION_CIUDAD)
+            .order_by(EstadisticaVocacion.conteo.desc())
             .all()
         )
 
@@ -257,39 +253,20 @@ def get_most_common_vocation_per_institution_service(current_user):
 
     db = next(get_db_session())
     try:
-        # Subconsulta para encontrar la moda de vocación por institución
-        subquery = (
-            db.query(
-                Usuario.id_institucion,
-                VocacionDeUsuarioPorTest.moda_vocacion,
-                func.count(VocacionDeUsuarioPorTest.moda_vocacion).label("vocacion_count"),
-            )
-            .join(
-                VocacionDeUsuarioPorTest,
-                Usuario.id == VocacionDeUsuarioPorTest.id_usuario,
-            )
-            .group_by(Usuario.id_institucion, VocacionDeUsuarioPorTest.moda_vocacion)
-            .subquery()
-        )
-
-        # Consulta principal para combinar instituciones con la moda de vocaciones
+        # Combinar instituciones con el conteo de vocaciones almacenado en el snapshot
+        asegurar_snapshot_estadisticas(db)
         result = (
             db.query(
                 Institucion.id,
                 Institucion.nombre,
                 Institucion.direccion,
                 Institucion.telefono,
-                subquery.c.moda_vocacion,
-                func.max(subquery.c.vocacion_count).label("max_count"),
-            )
-            .join(subquery, Institucion.id == subquery.c.id_institucion)
-            .group_by(
-                Institucion.id,
-                Institucion.nombre,
-                Institucion.direccion,
-                Institucion.telefono,
-                subquery.c.moda_vocacion,
+                EstadisticaVocacion.vocacion.label("moda_vocacion"),
+                EstadisticaVocacion.conteo.label("max_count"),
             )
+            .select_from(EstadisticaVocacion)
+            .join(Institucion, Institucion.id == cast(EstadisticaVocacion.clave, Integer))
+            .filter(EstadisticaVocacion.dimension == DIMENSION_INSTITUCION)
             .all()
         )
 
@@ -330,30 +307,15 @@ def get_most_common_vocation_per_gender_service(current_user):
 
     db = next(get_db_session())
     try:
-        # Subconsulta para encontrar la moda de vocación por sexo
-        subquery = (
-            db.query(
-                Usuario.sexo,
-                VocacionDeUsuarioPorTest.moda_vocacion,
-                func.count(VocacionDeUsuarioPorTest.moda_vocacion).label("vocacion_count"),
-            )
-            .join(
-                VocacionDeUsuarioPorTest,
-                Usuario.id == VocacionDeUsuarioPorTest.id_usuario,
-            )
-            .group_by(Usuario.sexo, VocacionDeUsuarioPorTest.moda_vocacion)
-            .subquery()
-        )
-
-        # Consulta principal para combinar sexo con la moda de vocaciones
+        # Consultar el conteo de vocaciones por sexo desde el snapshot
+        asegurar_snapshot_estadisticas(db)
         result = (
             db.query(
-                subquery.c.sexo,
-                subquery.c.moda_vocacion,
-                func.max(subquery.c.vocacion_count).label("max_count"),
+                EstadisticaVocacion.clave.label("sexo"),
+                EstadisticaVocacion.vocacion.label("moda_vocacion"),
+                EstadisticaVocacion.conteo.label("max_count"),
             )
-            .group_by(subquery.c.sexo, subquery.c.moda_vocacion)
-            .having(func.max(subquery.c.vocacion_count) == subquery.c.vocacion_count)
+            .filter(EstadisticaVocacion.dimension == DIMENSION_SEXO)
             .all()
         )
 
@@ -415,28 +377,10 @@ def count_completed_tests_service(current_user: dict):
         
     db = next(get_db_session())
     try:
-        # Subconsulta: para cada test y usuario, contamos cuántas respuestas registró el usuario,
-        # y obtenemos el total de preguntas del test.
-        subquery = (
-            db.query(
-                RespuestaDeUsuario.test_id.label("test_id"),
-                RespuestaDeUsuario.usuario_id.label("usuario_id"),
-                func.count(RespuestaDeUsuario.pregunta_id).label("cnt"),
-                # Usamos scalar_subquery() para obtener el total de preguntas para cada test.
-                db.query(func.count(Pregunta.id))
-                .filter(Pregunta.test_id == RespuestaDeUsuario.test_id)
-                .scalar_subquery()
-                .label("total_questions")
-            )
-            .group_by(RespuestaDeUsuario.test_id, RespuestaDeUsuario.usuario_id)
-            .subquery()
-        )
-        
-        # Filtrar solo las combinaciones en las que el usuario respondió todas las preguntas,
-        # y luego contar de forma distinta los test (es decir, test que fueron completados por al menos un usuario)
+        # Contar los tests distintos completados por al menos un usuario según el progreso registrado
         total_complete_tests = (
-            db.query(func.count(func.distinct(subquery.c.test_id)))
-            .filter(subquery.c.cnt == subquery.c.total_questions)
+            db.query(func.count(func.distinct(ProgresoTestUsuario.test_id)))
+            .filter(ProgresoTestUsuario.completado.is_(True))
             .scalar()
         )
 
@@ -463,17 +407,20 @@ def get_vocation_percentages_service(current_user: dict):
     
     db = next(get_db_session())
     try:
-        # Contar el total de registros en vocaciones
-        total = db.query(func.count(VocacionDeUsuarioPorTest.id)).scalar()
+        # Obtener el conteo global por vocación desde el snapshot
+        asegurar_snapshot_estadisticas(db)
+        results = (
+            db.query(
+                EstadisticaVocacion.vocacion.label("moda_vocacion"),
+                EstadisticaVocacion.conteo.label("count"),
+            )
+            .filter(EstadisticaVocacion.dimension == DIMENSION_GLOBAL)
+            .all()
+        )
+        total = sum(r.count for r in results)
         if total == 0:
             return {"data": []}
         
-        # Agrupar por modalidad de vocación y contar cuántos registros hay por cada una
-        results = db.query(
-            VocacionDeUsuarioPorTest.moda_vocacion,
-            func.count(VocacionDeUsuarioPorTest.id).label("count")
-        ).group_by(VocacionDeUsuarioPorTest.moda_vocacion).all()
-        
         percentages = []
         for r in results:
             # Calcular el porcentaje y redondearlo a entero
@@ -498,46 +445,31 @@ def get_completed_tests_by_test_service(current_user: dict):
     
     db = next(get_db_session())
     try:
-        # Subconsulta: para cada combinación (test, usuario) se cuenta cuántas respuestas ha registrado el usuario
-        # y se obtiene, mediante scalar_subquery, el total de preguntas del test.
-        subq = (
-            db.query(
-                RespuestaDeUsuario.test_id.label("test_id"),
-                RespuestaDeUsuario.usuario_id.label("usuario_id"),
-                func.count(RespuestaDeUsuario.pregunta_id).label("cnt"),
-                db.query(func.count(Pregunta.id))
-                .filter(Pregunta.test_id == RespuestaDeUsuario.test_id)
-                .scalar_subquery().label("total_questions")
-            )
-            .group_by(RespuestaDeUsuario.test_id, RespuestaDeUsuario.usuario_id)
-            .subquery()
-        )
-
-        # Filtrar solo aquellas combinaciones donde el usuario completó el test (cnt == total_questions)
+        # Contar por test los usuarios que lo completaron, incluyendo tests sin completions
         completions = (
             db.query(
-                subq.c.test_id,
-                func.count(subq.c.usuario_id).label("completions")
+                Test.id.label("test_id"),
+                Test.nombre.label("test_nombre"),
+                func.count(ProgresoTestUsuario.id).label("completions"),
+            )
+            .outerjoin(
+                ProgresoTestUsuario,
+                and_(
+                    ProgresoTestUsuario.test_id == Test.id,
+                    ProgresoTestUsuario.completado.is_(True),
+                ),
             )
-            .filter(subq.c.cnt == subq.c.total_questions)
-            .group_by(subq.c.test_id)
+            .group_by(Test.id, Test.nombre)
             .all()
         )
-
-        # Obtener todos los tests para incluir aquellos sin completions
-        tests = db.query(Test).all()
-        result = []
-        for test in tests:
-            comp = 0
-            for row in completions:
-                if row.test_id == test.id:
-                    comp = row.completions
-                    break
-            result.append({
-                "test_id": test.id,
-                "test_nombre": test.nombre,
-                "completions": comp
-            })
+        result = [
+            {
+                "test_id": row.test_id,
+                "test_nombre": row.test_nombre,
+                "completions": row.completions,
+            }
+            for row in completions
+        ]
         return {"data": result}
     except Exception as ex:
         db.rollback()
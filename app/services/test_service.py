@@ -1,13 +1,29 @@
 from fastapi import HTTPException
 from datetime import datetime, timezone
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import joinedload
 from ..models.mdl_test import TestCreate
 from ..schemas.sch_test import Test
 from ..schemas.sch_pregunta import Pregunta
+from ..schemas.sch_respuesta import Respuesta
 from ..db.database import get_db_session
+from ..core.cache import VersionedCache, bump_version
+from ..core.metrics import registrar_cache
+from ..config import config
 
+# Versión del listado de tests y de cada test en el registro de versiones de la caché
+VERSION_TESTS = "tests"
 
+_bundle_cache = registrar_cache(VersionedCache("test_bundle", config.TEST_BUNDLE_CACHE_SIZE))
+
+
+def clave_version_test(test_id: int) -> str:
+    return f"test:{test_id}"
+
+
+# Invalida la caché del test y del listado; se llama después de confirmar la escritura
+def invalidar_cache_test(*test_ids: int):
+    bump_version(VERSION_TESTS, *(clave_version_test(test_id) for test_id in test_ids))
 
 
 # Crear un nuevo test
@@ -33,6 +49,7 @@ def create_test_service(test: TestCreate, current_user):
         db.add(nuevo_test)
         db.commit()
         db.refresh(nuevo_test)
+        invalidar_cache_test(nuevo_test.id)
 
         return {
             "message": "Test registrado exitosamente.",
@@ -101,6 +118,34 @@ def list_tests_service():
     finally:
         db.close()
 
+# Listar tests desde la ruta asíncrona (ASYNC_DATABASE_ENABLED), sin ocupar hilos del pool
+async def list_tests_async_service():
+    from ..db.async_database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.execute(
+                select(
+                    Test.id,
+                    Test.nombre,
+                    Test.descripcion,
+                    Test.fecha_creacion,
+                    Test.fecha_actualizacion,
+                    func.count(Pregunta.id).label("total_preguntas"),
+                )
+                .outerjoin(Pregunta, Test.id == Pregunta.test_id)
+                .group_by(
+                    Test.id,
+                    Test.nombre,
+                    Test.descripcion,
+                    Test.fecha_creacion,
+                    Test.fecha_actualizacion,
+                )
+            )
+            return {"data": [dict(test._mapping) for test in result.all()]}
+        except Exception as ex:
+            raise HTTPException(status_code=500, detail=str(ex))
+
 # Obtener test por id
 def get_test_by_id_service(test_id: int):
     db = next(get_db_session())  # Obtener una sesión
@@ -150,6 +195,82 @@ def get_test_by_id_service(test_id: int):
     finally:
         db.close()  # Cerrar la sesión
 
+# Carga el test con sus preguntas y respuestas en una sola consulta (outer joins)
+def _cargar_test_bundle(test_id: int):
+    db = next(get_db_session())
+    try:
+        filas = (
+            db.query(
+                Test.id,
+                Test.nombre,
+                Test.descripcion,
+                Test.fecha_creacion,
+                Test.fecha_actualizacion,
+                Pregunta.id.label("pregunta_id"),
+                Pregunta.enunciado,
+                Respuesta.id.label("respuesta_id"),
+                Respuesta.respuesta,
+                Respuesta.vocacion,
+            )
+            .outerjoin(Pregunta, Test.id == Pregunta.test_id)
+            .outerjoin(Respuesta, Pregunta.id == Respuesta.pregunta_id)
+            .filter(Test.id == test_id)
+            .order_by(Pregunta.id, Respuesta.id)
+            .all()
+        )
+        if not filas:
+            raise HTTPException(status_code=404, detail="Test no encontrado")
+
+        # Agrupar las filas planas en preguntas con sus respuestas
+        preguntas = {}
+        for fila in filas:
+            if fila.pregunta_id is None:
+                continue
+            pregunta = preguntas.get(fila.pregunta_id)
+            if pregunta is None:
+                pregunta = preguntas[fila.pregunta_id] = {
+                    "id": fila.pregunta_id,
+                    "enunciado": fila.enunciado,
+                    "respuestas": [],
+                }
+            if fila.respuesta_id is not None:
+                pregunta["respuestas"].append(
+                    {
+                        "id": fila.respuesta_id,
+                        "respuesta": fila.respuesta,
+                        "vocacion": fila.vocacion,
+                    }
+                )
+
+        test = filas[0]
+        return {
+            "id": test.id,
+            "nombre": test.nombre,
+            "descripcion": test.descripcion,
+            "fecha_creacion": test.fecha_creacion,
+            "fecha_actualizacion": test.fecha_actualizacion,
+            "total_preguntas": len(preguntas),
+            "preguntas": list(preguntas.values()),
+        }
+    finally:
+        db.close()
+
+# Obtener el test completo (preguntas y respuestas), servido desde la caché versionada
+def get_test_bundle_service(test_id: int, current_user):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="No está autorizado.")
+
+    try:
+        return _bundle_cache.get_or_load(
+            clave_version_test(test_id), lambda: _cargar_test_bundle(test_id)
+        )
+    except HTTPException as http_ex:
+        # Propagar las excepciones HTTP específicas
+        raise http_ex
+    except Exception as ex:
+        # Manejar excepciones no previstas
+        raise HTTPException(status_code=500, detail=f"Error al consultar el test: {str(ex)}")
+
 # eliminar test
 def delete_test_service(test_id: int, current_user):
     # Verificar que el usuario actual sea administrador
@@ -179,6 +300,7 @@ def delete_test_service(test_id: int, current_user):
         # Eliminar el test
         db.delete(test)
         db.commit()
+        invalidar_cache_test(test_id)
         return {"message": "Test eliminado exitosamente."}
     except HTTPException as http_ex:
         # Propagar las excepciones HTTP específicas
@@ -218,6 +340,7 @@ def update_test_service(test_id: int, test_r:TestCreate, current_user):
 
         # Guardar los cambios en la base de datos
         db.commit()
+        invalidar_cache_test(test_id)
         return {"message": "Test actualizado exitosamente."}
     except HTTPException as http_ex:
         # Propagar excepciones HTTP específicas
@@ -1,12 +1,16 @@
-from email.message import EmailMessage
 import secrets
-import smtplib
 import string
 from fastapi import HTTPException
+from ..core.executor import get_executor
 from ..db.database import get_db_session
 from ..models.mdl_user import PasswordChangeRequest, UsuarioCreate, UsuarioUpdate
 from ..schemas.sch_usuario import Usuario,Ciudad,Institucion
 from .auth_service import *
+from .correo_service import (
+    encolar_correo,
+    notificar_correo_pendiente,
+    registrar_plantilla_correo,
+)
 
 
 def register_user(user: UsuarioCreate):
@@ -74,6 +78,10 @@ def login_user(email: str, password: str):
         if not verify_password(password, usuario.contrasena):
             raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
+        # Si el hash usa un costo distinto al configurado, recalcularlo en segundo plano
+        if password_needs_rehash(usuario.contrasena):
+            programar_rehash_contrasena(usuario.id, password, usuario.contrasena)
+
         # Generar token JWT
         access_token = create_access_token(
             data={
@@ -91,6 +99,33 @@ def login_user(email: str, password: str):
         # Propagar las excepciones HTTP no manejadas
         raise HTTPException(status_code=500, detail=f"Error interno: {str(ex)}")
 
+# Programa el recálculo del hash sin retrasar la respuesta del inicio de sesión
+def programar_rehash_contrasena(usuario_id: int, password: str, hash_actual: str):
+    get_executor().submit(rehash_contrasena_service, usuario_id, password, hash_actual)
+
+def rehash_contrasena_service(usuario_id: int, password: str, hash_actual: str):
+    try:
+        nuevo_hash = get_password_hash(password)
+    except HTTPException:
+        # Pool de hashing saturado: se intentará de nuevo en el próximo inicio de sesión
+        return False
+
+    db = next(get_db_session())
+    try:
+        # Solo se reemplaza si la contraseña no cambió mientras se calculaba el hash
+        actualizados = (
+            db.query(Usuario)
+            .filter(Usuario.id == usuario_id, Usuario.contrasena == hash_actual)
+            .update({Usuario.contrasena: nuevo_hash}, synchronize_session=False)
+        )
+        db.commit()
+        return actualizados == 1
+    except Exception:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
 def get_user_data_service(current_user):
     # Verificar si el usuario tiene privilegios de acceso
     if not current_user or not current_user.get("user_id"):
@@ -199,6 +234,42 @@ def edit_user_service(user_data: UsuarioUpdate, current_user):
     finally:
         db.close()
 
+PLANTILLA_RESTABLECER_CONTRASENA = "restablecer_contrasena"
+
+
+# Genera una contraseña aleatoria (por ejemplo, de 10 caracteres)
+def generar_contrasena_temporal(longitud: int = 10):
+    alphabet = string.ascii_letters + string.digits
+    return ''.join(secrets.choice(alphabet) for _ in range(longitud))
+
+
+# Construye el correo de restablecimiento al momento de enviarlo: la contraseña temporal nunca
+# se guarda en claro en la bandeja de salida. Su hash se asigna al usuario solo si el envío
+# tuvo éxito; cada reintento genera una contraseña nueva.
+def construir_correo_restablecimiento(db, correo):
+    usuario = db.get(Usuario, correo.usuario_id)
+    if not usuario:
+        raise ValueError("El usuario del correo ya no existe.")
+
+    new_password = generar_contrasena_temporal()
+    hashed_password = get_password_hash(new_password)
+
+    def confirmar():
+        usuario.contrasena = hashed_password
+
+    cuerpo = (
+        f"Hola {usuario.nombre},\n\n"
+        f"Tu contraseña ha sido restablecida automáticamente. Tu nueva contraseña es:\n\n"
+        f"{new_password}\n\n"
+        "Te recomendamos cambiarla después de iniciar sesión.\n\n"
+        "Saludos."
+    )
+    return cuerpo, confirmar
+
+
+registrar_plantilla_correo(PLANTILLA_RESTABLECER_CONTRASENA, construir_correo_restablecimiento)
+
+
 def reset_password_service(email: str):
     db = next(get_db_session())
     try:
@@ -206,40 +277,19 @@ def reset_password_service(email: str):
         usuario = db.query(Usuario).filter(Usuario.email == email).first()
         if not usuario:
             raise HTTPException(status_code=404, detail="El correo electrónico no está registrado.")
-        
-        # Generar una nueva contraseña aleatoria (por ejemplo, de 10 caracteres)
-        alphabet = string.ascii_letters + string.digits
-        new_password = ''.join(secrets.choice(alphabet) for _ in range(10))
-        
-        # Hashear la nueva contraseña
-        hashed_password = get_password_hash(new_password)
-        
-        # Actualizar la contraseña del usuario en la base de datos
-        usuario.contrasena = hashed_password
-        db.commit()
-        
-        # Construir el mensaje de correo
-        msg = EmailMessage()
-        msg["Subject"] = "Restablecimiento de contraseña"
-        msg["From"] = config.FROM_EMAIL
-        msg["To"] = usuario.email
-        msg.set_content(
-            f"Hola {usuario.nombre},\n\n"
-            f"Tu contraseña ha sido restablecida automáticamente. Tu nueva contraseña es:\n\n"
-            f"{new_password}\n\n"
-            "Te recomendamos cambiarla después de iniciar sesión.\n\n"
-            "Saludos."
+
+        # Encolar el correo: el worker de la bandeja de salida genera la nueva contraseña y la
+        # asigna al entregarlo, sin retrasar la respuesta
+        encolar_correo(
+            db,
+            destinatario=usuario.email,
+            asunto="Restablecimiento de contraseña",
+            plantilla=PLANTILLA_RESTABLECER_CONTRASENA,
+            usuario_id=usuario.id,
         )
-        
-        # Enviar el correo utilizando SMTP (autenticación básica)
-        try:
-            with smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT) as server:
-                server.starttls()
-                server.login(config.SMTP_USERNAME, config.SMTP_PASSWORD)
-                server.send_message(msg)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al enviar el correo: {str(e)}")
-        
+        db.commit()
+        notificar_correo_pendiente()
+
         return {
             "message": f"Se ha enviado un correo a {email} con tu nueva contraseña."
         }
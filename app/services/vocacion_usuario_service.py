@@ -1,5 +1,4 @@
-from typing import Counter
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
@@ -10,6 +9,34 @@ from ..schemas.sch_pregunta import Pregunta
 from ..schemas.sch_respuesta import Respuesta
 from ..schemas.sch_usuario import Usuario
 from ..db.database import get_db_session
+from .estadisticas_snapshot_service import registrar_vocacion_en_snapshot
+
+
+# Calcula el histograma de vocaciones de un usuario en un test con un único JOIN agrupado.
+# El orden es determinista: mayor conteo primero y, ante empates, orden alfabético de la vocación.
+def calcular_distribucion_vocaciones(db, id_test: int, id_usuario: int):
+    conteo = func.count(RespuestaDeUsuario.id)
+    filas = (
+        db.query(Respuesta.vocacion, conteo.label("conteo"))
+        .join(Respuesta, Respuesta.id == RespuestaDeUsuario.respuesta_id)
+        .filter(
+            RespuestaDeUsuario.test_id == id_test,
+            RespuestaDeUsuario.usuario_id == id_usuario,
+        )
+        .group_by(Respuesta.vocacion)
+        .order_by(conteo.desc(), Respuesta.vocacion.asc())
+        .all()
+    )
+
+    total = sum(fila.conteo for fila in filas)
+    return [
+        {
+            "vocacion": fila.vocacion,
+            "conteo": fila.conteo,
+            "porcentaje": round(fila.conteo * 100 / total, 2),
+        }
+        for fila in filas
+    ]
 
 
 def create_or_update_vocacion_usuario_service(id_test: int, current_user: dict):
@@ -30,41 +57,29 @@ def create_or_update_vocacion_usuario_service(id_test: int, current_user: dict):
             .first()
         )
 
-        # Obtener todas las respuestas de usuario asociadas al test
-        respuestas_usuario = (
-            db.query(RespuestaDeUsuario)
-            .filter(
-                RespuestaDeUsuario.test_id == id_test,
-                RespuestaDeUsuario.usuario_id == current_user["user_id"],
-            )
-            .all()
-        )
+        # Obtener la distribución de vocaciones con una sola consulta agregada
+        distribucion = calcular_distribucion_vocaciones(db, id_test, current_user["user_id"])
+        total_respondidas = sum(item["conteo"] for item in distribucion)
 
         # Verificar si se han respondido todas las preguntas del test
         total_preguntas = db.query(Pregunta).filter(Pregunta.test_id == id_test).count()
-        if len(respuestas_usuario) < total_preguntas:
+        if total_respondidas < total_preguntas:
             raise HTTPException(
                 status_code=400,
                 detail="No se han respondido todas las preguntas del test.",
             )
 
-        # Calcular la moda de las vocaciones basadas en las respuestas
-        vocaciones = [
-            db.query(Respuesta.vocacion)
-            .filter(Respuesta.id == respuesta.respuesta_id)
-            .scalar()
-            for respuesta in respuestas_usuario
-        ]
-        counter = Counter(vocaciones)
-        if not counter:
+        if not distribucion:
             raise HTTPException(status_code=400, detail="No se pudieron calcular las vocaciones.")
-        most_common = counter.most_common()
-        moda_vocacion = most_common[0][0]
+        moda_vocacion = distribucion[0]["vocacion"]
         # Si no existe un segundo valor distinto, se asigna la misma moda
-        moda_vocacion2 = most_common[1][0] if len(most_common) > 1 else moda_vocacion
+        moda_vocacion2 = distribucion[1]["vocacion"] if len(distribucion) > 1 else moda_vocacion
 
         if vocacion_usuario:
-            # Actualizar vocación existente
+            # Actualizar vocación existente y el snapshot de estadísticas
+            registrar_vocacion_en_snapshot(
+                db, current_user["user_id"], moda_vocacion, vocacion_usuario.moda_vocacion
+            )
             vocacion_usuario.moda_vocacion = moda_vocacion
             vocacion_usuario.moda_vocacion2 = moda_vocacion2
             db.commit()
@@ -75,6 +90,7 @@ def create_or_update_vocacion_usuario_service(id_test: int, current_user: dict):
                     "id": vocacion_usuario.id,
                     "moda_vocacion": moda_vocacion,
                     "moda_vocacion2": moda_vocacion2,
+                    "distribucion": distribucion,
                 },
             }
         else:
@@ -86,6 +102,7 @@ def create_or_update_vocacion_usuario_service(id_test: int, current_user: dict):
                 moda_vocacion2=moda_vocacion2,
             )
             db.add(nueva_vocacion)
+            registrar_vocacion_en_snapshot(db, current_user["user_id"], moda_vocacion)
             db.commit()
             db.refresh(nueva_vocacion)
             return {
@@ -94,6 +111,7 @@ def create_or_update_vocacion_usuario_service(id_test: int, current_user: dict):
                     "id": nueva_vocacion.id,
                     "moda_vocacion": moda_vocacion,
                     "moda_vocacion2": moda_vocacion2,
+                    "distribucion": distribucion,
                 },
             }
     except HTTPException as http_ex:
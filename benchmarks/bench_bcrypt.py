@@ -0,0 +1,68 @@
+"""
+Benchmark de costo de bcrypt.
+
+Mide cuántos hashes por segundo se obtienen por núcleo y con todos los núcleos para
+distintos valores de HASHING_BCRYPT_ROUNDS, y estima la capacidad de inicios de sesión
+(cada inicio de sesión ejecuta una verificación con el mismo costo que un hash).
+
+Uso (desde la raíz del proyecto, con el archivo .env configurado):
+    python -m benchmarks.bench_bcrypt --rounds 10 11 12 13 --segundos 3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.password_pool import crear_contexto_hashing
+
+
+# Calcula hashes durante `segundos` y retorna la cantidad obtenida
+def _hashes_durante(rounds: int, segundos: float) -> int:
+    contexto = crear_contexto_hashing(rounds)
+    contexto.hash("calentamiento")
+    total = 0
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        contexto.hash("contraseña-de-prueba")
+        total += 1
+    return total
+
+
+def medir(rounds: int, segundos: float, workers: int):
+    inicio = time.perf_counter()
+    un_nucleo = _hashes_durante(rounds, segundos) / (time.perf_counter() - inicio)
+
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+        # Arrancar los procesos antes de medir
+        list(pool.map(_hashes_durante, [rounds] * workers, [0.0] * workers))
+        inicio = time.perf_counter()
+        totales = list(pool.map(_hashes_durante, [rounds] * workers, [segundos] * workers))
+        todos = sum(totales) / (time.perf_counter() - inicio)
+
+    return {
+        "rounds": rounds,
+        "ms_por_hash": round(1000 / un_nucleo, 1),
+        "hashes_por_segundo_por_nucleo": round(un_nucleo, 2),
+        "hashes_por_segundo_total": round(todos, 2),
+        "workers": workers,
+        # Logins por minuto que soporta el pool con todos los núcleos ocupados
+        "logins_por_minuto_estimados": int(todos * 60),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del costo de bcrypt")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    resultados = [medir(rounds, args.segundos, args.workers) for rounds in args.rounds]
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark de concurrencia de la API.
+
+Mide la latencia (p50/p95/p99) de un endpoint liviano (/city/list) mientras se
+ejecutan en paralelo consultas pesadas de estadísticas (/statics/gender/vocation).
+Se comparan dos modos:
+    - inline: los servicios se ejecutan directamente en el event loop (comportamiento anterior).
+    - pool:   los servicios se ejecutan en el pool acotado de hilos (run_blocking).
+
+Uso (desde la raíz del proyecto, con el archivo .env configurado):
+    python -m benchmarks.bench_concurrency --usuarios 20000 --peticiones 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# La base de datos del benchmark se crea en un directorio temporal
+_directorio = tempfile.mkdtemp(prefix="bench_concurrencia_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.database import engine  # noqa: E402
+from app.db.setup_database import create_schema, insert_initial_data  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routers import (  # noqa: E402
+    auth, ciudad, csv, institucion, preguntas, recursos, resenas, respuestaUsuario,
+    respuestas, statics, tests, users, vocacionUsuario,
+)
+from app.schemas.sch_test import Test  # noqa: E402
+from app.schemas.sch_usuario import Usuario  # noqa: E402
+from app.schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest  # noqa: E402
+from app.services.auth_service import create_access_token  # noqa: E402
+
+ROUTERS = [
+    auth, ciudad, csv, institucion, preguntas, recursos, resenas, respuestaUsuario,
+    respuestas, statics, tests, users, vocacionUsuario,
+]
+VOCACIONES = ["Ingeniería", "Salud", "Artes", "Ciencias sociales", "Administración", "Educación"]
+
+
+# Ejecuta el servicio directamente en el event loop (sin pool de hilos)
+async def run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def poblar_base_de_datos(usuarios: int, semilla: int):
+    create_schema()
+    insert_initial_data()
+    rnd = random.Random(semilla)
+    with engine.begin() as connection:
+        test_id = connection.execute(
+            insert(Test).values(nombre="Test benchmark", descripcion="Benchmark")
+        ).inserted_primary_key[0]
+        connection.execute(
+            insert(Usuario),
+            [
+                {
+                    "nombre": f"Usuario {i}",
+                    "email": f"usuario{i}@bench.local",
+                    "sexo": rnd.choice(["Masculino", "Femenino"]),
+                    "contrasena": "x",
+                    "tipo_usuario": "comun",
+                    "id_ciudad": rnd.randint(1, 20),
+                }
+                for i in range(usuarios)
+            ],
+        )
+        primer_id = connection.exec_driver_sql(
+            "SELECT MIN(id) FROM usuarios WHERE tipo_usuario = 'comun'"
+        ).scalar()
+        connection.execute(
+            insert(VocacionDeUsuarioPorTest),
+            [
+                {
+                    "id_usuario": primer_id + i,
+                    "id_test": test_id,
+                    "moda_vocacion": rnd.choice(VOCACIONES),
+                }
+                for i in range(usuarios)
+            ],
+        )
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+async def ejecutar_carga(peticiones: int, pesadas: int, intervalo_ms: float):
+    # Carga de lazo abierto: cada petición tiene un instante de inicio programado y su
+    # latencia se mide desde ese instante, de modo que el tiempo que el event loop
+    # permanece bloqueado se refleja en las peticiones que debían ejecutarse mientras tanto.
+    token = create_access_token({"user_id": 1, "email": "admin@bench.local", "tipo_usuario": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    latencias = []
+    errores = 0
+    cada_pesada = max(1, peticiones // max(1, pesadas))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        inicio = time.perf_counter()
+
+        async def liviana(programada):
+            nonlocal errores
+            await asyncio.sleep(max(0.0, programada - time.perf_counter()))
+            response = await client.get("/city/list")
+            latencias.append((time.perf_counter() - programada) * 1000)
+            errores += response.status_code != 200
+
+        async def pesada(programada):
+            nonlocal errores
+            await asyncio.sleep(max(0.0, programada - time.perf_counter()))
+            response = await client.get("/statics/gender/vocation", headers=headers)
+            errores += response.status_code != 200
+
+        tareas = []
+        for i in range(peticiones):
+            programada = inicio + i * intervalo_ms / 1000
+            tareas.append(liviana(programada))
+            if i % cada_pesada == 0 and i // cada_pesada < pesadas:
+                tareas.append(pesada(programada))
+        await asyncio.gather(*tareas)
+        duracion = time.perf_counter() - inicio
+
+    return {
+        "peticiones": peticiones,
+        "consultas_pesadas": len(tareas) - peticiones,
+        "errores": errores,
+        "duracion_s": round(duracion, 3),
+        "p50_ms": round(statistics.median(latencias), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concurrencia de la API")
+    parser.add_argument("--usuarios", type=int, default=20000)
+    parser.add_argument("--peticiones", type=int, default=200)
+    parser.add_argument("--pesadas", type=int, default=8)
+    parser.add_argument("--intervalo-ms", type=float, default=5.0)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    poblar_base_de_datos(args.usuarios, args.semilla)
+
+    resultados = {}
+    for modo in ("inline", "pool"):
+        originales = {router: router.run_blocking for router in ROUTERS}
+        if modo == "inline":
+            for router in ROUTERS:
+                router.run_blocking = run_inline
+        try:
+            resultados[modo] = asyncio.run(
+                ejecutar_carga(args.peticiones, args.pesadas, args.intervalo_ms)
+            )
+        finally:
+            for router, original in originales.items():
+                router.run_blocking = original
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
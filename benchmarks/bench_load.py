@@ -0,0 +1,308 @@
+"""
+Prueba de carga de la API con cohortes de estudiantes.
+
+Ejecuta la aplicación real (app.main:app, con su lifespan) dentro del proceso mediante
+httpx.AsyncClient y simula una clase completa que presenta un test al mismo tiempo:
+    - estudiantes: inician sesión (/auth/login), listan los tests, obtienen el test
+      completo (/tests/{test_id}/bundle) y envían sus respuestas en lotes
+      (/respuestaUsuario/create/batch) hasta completarlo, lo que calcula su vocación.
+    - administradores: inician sesión y consultan en ciclo todas las rutas GET de
+      /statics/* y las descargas de /csv/* mientras los estudiantes siguen activos.
+
+La base se genera con app.db.synthetic_data (usuarios de fondo con sus respuestas) en un
+directorio temporal. El reporte JSON incluye el throughput, p50/p95/p99 por endpoint,
+los errores por bloqueo de SQLite ("database is locked") y el retraso del event loop,
+para comparar versiones y detectar servicios que bloquean el loop o compiten por la base.
+
+Uso (desde la raíz del proyecto, con el archivo .env configurado):
+    python -m benchmarks.bench_load --usuarios 20000 --estudiantes 60 --admins 3 --salida carga.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+# La base de datos de la prueba se crea en un directorio temporal
+_directorio = tempfile.mkdtemp(prefix="bench_carga_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.config import config  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.db.setup_database import create_schema, insert_initial_data  # noqa: E402
+from app.db.synthetic_data import (  # noqa: E402
+    CONTRASENA_SINTETICA,
+    EMAIL_SINTETICO,
+    generar_datos_sinteticos,
+)
+from app.main import app  # noqa: E402
+
+# Fragmentos del mensaje de sqlite3.OperationalError cuando la base está bloqueada
+MENSAJES_BLOQUEO = ("database is locked", "database table is locked")
+
+# Periodo del muestreo del retraso del event loop
+INTERVALO_SONDA_S = 0.01
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def poblar_base_de_datos(args):
+    create_schema()
+    insert_initial_data()
+    return generar_datos_sinteticos(
+        engine,
+        usuarios=args.usuarios,
+        tests=args.tests,
+        tests_por_usuario=1,
+        preguntas_min=args.preguntas_min,
+        preguntas_max=args.preguntas_max,
+        semilla=args.semilla,
+    )
+
+
+# Asigna a cada estudiante (usuario sintético) un test que aún no ha empezado, para que su
+# envío recorra el camino completo: respuestas nuevas, progreso y cálculo de la vocación.
+def planificar_estudiantes(estudiantes: int):
+    with engine.connect() as conexion:
+        tests = [fila[0] for fila in conexion.execute(text("SELECT id FROM tests ORDER BY id"))]
+        usuarios = {
+            fila.email: fila.id
+            for fila in conexion.execute(
+                text("SELECT id, email FROM usuarios WHERE tipo_usuario = 'comun'")
+            )
+        }
+        iniciados = defaultdict(set)
+        for usuario_id, test_id in conexion.execute(
+            text("SELECT usuario_id, test_id FROM progreso_tests_usuario")
+        ):
+            iniciados[usuario_id].add(test_id)
+
+    plan = []
+    for numero in range(estudiantes):
+        email = EMAIL_SINTETICO.format(numero=numero)
+        if email not in usuarios:
+            raise SystemExit(f"No existe el usuario sintético {email}: aumente --usuarios.")
+        pendientes = [test_id for test_id in tests if test_id not in iniciados[usuarios[email]]]
+        if not pendientes:
+            raise SystemExit("Los estudiantes ya iniciaron todos los tests: aumente --tests.")
+        plan.append((email, pendientes[numero % len(pendientes)]))
+    return plan
+
+
+# Rutas GET sin parámetros de /statics y /csv, tomadas de la aplicación
+def rutas_administracion():
+    return sorted(
+        ruta.path
+        for ruta in app.routes
+        if ruta.path.startswith(("/statics/", "/csv/"))
+        and "GET" in getattr(ruta, "methods", ())
+        and "{" not in ruta.path
+    )
+
+
+class Mediciones:
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.bloqueos = defaultdict(int)
+        self.estados = defaultdict(lambda: defaultdict(int))
+        # Primer mensaje de error de cada endpoint, para diagnosticar sin repetir la prueba
+        self.ejemplos_error = {}
+
+    # Ejecuta la petición y registra su latencia bajo `nombre` (método y plantilla de la ruta)
+    async def medir(self, client, metodo: str, nombre: str, url: str, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            response = await client.request(metodo, url, **kwargs)
+        except Exception as ex:
+            self.latencias[nombre].append((time.perf_counter() - inicio) * 1000)
+            self.errores[nombre] += 1
+            self.estados[nombre][type(ex).__name__] += 1
+            self.ejemplos_error.setdefault(nombre, repr(ex)[:300])
+            return None
+        self.latencias[nombre].append((time.perf_counter() - inicio) * 1000)
+        self.estados[nombre][str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errores[nombre] += 1
+            self.ejemplos_error.setdefault(nombre, response.text[:300])
+            if any(mensaje in response.text for mensaje in MENSAJES_BLOQUEO):
+                self.bloqueos[nombre] += 1
+        return response
+
+    def resumen(self, duracion: float):
+        endpoints = {}
+        for nombre in sorted(self.latencias):
+            latencias = self.latencias[nombre]
+            endpoints[nombre] = {
+                "peticiones": len(latencias),
+                "errores": self.errores[nombre],
+                "bloqueos_db": self.bloqueos[nombre],
+                "estados": dict(self.estados[nombre]),
+                "throughput_rps": round(len(latencias) / duracion, 2),
+                "p50_ms": round(statistics.median(latencias), 2),
+                "p95_ms": round(percentil(latencias, 95), 2),
+                "p99_ms": round(percentil(latencias, 99), 2),
+                "max_ms": round(max(latencias), 2),
+            }
+            if nombre in self.ejemplos_error:
+                endpoints[nombre]["ejemplo_error"] = self.ejemplos_error[nombre]
+        return endpoints
+
+
+async def iniciar_sesion(client, mediciones, email: str, contrasena: str):
+    response = await mediciones.medir(
+        client, "POST", "POST /auth/login", "/auth/login",
+        json={"email": email, "password": contrasena},
+    )
+    if response is None or response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def estudiante(client, mediciones, email, test_id, por_envio, inicio, resultado):
+    await asyncio.sleep(max(0.0, inicio - time.perf_counter()))
+    headers = await iniciar_sesion(client, mediciones, email, CONTRASENA_SINTETICA)
+    if headers is None:
+        return
+    await mediciones.medir(client, "GET", "GET /tests/list", "/tests/list", headers=headers)
+    response = await mediciones.medir(
+        client, "GET", "GET /tests/{test_id}/bundle", f"/tests/{test_id}/bundle", headers=headers
+    )
+    if response is None or response.status_code != 200:
+        return
+
+    # Cada estudiante elige una opción al azar por pregunta y envía las respuestas por páginas
+    rnd = random.Random(email)
+    respuestas = [
+        {"pregunta_id": pregunta["id"], "respuesta_id": rnd.choice(pregunta["respuestas"])["id"]}
+        for pregunta in response.json()["preguntas"]
+        if pregunta["respuestas"]
+    ]
+    for desde in range(0, len(respuestas), por_envio):
+        response = await mediciones.medir(
+            client, "POST", "POST /respuestaUsuario/create/batch", "/respuestaUsuario/create/batch",
+            headers=headers,
+            json={"test_id": test_id, "respuestas": respuestas[desde:desde + por_envio]},
+        )
+        if response is None or response.status_code != 200:
+            return
+    if "vocacion" in response.json().get("data", {}):
+        resultado["completados"] += 1
+
+
+async def administrador(client, mediciones, rutas, pausa_s, activos: asyncio.Event):
+    headers = await iniciar_sesion(client, mediciones, config.ADMIN_EMAIL, config.ADMIN_PASSWORD)
+    if headers is None:
+        return
+    while activos.is_set():
+        for ruta in rutas:
+            if not activos.is_set():
+                return
+            await mediciones.medir(client, "GET", f"GET {ruta}", ruta, headers=headers)
+            await asyncio.sleep(pausa_s)
+
+
+# Mide cuánto tarda el event loop en despertar una tarea dormida: el exceso sobre el
+# intervalo es el tiempo en que el loop estuvo ocupado (servicios bloqueantes en el loop).
+async def sonda_event_loop(retrasos, activos: asyncio.Event):
+    while activos.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO_SONDA_S)
+        retrasos.append(max(0.0, (time.perf_counter() - inicio - INTERVALO_SONDA_S) * 1000))
+
+
+async def ejecutar_carga(args, plan):
+    mediciones = Mediciones()
+    resultado = {"completados": 0}
+    retrasos = []
+    activos = asyncio.Event()
+    activos.set()
+
+    rutas = rutas_administracion()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            sonda = asyncio.create_task(sonda_event_loop(retrasos, activos))
+            admins = [
+                asyncio.create_task(
+                    administrador(client, mediciones, rutas, args.pausa_admin_ms / 1000, activos)
+                )
+                for _ in range(args.admins)
+            ]
+
+            # Los estudiantes llegan repartidos en `rampa_s` segundos (0 = todos a la vez)
+            inicio = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    estudiante(
+                        client, mediciones, email, test_id, args.respuestas_por_envio,
+                        inicio + args.rampa_s * numero / max(1, len(plan)), resultado,
+                    )
+                    for numero, (email, test_id) in enumerate(plan)
+                )
+            )
+            duracion = time.perf_counter() - inicio
+            activos.clear()
+            await asyncio.gather(sonda, *admins)
+
+    endpoints = mediciones.resumen(duracion)
+    total = sum(endpoint["peticiones"] for endpoint in endpoints.values())
+    return {
+        "estudiantes": len(plan),
+        "tests_completados": resultado["completados"],
+        "admins": args.admins,
+        "duracion_s": round(duracion, 3),
+        "peticiones": total,
+        "throughput_rps": round(total / duracion, 2),
+        "errores": sum(endpoint["errores"] for endpoint in endpoints.values()),
+        "bloqueos_db": sum(endpoint["bloqueos_db"] for endpoint in endpoints.values()),
+        "retraso_event_loop_ms": {
+            "p50": round(statistics.median(retrasos), 2) if retrasos else 0.0,
+            "p99": round(percentil(retrasos, 99), 2) if retrasos else 0.0,
+            "max": round(max(retrasos), 2) if retrasos else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con cohortes de estudiantes")
+    parser.add_argument("--usuarios", type=int, default=20000)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--preguntas-min", type=int, default=50)
+    parser.add_argument("--preguntas-max", type=int, default=120)
+    parser.add_argument("--estudiantes", type=int, default=60)
+    parser.add_argument("--admins", type=int, default=3)
+    parser.add_argument("--respuestas-por-envio", type=int, default=10)
+    parser.add_argument("--rampa-s", type=float, default=0.0)
+    parser.add_argument("--pausa-admin-ms", type=float, default=200.0)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo donde guardar el reporte JSON")
+    args = parser.parse_args()
+
+    datos = poblar_base_de_datos(args)
+    plan = planificar_estudiantes(args.estudiantes)
+    reporte = {"datos": datos, **asyncio.run(ejecutar_carga(args, plan))}
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
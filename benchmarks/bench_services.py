@@ -0,0 +1,203 @@
+"""
+Benchmark de regresión de los servicios.
+
+Ejecuta cada servicio contra una base SQLite generada con app.db.synthetic_data (tamaño y
+semilla fijos) y registra su tiempo (mediana de varias ejecuciones) y la cantidad de
+sentencias SQL que ejecuta. Cubre create_or_update_vocacion_usuario_service,
+list_respuestas_usuario y todas las funciones públicas de statics_service y csv_service
+(los CSV se recorren completos, igual que al descargarlos).
+
+Los resultados se comparan con la línea base guardada (benchmarks/baseline_services.json):
+el proceso termina con código 1 si un servicio ejecuta más consultas que su línea base o
+si su tiempo supera la tolerancia. Los conteos de consultas no dependen de la máquina; los
+tiempos sí, así que la línea base debe regenerarse en la máquina donde se compara.
+
+Uso (desde la raíz del proyecto, con el archivo .env configurado):
+    python -m benchmarks.bench_services                  # compara con la línea base
+    python -m benchmarks.bench_services --actualizar     # guarda los resultados como línea base
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# La base de datos del benchmark se crea en un directorio temporal. Se activa el conteo de
+# consultas por bloque y se silencia el registro de consultas lentas.
+_directorio = tempfile.mkdtemp(prefix="bench_servicios_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+os.environ["QUERY_DIAGNOSTICS_ENABLED"] = "true"
+os.environ["SLOW_QUERY_MS"] = "0"
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.query_diagnostics import presupuesto_consultas  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.db.setup_database import create_schema, insert_initial_data  # noqa: E402
+from app.db.synthetic_data import generar_datos_sinteticos  # noqa: E402
+from app.services import csv_service, statics_service  # noqa: E402
+from app.services.respuesta_usuario_service import list_respuestas_usuario  # noqa: E402
+from app.services.vocacion_usuario_service import (  # noqa: E402
+    create_or_update_vocacion_usuario_service,
+)
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_services.json")
+
+
+def poblar_base_de_datos(parametros: dict):
+    create_schema()
+    insert_initial_data()
+    generar_datos_sinteticos(engine, **parametros)
+
+
+# Administrador y un estudiante que completó un test (para los servicios de usuario común)
+def obtener_usuarios():
+    with engine.connect() as conexion:
+        admin = conexion.execute(
+            text("SELECT id, email FROM usuarios WHERE tipo_usuario = 'admin' ORDER BY id LIMIT 1")
+        ).one()
+        estudiante = conexion.execute(
+            text(
+                "SELECT u.id, u.email, p.test_id FROM progreso_tests_usuario p "
+                "JOIN usuarios u ON u.id = p.usuario_id WHERE p.completado "
+                "ORDER BY p.id LIMIT 1"
+            )
+        ).one()
+    return (
+        {"user_id": admin.id, "email": admin.email, "tipo_usuario": "admin"},
+        {"user_id": estudiante.id, "email": estudiante.email, "tipo_usuario": "comun"},
+        estudiante.test_id,
+    )
+
+
+# Funciones públicas definidas en el módulo (no las importadas de otros módulos)
+def funciones_publicas(modulo):
+    return [
+        (nombre, funcion)
+        for nombre, funcion in inspect.getmembers(modulo, inspect.isfunction)
+        if funcion.__module__ == modulo.__name__ and not nombre.startswith("_")
+    ]
+
+
+def casos(admin: dict, estudiante: dict, test_id: int):
+    lista = [
+        (
+            "vocacion_usuario_service.create_or_update_vocacion_usuario_service",
+            functools.partial(create_or_update_vocacion_usuario_service, test_id, estudiante),
+        ),
+        (
+            "respuesta_usuario_service.list_respuestas_usuario",
+            functools.partial(list_respuestas_usuario, test_id, estudiante),
+        ),
+    ]
+    for modulo in (statics_service, csv_service):
+        prefijo = modulo.__name__.rsplit(".", 1)[-1]
+        for nombre, funcion in funciones_publicas(modulo):
+            # Los servicios de estadísticas reciben el usuario actual; algunos CSV no
+            argumentos = (admin,) if inspect.signature(funcion).parameters else ()
+            lista.append((f"{prefijo}.{nombre}", functools.partial(funcion, *argumentos)))
+    return lista
+
+
+def ejecutar(funcion):
+    resultado = funcion()
+    # Los CSV se generan al recorrerlos: sus consultas ocurren durante el recorrido
+    if inspect.isgenerator(resultado):
+        for _ in resultado:
+            pass
+
+
+# Mediana del tiempo y máximo de consultas en `repeticiones` ejecuciones, tras una de
+# calentamiento (la primera puede construir el snapshot de estadísticas)
+def medir(nombre: str, funcion, repeticiones: int):
+    ejecutar(funcion)
+    tiempos, consultas = [], 0
+    for _ in range(repeticiones):
+        with presupuesto_consultas(ruta=nombre) as diagnostico:
+            inicio = time.perf_counter()
+            ejecutar(funcion)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = max(consultas, diagnostico.total)
+    return {"tiempo_ms": round(statistics.median(tiempos), 3), "consultas": consultas}
+
+
+def comparar(resultados: dict, base: dict, tolerancia_tiempo: float, margen_ms: float):
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            continue
+        if actual["consultas"] > anterior["consultas"]:
+            regresiones.append(
+                f"{nombre}: {actual['consultas']} consultas (línea base: {anterior['consultas']})"
+            )
+        limite = anterior["tiempo_ms"] * (1 + tolerancia_tiempo) + margen_ms
+        if actual["tiempo_ms"] > limite:
+            regresiones.append(
+                f"{nombre}: {actual['tiempo_ms']:.1f} ms (línea base: "
+                f"{anterior['tiempo_ms']:.1f} ms, límite: {limite:.1f} ms)"
+            )
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de regresión de los servicios")
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--tolerancia-tiempo", type=float, default=0.5,
+                        help="aumento relativo permitido del tiempo (0.5 = 50%%)")
+    parser.add_argument("--margen-ms", type=float, default=5.0,
+                        help="margen absoluto para servicios muy rápidos")
+    parser.add_argument("--linea-base", default=LINEA_BASE)
+    parser.add_argument("--actualizar", action="store_true",
+                        help="guardar los resultados como nueva línea base")
+    args = parser.parse_args()
+
+    parametros = {"usuarios": args.usuarios, "tests": args.tests, "semilla": args.semilla}
+    poblar_base_de_datos(parametros)
+    admin, estudiante, test_id = obtener_usuarios()
+    resultados = {
+        nombre: medir(nombre, funcion, args.repeticiones)
+        for nombre, funcion in casos(admin, estudiante, test_id)
+    }
+
+    if args.actualizar:
+        with open(args.linea_base, "w", encoding="utf-8") as archivo:
+            json.dump({"datos": parametros, "servicios": resultados}, archivo, indent=2,
+                      ensure_ascii=False)
+            archivo.write("\n")
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        print(f"Línea base guardada en {args.linea_base}")
+        return
+
+    with open(args.linea_base, encoding="utf-8") as archivo:
+        linea_base = json.load(archivo)
+    if linea_base["datos"] != parametros:
+        sys.exit(
+            f"La línea base se generó con otros datos ({linea_base['datos']}): "
+            "use los mismos parámetros o regenérela con --actualizar."
+        )
+
+    regresiones = comparar(
+        resultados, linea_base["servicios"], args.tolerancia_tiempo, args.margen_ms
+    )
+    sin_linea_base = sorted(set(resultados) - set(linea_base["servicios"]))
+    print(
+        json.dumps(
+            {"servicios": resultados, "sin_linea_base": sin_linea_base, "regresiones": regresiones},
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    if regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
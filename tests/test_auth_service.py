@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 import warnings
 from datetime import datetime, timedelta, timezone
@@ -5,12 +6,15 @@ from unittest.mock import patch
 
 from jose import jwt, JWTError, ExpiredSignatureError
 from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 
 from app.services.auth_service import (
     get_password_hash,
     verify_password,
     create_access_token,
     verify_jwt_token,
+    get_current_user,
+    _token_cache,
 )
 from app.config import config
 
@@ -28,6 +32,7 @@ class TestAuthService(unittest.TestCase):
         self.password = "mysecretpassword"
         # Generar un token válido utilizando la función del servicio
         self.valid_token = create_access_token(self.user_data)
+        _token_cache.clear()
 
     def test_get_password_hash_and_verify_password(self):
         """Verifica que la contraseña se hashee y se valide correctamente."""
@@ -78,3 +83,29 @@ class TestAuthService(unittest.TestCase):
             verify_jwt_token(token)
         self.assertEqual(context.exception.status_code, 401)
         self.assertIn("Token inválido o mal formado", context.exception.detail)
+
+    def test_verify_jwt_token_reutiliza_token_verificado(self):
+        """El segundo uso del mismo token no vuelve a decodificarlo."""
+        with patch("app.services.auth_service.jwt.decode", wraps=jwt.decode) as mock_decode:
+            primero = verify_jwt_token(self.valid_token)
+            segundo = verify_jwt_token(self.valid_token)
+        mock_decode.assert_called_once()
+        self.assertEqual(primero, segundo)
+        self.assertEqual(segundo["user_id"], self.user_data["user_id"])
+        # Cada llamada recibe su propia copia de los datos
+        segundo["tipo_usuario"] = "comun"
+        self.assertEqual(verify_jwt_token(self.valid_token)["tipo_usuario"], "admin")
+
+    @patch("app.services.auth_service.jwt.decode")
+    def test_verify_jwt_token_invalido_no_se_guarda(self, mock_decode):
+        """Un token rechazado se vuelve a verificar en cada uso."""
+        mock_decode.side_effect = JWTError("Invalid token")
+        for _ in range(2):
+            with self.assertRaises(HTTPException):
+                verify_jwt_token("invalid.token.string")
+        self.assertEqual(mock_decode.call_count, 2)
+
+    def test_get_current_user_retorna_la_informacion_del_token(self):
+        credenciales = HTTPAuthorizationCredentials(scheme="Bearer", credentials=self.valid_token)
+        user_info = asyncio.run(get_current_user(credenciales))
+        self.assertEqual(user_info["email"], self.user_data["email"])
@@ -0,0 +1,123 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.sch_base import Base
+from app.schemas.sch_resena import Resena
+from app.schemas.sch_usuario import Usuario
+from app.services.busqueda_resenas_service import (
+    buscar_resenas_service,
+    desindexar_resena,
+    es_tabla_fts,
+    indexar_resena,
+    reconstruir_indice_resenas,
+)
+
+admin_user = {"user_id": 1, "tipo_usuario": "admin"}
+
+
+class TestBusquedaResenasService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.db = self.Session()
+        self.db.add(Usuario(id=1, nombre="Ana", email="ana@x.com", sexo="Femenino", contrasena="x"))
+        comentarios = [
+            ("La orientación vocacional fue excelente", 5),
+            ("El test es muy largo", 2),
+            ("Buena orientación y buen test", 4),
+        ]
+        for comentario, puntuacion in comentarios:
+            self.db.add(Resena(id_usuario=1, comentario=comentario, puntuacion=puntuacion,
+                               fecha_creacion=date(2025, 1, 1)))
+        self.db.commit()
+        reconstruir_indice_resenas(self.db)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def buscar(self, q, **kwargs):
+        with patch("app.services.busqueda_resenas_service.get_db_session") as mock_get_db_session:
+            mock_get_db_session.return_value = iter([self.Session()])
+            return buscar_resenas_service(q, admin_user, **kwargs)
+
+    def ids(self, resultado):
+        return sorted(resena["id"] for resena in resultado["data"])
+
+    def test_busqueda_sin_tildes_y_por_prefijo(self):
+        self.assertEqual(self.ids(self.buscar("orientacion")), [1, 3])
+        self.assertEqual(self.ids(self.buscar("vocac")), [1])
+        self.assertEqual(self.ids(self.buscar("orientación test")), [3])
+
+    def test_busqueda_filtra_por_puntuacion(self):
+        self.assertEqual(self.ids(self.buscar("orientacion", rating=5)), [1])
+
+    def test_busqueda_paginada_por_cursor(self):
+        primera = self.buscar("test", limit=1)
+        self.assertIsNotNone(primera["next_cursor"])
+        segunda = self.buscar("test", limit=1, cursor=primera["next_cursor"])
+        self.assertEqual(len(segunda["data"]), 1)
+        self.assertNotEqual(primera["data"][0]["id"], segunda["data"][0]["id"])
+        tercera = self.buscar("test", limit=1, cursor=segunda["next_cursor"])
+        self.assertEqual(tercera["data"], [])
+
+    def test_cursor_invalido_si_las_resenas_cambian_entre_paginas(self):
+        primera = self.buscar("test", limit=1)
+        # Una reseña nueva cambia las estadísticas de bm25 y la relevancia de las demás
+        resena = Resena(id_usuario=1, comentario="Otro test más", puntuacion=3,
+                        fecha_creacion=date(2025, 1, 2))
+        self.db.add(resena)
+        self.db.flush()
+        indexar_resena(self.db, resena.id, resena.comentario)
+        self.db.commit()
+
+        with self.assertRaises(HTTPException) as context:
+            self.buscar("test", limit=1, cursor=primera["next_cursor"])
+        self.assertEqual(context.exception.status_code, 409)
+
+    def test_cursor_invalido_si_la_ultima_resena_ya_no_coincide(self):
+        primera = self.buscar("test", limit=1)
+        resena_id = primera["data"][0]["id"]
+        desindexar_resena(self.db, resena_id, self.db.get(Resena, resena_id).comentario)
+        self.db.commit()
+
+        with self.assertRaises(HTTPException) as context:
+            self.buscar("test", limit=1, cursor=primera["next_cursor"])
+        self.assertEqual(context.exception.status_code, 409)
+
+    def test_indexar_y_desindexar_mantienen_el_indice(self):
+        resena = self.db.get(Resena, 2)
+        desindexar_resena(self.db, resena.id, resena.comentario)
+        indexar_resena(self.db, resena.id, "El test es corto")
+        resena.comentario = "El test es corto"
+        self.db.commit()
+
+        self.assertEqual(self.ids(self.buscar("largo")), [])
+        self.assertEqual(self.ids(self.buscar("corto")), [2])
+
+    def test_operadores_de_fts_se_tratan_como_texto(self):
+        self.assertEqual(self.ids(self.buscar('test" OR NEAR(*')), [])
+        with self.assertRaises(HTTPException) as context:
+            self.buscar('"*')
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_busqueda_requiere_admin(self):
+        with self.assertRaises(HTTPException) as context:
+            buscar_resenas_service("test", {"user_id": 2, "tipo_usuario": "comun"})
+        self.assertEqual(context.exception.status_code, 403)
+
+    def test_es_tabla_fts(self):
+        self.assertTrue(es_tabla_fts("resenas_fts"))
+        self.assertTrue(es_tabla_fts("resenas_fts_idx"))
+        self.assertFalse(es_tabla_fts("resenas"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.core.cache import VersionedCache, bump_version, get_version
+
+
+class TestVersionedCache(unittest.TestCase):
+
+    def test_bump_version_incrementa_cada_clave(self):
+        inicial = get_version("prueba:a")
+        bump_version("prueba:a", "prueba:b")
+        bump_version("prueba:a")
+        self.assertEqual(get_version("prueba:a"), inicial + 2)
+        self.assertGreaterEqual(get_version("prueba:b"), 1)
+
+    def test_get_or_load_reutiliza_valor_mientras_no_cambie_la_version(self):
+        cache = VersionedCache("prueba")
+        loader = MagicMock(return_value={"id": 1})
+        self.assertEqual(cache.get_or_load("prueba:reuso", loader), {"id": 1})
+        self.assertEqual(cache.get_or_load("prueba:reuso", loader), {"id": 1})
+        loader.assert_called_once()
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_bump_version_invalida_la_entrada(self):
+        cache = VersionedCache("prueba")
+        cache.get_or_load("prueba:invalidar", lambda: "viejo")
+        bump_version("prueba:invalidar")
+        self.assertIsNone(cache.get("prueba:invalidar"))
+        self.assertEqual(cache.get_or_load("prueba:invalidar", lambda: "nuevo"), "nuevo")
+
+    def test_escritura_durante_la_carga_deja_la_entrada_obsoleta(self):
+        cache = VersionedCache("prueba")
+
+        def loader():
+            # Una escritura confirmada mientras se consultaba la base
+            bump_version("prueba:carrera")
+            return "leido antes de la escritura"
+
+        cache.get_or_load("prueba:carrera", loader)
+        self.assertIsNone(cache.get("prueba:carrera"))
+
+    def test_lru_descarta_la_entrada_menos_usada(self):
+        cache = VersionedCache("prueba", max_entries=2)
+        cache.set("prueba:1", 1, get_version("prueba:1"))
+        cache.set("prueba:2", 2, get_version("prueba:2"))
+        cache.get("prueba:1")
+        cache.set("prueba:3", 3, get_version("prueba:3"))
+        self.assertEqual(cache.get("prueba:1"), 1)
+        self.assertIsNone(cache.get("prueba:2"))
+        self.assertEqual(cache.stats()["entradas"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,9 @@ from app.services.ciudad_service import (
     update_city_service,
     delete_city_service,
     list_ciudades_service,
+    VERSION_CIUDADES,
 )
+from app.core.cache import get_version
 from app.models.mdl_ciudad import CiudadCreate, CiudadUpdate
 from app.config import config
 
@@ -42,12 +44,15 @@ class TestCiudadService(unittest.TestCase):
             longitud=5.67
         )
         
+        version = get_version(VERSION_CIUDADES)
         result = register_city_service(city_data, admin_user)
         self.assertIn("message", result)
         self.assertEqual(result["message"], "Ciudad registrada exitosamente")
         # Verificar commit y refresh fueron llamados
         mock_session.commit.assert_called_once()
         mock_session.refresh.assert_called_once()
+        # El listado de ciudades cambia de versión (nuevo ETag)
+        self.assertEqual(get_version(VERSION_CIUDADES), version + 1)
 
     @patch("app.services.ciudad_service.get_db_session")
     def test_register_city_already_exists(self, mock_get_db_session):
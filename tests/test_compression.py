@@ -0,0 +1,136 @@
+import gzip
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.config import config
+from app.core.compression import (
+    CacheCompresion,
+    MiddlewareCompresion,
+    elegir_codificacion,
+)
+
+CUERPO = ("vocación;" * 400).encode()
+
+
+def crear_app(cache=None):
+    app = FastAPI()
+
+    @app.get("/catalogo")
+    async def catalogo():
+        return Response(CUERPO, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/pequeno")
+    async def pequeno():
+        return {"ok": True}
+
+    @app.get("/csv")
+    async def descargar_csv():
+        def filas():
+            for numero in range(50):
+                yield f"{numero};Ingeniería;Salud\n" * 20
+
+        return StreamingResponse(filas(), media_type="text/csv")
+
+    @app.get("/imagen")
+    async def imagen():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    app.add_middleware(MiddlewareCompresion, cache=cache)
+    return app
+
+
+class TestCompresion(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("app.core.compression.brotli", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        size_patcher = patch.object(config, "COMPRESSION_MIN_SIZE", 500)
+        size_patcher.start()
+        self.addCleanup(size_patcher.stop)
+
+    def test_elegir_codificacion(self):
+        self.assertEqual(elegir_codificacion("gzip, deflate"), "gzip")
+        self.assertEqual(elegir_codificacion("br;q=1.0, gzip;q=0.5"), "gzip")
+        self.assertEqual(elegir_codificacion("*"), "gzip")
+        self.assertIsNone(elegir_codificacion("gzip;q=0"))
+        self.assertIsNone(elegir_codificacion("identity"))
+        self.assertIsNone(elegir_codificacion(""))
+
+    def test_elegir_codificacion_prefiere_brotli_si_esta_instalado(self):
+        with patch("app.core.compression.brotli", object()):
+            self.assertEqual(elegir_codificacion("gzip, br"), "br")
+            self.assertEqual(elegir_codificacion("gzip;q=1, br;q=0.8"), "gzip")
+
+    def test_comprime_y_guarda_el_cuerpo_por_etag(self):
+        cache = CacheCompresion("prueba", 1024 * 1024)
+        client = TestClient(crear_app(cache))
+
+        primera = client.get("/catalogo", headers={"Accept-Encoding": "gzip"})
+        segunda = client.get("/catalogo", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(primera.headers["content-encoding"], "gzip")
+        self.assertEqual(primera.headers["etag"], 'W/"v1"')
+        self.assertEqual(primera.headers["vary"], "Accept-Encoding")
+        self.assertLess(int(primera.headers["content-length"]), len(CUERPO))
+        self.assertEqual(primera.content, CUERPO)
+        self.assertEqual(segunda.content, CUERPO)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["entradas"], 1)
+
+    def test_no_comprime_sin_accept_encoding_ni_bajo_el_minimo(self):
+        client = TestClient(crear_app())
+
+        plano = client.get("/catalogo", headers={"Accept-Encoding": "identity"})
+        pequeno = client.get("/pequeno", headers={"Accept-Encoding": "gzip"})
+        imagen = client.get("/imagen", headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", plano.headers)
+        self.assertEqual(plano.headers["etag"], '"v1"')
+        self.assertEqual(plano.headers["vary"], "Accept-Encoding")
+        self.assertNotIn("content-encoding", pequeno.headers)
+        self.assertEqual(pequeno.json(), {"ok": True})
+        self.assertNotIn("content-encoding", imagen.headers)
+        self.assertNotIn("vary", imagen.headers)
+
+    def test_streaming_se_comprime_bloque_a_bloque(self):
+        client = TestClient(crear_app())
+        esperado = "".join(f"{numero};Ingeniería;Salud\n" * 20 for numero in range(50)).encode()
+
+        with client.stream("GET", "/csv", headers={"Accept-Encoding": "gzip"}) as response:
+            self.assertEqual(response.headers["content-encoding"], "gzip")
+            self.assertNotIn("content-length", response.headers)
+            comprimido = b"".join(response.iter_raw())
+
+        self.assertEqual(gzip.decompress(comprimido), esperado)
+
+    def test_cache_se_acota_por_bytes(self):
+        cache = CacheCompresion("prueba", 10)
+        cache.set("a", b"123456")
+        cache.set("b", b"7890")
+        cache.set("c", b"xyz")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), b"7890")
+        self.assertEqual(cache.get("c"), b"xyz")
+        self.assertEqual(cache.stats()["bytes"], 7)
+
+    def test_cache_ignora_etag_debil(self):
+        cache = CacheCompresion("prueba", 1024 * 1024)
+        app = crear_app(cache)
+
+        @app.get("/debil")
+        async def debil():
+            return Response(CUERPO, media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+        client = TestClient(app)
+        for _ in range(2):
+            response = client.get("/debil", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.content, CUERPO)
+        self.assertEqual(cache.stats()["entradas"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import smtplib
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import config
+from app.schemas.sch_base import Base
+from app.schemas.sch_correo import CorreoSaliente
+from app.schemas.sch_usuario import Usuario
+from app.services.correo_service import (
+    ESTADO_ENVIADO,
+    ESTADO_FALLIDO,
+    ESTADO_PENDIENTE,
+    ConexionSMTP,
+    calcular_espera_reintento,
+    encolar_correo,
+    procesar_cola_correos,
+)
+from app.services.user_services import PLANTILLA_RESTABLECER_CONTRASENA, reset_password_service
+
+
+class TestCorreoService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.db = self.Session()
+
+        def sesion():
+            yield self.Session()
+
+        patcher = patch("app.services.correo_service.get_db_session", side_effect=sesion)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        smtp_patcher = patch("app.services.correo_service.smtplib.SMTP")
+        self.mock_smtp_class = smtp_patcher.start()
+        self.addCleanup(smtp_patcher.stop)
+        self.mock_smtp = self.mock_smtp_class.return_value
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def encolar(self, destinatario="ana@x.com"):
+        encolar_correo(self.db, destinatario, "Asunto", "Cuerpo secreto")
+        self.db.commit()
+
+    def correos(self):
+        self.db.expire_all()
+        return self.db.query(CorreoSaliente).order_by(CorreoSaliente.id).all()
+
+    def test_procesar_cola_envia_y_borra_el_cuerpo(self):
+        self.encolar()
+
+        enviados = procesar_cola_correos(ConexionSMTP())
+
+        self.assertEqual(enviados, 1)
+        correo = self.correos()[0]
+        self.assertEqual(correo.estado, ESTADO_ENVIADO)
+        self.assertEqual(correo.intentos, 1)
+        self.assertIsNone(correo.cuerpo)
+        self.assertIsNotNone(correo.enviado_en)
+        mensaje = self.mock_smtp.send_message.call_args[0][0]
+        self.assertEqual(mensaje["To"], "ana@x.com")
+        self.assertEqual(mensaje.get_content().strip(), "Cuerpo secreto")
+
+    def test_procesar_cola_reutiliza_la_conexion(self):
+        self.encolar("ana@x.com")
+        self.encolar("luis@x.com")
+        self.encolar("eva@x.com")
+
+        with patch.object(config, "OUTBOX_BATCH_SIZE", 10):
+            enviados = procesar_cola_correos(ConexionSMTP())
+
+        self.assertEqual(enviados, 3)
+        self.mock_smtp_class.assert_called_once()
+        self.assertEqual(self.mock_smtp.send_message.call_count, 3)
+        # La cola quedó vacía: la conexión se cierra
+        self.mock_smtp.quit.assert_called_once()
+
+    def test_fallo_de_envio_programa_reintento_con_espera(self):
+        self.encolar()
+        self.mock_smtp.send_message.side_effect = smtplib.SMTPException("servidor caído")
+
+        antes = datetime.utcnow()
+        enviados = procesar_cola_correos(ConexionSMTP())
+
+        self.assertEqual(enviados, 0)
+        correo = self.correos()[0]
+        self.assertEqual(correo.estado, ESTADO_PENDIENTE)
+        self.assertEqual(correo.intentos, 1)
+        self.assertEqual(correo.cuerpo, "Cuerpo secreto")
+        self.assertIn("servidor caído", correo.ultimo_error)
+        self.assertGreaterEqual(correo.proximo_intento, antes + calcular_espera_reintento(1))
+
+        # Antes de que venza la espera no se vuelve a intentar
+        self.assertEqual(procesar_cola_correos(ConexionSMTP()), 0)
+        self.assertEqual(self.correos()[0].intentos, 1)
+
+    def test_calcular_espera_reintento_es_exponencial(self):
+        with patch.object(config, "OUTBOX_BACKOFF_SECONDS", 10):
+            self.assertEqual(calcular_espera_reintento(1), timedelta(seconds=10))
+            self.assertEqual(calcular_espera_reintento(3), timedelta(seconds=40))
+
+    def test_correo_fallido_al_agotar_los_intentos(self):
+        self.encolar()
+        self.mock_smtp.send_message.side_effect = smtplib.SMTPException("rechazado")
+
+        with patch.object(config, "OUTBOX_MAX_ATTEMPTS", 2), patch.object(
+            config, "OUTBOX_BACKOFF_SECONDS", 0
+        ):
+            procesar_cola_correos(ConexionSMTP())
+            procesar_cola_correos(ConexionSMTP())
+            procesar_cola_correos(ConexionSMTP())
+
+        correo = self.correos()[0]
+        self.assertEqual(correo.estado, ESTADO_FALLIDO)
+        self.assertEqual(correo.intentos, 2)
+        self.assertIsNone(correo.cuerpo)
+
+    def test_reconecta_si_el_servidor_cerro_la_conexion(self):
+        conexion = ConexionSMTP()
+        primera, segunda = MagicMock(), MagicMock()
+        primera.send_message.side_effect = [None, smtplib.SMTPServerDisconnected()]
+        self.mock_smtp_class.side_effect = [primera, segunda]
+        mensaje = MagicMock()
+
+        conexion.enviar(mensaje)
+        conexion.enviar(mensaje)
+
+        self.assertEqual(self.mock_smtp_class.call_count, 2)
+        segunda.send_message.assert_called_once_with(mensaje)
+
+    def reset_password(self):
+        self.db.add(Usuario(id=1, nombre="Ana", email="ana@x.com", sexo="Femenino", contrasena="x"))
+        self.db.commit()
+
+        def sesion():
+            yield self.Session()
+
+        with patch("app.services.user_services.get_db_session", side_effect=sesion), patch(
+            "app.services.user_services.notificar_correo_pendiente"
+        ) as mock_notificar:
+            resultado = reset_password_service("ana@x.com")
+        mock_notificar.assert_called_once()
+        return resultado
+
+    def test_reset_password_encola_el_correo_sin_enviarlo(self):
+        resultado = self.reset_password()
+
+        self.assertIn("ana@x.com", resultado["message"])
+        self.mock_smtp_class.assert_not_called()
+        correo = self.correos()[0]
+        self.assertEqual(correo.estado, ESTADO_PENDIENTE)
+        self.assertEqual(correo.destinatario, "ana@x.com")
+        # Solo se guarda la referencia: ni la contraseña ni el cuerpo quedan en la bandeja
+        self.assertIsNone(correo.cuerpo)
+        self.assertEqual(correo.plantilla, PLANTILLA_RESTABLECER_CONTRASENA)
+        self.assertEqual(correo.usuario_id, 1)
+        self.assertEqual(self.db.get(Usuario, 1).contrasena, "x")
+
+    @patch("app.services.user_services.get_password_hash", side_effect=lambda c: f"hash:{c}")
+    def test_reset_password_asigna_la_contrasena_al_enviar(self, _):
+        self.reset_password()
+
+        self.assertEqual(procesar_cola_correos(ConexionSMTP()), 1)
+
+        contenido = self.mock_smtp.send_message.call_args[0][0].get_content()
+        self.db.expire_all()
+        contrasena = self.db.get(Usuario, 1).contrasena
+        self.assertTrue(contrasena.startswith("hash:"))
+        self.assertIn(contrasena[len("hash:"):], contenido)
+        self.assertIsNone(self.correos()[0].cuerpo)
+
+    @patch("app.services.user_services.get_password_hash", return_value="hash")
+    def test_reset_password_no_cambia_la_contrasena_si_el_envio_falla(self, _):
+        self.reset_password()
+        self.mock_smtp.send_message.side_effect = smtplib.SMTPException("servidor caído")
+
+        procesar_cola_correos(ConexionSMTP())
+
+        self.db.expire_all()
+        self.assertEqual(self.db.get(Usuario, 1).contrasena, "x")
+        correo = self.correos()[0]
+        self.assertEqual(correo.estado, ESTADO_PENDIENTE)
+        self.assertIsNone(correo.cuerpo)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.sch_base import Base
+from app.schemas.sch_test import Test
+from app.schemas.sch_usuario import Usuario
+from app.schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
+from app.services.csv_service import (
+    get_users_vocations_csv_service,
+    get_vocation_percentages_csv_service,
+)
+
+admin_user = {"user_id": 1, "tipo_usuario": "admin"}
+
+
+class TestCsvService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(Test(id=1, nombre="Test", descripcion="Test"))
+        self.db.add_all(
+            Usuario(id=i, nombre=f"Usuario {i}", email=f"u{i}@x.com", contrasena="x")
+            for i in range(1, 8)
+        )
+        self.db.add_all(
+            VocacionDeUsuarioPorTest(
+                id_usuario=i, id_test=1, moda_vocacion="Salud" if i % 2 else "Artes",
+                moda_vocacion2="Artes",
+            )
+            for i in range(1, 8)
+        )
+        self.db.commit()
+        self.db.close = MagicMock(wraps=self.db.close)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    @patch("app.services.csv_service.config.CSV_BATCH_SIZE", 3)
+    @patch("app.services.csv_service.get_db_session")
+    def test_users_vocations_csv_se_genera_por_bloques(self, mock_get_db_session):
+        mock_get_db_session.return_value = iter([self.db])
+
+        bloques = list(get_users_vocations_csv_service())
+
+        # Cabecera sola + 7 filas en bloques de 3 filas
+        self.assertEqual(len(bloques), 4)
+        lineas = "".join(bloques).splitlines()
+        self.assertEqual(lineas[0], "User ID;Nombre;Email;Vocacion Principal;Vocacion Secundaria")
+        self.assertEqual(lineas[1], "1;Usuario 1;u1@x.com;Salud;Artes")
+        self.assertEqual(len(lineas), 8)
+        self.db.close.assert_called_once()
+
+    @patch("app.services.csv_service.get_db_session")
+    def test_csv_primer_bloque_es_solo_la_cabecera(self, mock_get_db_session):
+        mock_get_db_session.return_value = iter([self.db])
+
+        generador = get_users_vocations_csv_service()
+        self.assertEqual(
+            next(generador), "User ID;Nombre;Email;Vocacion Principal;Vocacion Secundaria\r\n"
+        )
+        generador.close()
+
+    @patch("app.services.csv_service.get_db_session")
+    def test_csv_cierra_la_sesion_al_abandonar_la_descarga(self, mock_get_db_session):
+        mock_get_db_session.return_value = iter([self.db])
+
+        generador = get_users_vocations_csv_service()
+        next(generador)
+        self.db.close.assert_not_called()
+        generador.close()
+        self.db.close.assert_called_once()
+
+    @patch("app.services.csv_service.get_db_session")
+    def test_vocation_percentages_csv(self, mock_get_db_session):
+        mock_get_db_session.return_value = iter([self.db])
+
+        contenido = "".join(get_vocation_percentages_csv_service(admin_user))
+        self.assertEqual(contenido.splitlines(), ["Vocacion,Porcentaje", "Artes,43", "Salud,57"])
+
+    @patch("app.services.csv_service.get_db_session")
+    def test_vocation_percentages_csv_valida_antes_de_transmitir(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.scalar.return_value = 0
+        mock_get_db_session.return_value = iter([mock_session])
+
+        with self.assertRaises(HTTPException) as context:
+            get_vocation_percentages_csv_service(admin_user)
+        self.assertEqual(context.exception.status_code, 404)
+        mock_session.close.assert_called_once()
+
+    @patch("app.services.csv_service.get_db_session")
+    def test_csv_error_de_consulta_antes_de_transmitir(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_session.query.side_effect = Exception("Query error")
+        mock_get_db_session.return_value = iter([mock_session])
+
+        with self.assertRaises(HTTPException) as context:
+            get_users_vocations_csv_service()
+        self.assertEqual(context.exception.status_code, 500)
+        mock_session.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import Column, Integer, String, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.config import config
+from app.db import database
+from app.db.database import (
+    PERFIL_DEFAULT,
+    PERFIL_TUNED,
+    create_database_engine,
+    es_sqlite_en_archivo,
+    registrar_escritor_unico,
+)
+
+BasePrueba = declarative_base()
+
+
+class Registro(BasePrueba):
+    __tablename__ = "registros"
+    id = Column(Integer, primary_key=True)
+    valor = Column(String, nullable=False)
+
+
+class TestDatabaseEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.url = f"sqlite:///{os.path.join(self.directorio, 'prueba.db')}"
+        self.engines = []
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.dispose()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def crear_engine(self, profile):
+        engine = create_database_engine(self.url, profile)
+        self.engines.append(engine)
+        return engine
+
+    def pragma(self, engine, nombre):
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {nombre}").scalar()
+
+    def test_perfil_tuned_aplica_pragmas(self):
+        engine = self.crear_engine(PERFIL_TUNED)
+        self.assertEqual(self.pragma(engine, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(engine, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma(engine, "busy_timeout"), config.SQLITE_BUSY_TIMEOUT_MS)
+        self.assertEqual(self.pragma(engine, "cache_size"), -config.SQLITE_CACHE_SIZE_KB)
+        self.assertEqual(self.pragma(engine, "temp_store"), 2)  # MEMORY
+        self.assertEqual(self.pragma(engine, "foreign_keys"), 1)
+        self.assertIsInstance(engine.pool, QueuePool)
+        self.assertEqual(engine.pool.size(), config.SQLITE_POOL_SIZE)
+
+    def test_perfil_default_conserva_valores_de_sqlite(self):
+        engine = self.crear_engine(PERFIL_DEFAULT)
+        self.assertEqual(self.pragma(engine, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(engine, "foreign_keys"), 0)
+
+    def test_es_sqlite_en_archivo(self):
+        self.assertTrue(es_sqlite_en_archivo(self.url))
+        self.assertFalse(es_sqlite_en_archivo("sqlite://"))
+        self.assertFalse(es_sqlite_en_archivo("sqlite:///:memory:"))
+
+    def test_escrituras_concurrentes_sin_bloqueos(self):
+        engine = self.crear_engine(PERFIL_TUNED)
+        BasePrueba.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        registrar_escritor_unico(session_factory)
+        errores = []
+
+        def escribir(hilo):
+            for i in range(20):
+                db = session_factory()
+                try:
+                    db.add(Registro(valor=f"{hilo}-{i}"))
+                    db.commit()
+                except Exception as ex:
+                    errores.append(ex)
+                    db.rollback()
+                finally:
+                    db.close()
+
+        hilos = [threading.Thread(target=escribir, args=(n,)) for n in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        with engine.connect() as connection:
+            total = connection.execute(text("SELECT COUNT(*) FROM registros")).scalar()
+        self.assertEqual(total, 160)
+
+    def test_escritor_unico_se_libera_tras_rollback(self):
+        engine = self.crear_engine(PERFIL_TUNED)
+        BasePrueba.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        registrar_escritor_unico(session_factory)
+
+        db = session_factory()
+        db.add(Registro(valor="a"))
+        db.flush()
+        self.assertTrue(db.info["escritor"])
+        db.rollback()
+        self.assertNotIn("escritor", db.info)
+        db.close()
+
+        otra = session_factory()
+        otra.add(Registro(valor="b"))
+        otra.commit()
+        self.assertNotIn("escritor", otra.info)
+        otra.close()
+
+    def test_actualizacion_masiva_espera_al_escritor(self):
+        engine = self.crear_engine(PERFIL_TUNED)
+        BasePrueba.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        registrar_escritor_unico(session_factory)
+        db = session_factory()
+        db.add(Registro(valor="a"))
+        db.commit()
+
+        # Una sesión sin cambios pendientes no ejecuta before_flush
+        terminado = threading.Event()
+
+        def actualizar():
+            otra = session_factory()
+            otra.execute(text("SELECT COUNT(*) FROM registros")).scalar()
+            self.assertNotIn("escritor", otra.info)
+            otra.query(Registro).update({Registro.valor: "b"}, synchronize_session=False)
+            self.assertTrue(otra.info["escritor"])
+            otra.commit()
+            otra.close()
+            terminado.set()
+
+        database._writer_lock.acquire()
+        hilo = threading.Thread(target=actualizar)
+        hilo.start()
+        try:
+            self.assertFalse(terminado.wait(0.3))
+        finally:
+            database._writer_lock.release()
+        hilo.join()
+
+        self.assertTrue(terminado.is_set())
+        self.assertEqual(db.query(Registro.valor).scalar(), "b")
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.sch_base import Base
+from app.schemas.sch_estadistica import EstadisticaSnapshot, EstadisticaVocacion
+from app.schemas.sch_test import Test
+from app.schemas.sch_usuario import Usuario
+from app.schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
+from app.services.estadisticas_snapshot_service import (
+    asegurar_snapshot_estadisticas,
+    reconstruir_snapshot_estadisticas,
+    registrar_vocacion_en_snapshot,
+)
+
+
+class TestEstadisticasSnapshotService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False)()
+        self.db.add(Test(id=1, nombre="Test", descripcion="Test"))
+        self.db.add_all(
+            [
+                Usuario(id=1, nombre="Ana", email="ana@x.com", sexo="Femenino", contrasena="x",
+                        id_ciudad=1, id_institucion=1),
+                Usuario(id=2, nombre="Luis", email="luis@x.com", sexo="Masculino", contrasena="x",
+                        id_ciudad=1, id_institucion=None),
+                Usuario(id=3, nombre="Eva", email="eva@x.com", sexo="Femenino", contrasena="x",
+                        id_ciudad=2, id_institucion=1),
+            ]
+        )
+        self.db.add_all(
+            [
+                VocacionDeUsuarioPorTest(id_usuario=1, id_test=1, moda_vocacion="Salud"),
+                VocacionDeUsuarioPorTest(id_usuario=2, id_test=1, moda_vocacion="Artes"),
+            ]
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def conteos(self):
+        return {
+            (fila.dimension, fila.clave, fila.vocacion): fila.conteo
+            for fila in self.db.query(EstadisticaVocacion).all()
+        }
+
+    def test_reconstruir_snapshot_agrega_por_dimension(self):
+        total = reconstruir_snapshot_estadisticas(self.db)
+        self.db.commit()
+
+        self.assertEqual(
+            self.conteos(),
+            {
+                ("global", "", "Salud"): 1,
+                ("global", "", "Artes"): 1,
+                ("ciudad", "1", "Salud"): 1,
+                ("ciudad", "1", "Artes"): 1,
+                ("institucion", "1", "Salud"): 1,
+                ("sexo", "Femenino", "Salud"): 1,
+                ("sexo", "Masculino", "Artes"): 1,
+            },
+        )
+        self.assertEqual(total, 7)
+        self.assertEqual(self.db.query(EstadisticaSnapshot).count(), 1)
+
+    def test_asegurar_snapshot_solo_reconstruye_si_no_existe(self):
+        snapshot = asegurar_snapshot_estadisticas(self.db)
+        self.assertIsNotNone(snapshot)
+        reconstruido_en = snapshot.reconstruido_en
+
+        self.assertIs(asegurar_snapshot_estadisticas(self.db), snapshot)
+        self.assertEqual(snapshot.reconstruido_en, reconstruido_en)
+
+    def test_asegurar_snapshot_construido_por_otra_peticion(self):
+        ahora = datetime.now(timezone.utc)
+
+        # Otra petición confirma el snapshot mientras esta también lo inserta
+        def reconstruir_en_paralelo(db):
+            reconstruir_snapshot_estadisticas(db)
+            db.commit()
+            db.add(EstadisticaSnapshot(nombre="vocaciones", reconstruido_en=ahora, actualizado_en=ahora))
+
+        with patch(
+            "app.services.estadisticas_snapshot_service.reconstruir_snapshot_estadisticas",
+            side_effect=reconstruir_en_paralelo,
+        ):
+            snapshot = asegurar_snapshot_estadisticas(self.db)
+
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(self.db.query(EstadisticaSnapshot).count(), 1)
+        self.assertEqual(self.conteos()[("global", "", "Salud")], 1)
+
+    def test_registrar_vocacion_sin_snapshot_no_hace_nada(self):
+        registrar_vocacion_en_snapshot(self.db, 3, "Salud")
+        self.db.commit()
+        self.assertEqual(self.conteos(), {})
+
+    def test_registrar_vocacion_equivale_a_reconstruir(self):
+        reconstruir_snapshot_estadisticas(self.db)
+        self.db.commit()
+
+        # Nueva vocación para Eva y cambio de vocación de Luis
+        self.db.add(VocacionDeUsuarioPorTest(id_usuario=3, id_test=1, moda_vocacion="Salud"))
+        registrar_vocacion_en_snapshot(self.db, 3, "Salud")
+        luis = self.db.query(VocacionDeUsuarioPorTest).filter_by(id_usuario=2).first()
+        registrar_vocacion_en_snapshot(self.db, 2, "Salud", luis.moda_vocacion)
+        luis.moda_vocacion = "Salud"
+        self.db.commit()
+        incremental = self.conteos()
+
+        reconstruir_snapshot_estadisticas(self.db)
+        self.db.commit()
+        self.assertEqual(incremental, self.conteos())
+        # Las combinaciones que quedan sin usuarios desaparecen del snapshot
+        self.assertNotIn(("global", "", "Artes"), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import threading
+import unittest
+
+from app.core.executor import get_executor_stats, run_blocking, shutdown_executor
+
+variable_prueba = contextvars.ContextVar("variable_prueba", default=None)
+
+
+class TestExecutor(unittest.TestCase):
+
+    def test_run_blocking_ejecuta_fuera_del_loop(self):
+        async def ejecutar():
+            hilo_loop = threading.current_thread().name
+            hilo_servicio = await run_blocking(lambda: threading.current_thread().name)
+            return hilo_loop, hilo_servicio
+
+        hilo_loop, hilo_servicio = asyncio.run(ejecutar())
+        self.assertNotEqual(hilo_loop, hilo_servicio)
+        self.assertTrue(hilo_servicio.startswith("servicios"))
+
+    def test_run_blocking_propaga_argumentos_y_contexto(self):
+        async def ejecutar():
+            variable_prueba.set("peticion-1")
+            return await run_blocking(lambda a, b=0: (a + b, variable_prueba.get()), 2, b=3)
+
+        self.assertEqual(asyncio.run(ejecutar()), (5, "peticion-1"))
+
+    def test_run_blocking_propaga_excepciones(self):
+        def servicio():
+            raise ValueError("fallo")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_blocking(servicio))
+        self.assertEqual(get_executor_stats()["en_curso"], 0)
+
+    def test_shutdown_executor_permite_reutilizar_pool(self):
+        shutdown_executor()
+        self.assertEqual(asyncio.run(run_blocking(sum, [1, 2, 3])), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
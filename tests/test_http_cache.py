@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from app.core.cache import bump_version
+from app.core.http_cache import (
+    cabeceras_cache,
+    calcular_etag,
+    calcular_etag_fecha,
+    etag_coincide,
+    respuesta_no_modificada,
+)
+
+
+def crear_request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def test_calcular_etag_cambia_al_incrementar_la_version(self):
+        etag = calcular_etag("prueba_etag")
+        self.assertEqual(etag, calcular_etag("prueba_etag"))
+        bump_version("prueba_etag")
+        self.assertNotEqual(etag, calcular_etag("prueba_etag"))
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+
+    def test_etag_coincide(self):
+        etag = calcular_etag("prueba_coincide")
+        self.assertTrue(etag_coincide(crear_request(etag), etag))
+        self.assertTrue(etag_coincide(crear_request(f'"otro", W/{etag}'), etag))
+        self.assertTrue(etag_coincide(crear_request("*"), etag))
+        self.assertFalse(etag_coincide(crear_request('"otro"'), etag))
+        self.assertFalse(etag_coincide(crear_request(), etag))
+
+    def test_respuesta_no_modificada(self):
+        etag = calcular_etag("prueba_304")
+        response = respuesta_no_modificada(etag, privado=True)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.body, b"")
+        self.assertEqual(response.headers["etag"], etag)
+        self.assertTrue(response.headers["cache-control"].startswith("private"))
+        self.assertTrue(cabeceras_cache(etag)["Cache-Control"].startswith("public"))
+
+    def test_calcular_etag_fecha_incluye_versiones_de_catalogos(self):
+        fecha = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(calcular_etag_fecha(fecha), calcular_etag_fecha(fecha))
+
+        # Renombrar una ciudad no cambia la fecha del snapshot, pero sí el ETag
+        etag = calcular_etag_fecha(fecha, "prueba_etag_fecha")
+        bump_version("prueba_etag_fecha")
+        self.assertNotEqual(etag, calcular_etag_fecha(fecha, "prueba_etag_fecha"))
+        self.assertTrue(etag.startswith(calcular_etag_fecha(fecha)[:-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import unittest
+from datetime import date, datetime, timezone
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.json_response import respuesta_json
+
+
+class TestJsonResponse(unittest.TestCase):
+
+    def test_serializa_igual_que_jsonable_encoder(self):
+        contenido = [
+            {
+                "id": 1,
+                "comentario": "Me ayudó a decidir",
+                "puntuacion": 4.5,
+                "fecha_creacion": datetime(2024, 3, 1, 10, 30, 15, 123456),
+                "fecha_actualizacion": datetime(2024, 3, 2, 8, 0, tzinfo=timezone.utc),
+                "fecha": date(2024, 3, 1),
+                "nombre_usuario": None,
+            }
+        ]
+
+        response = respuesta_json(contenido)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(json.loads(response.body), jsonable_encoder(contenido))
+
+    def test_copia_las_cabeceras_de_la_ruta(self):
+        # Mismo estado que el Response que FastAPI inyecta en la ruta
+        http_response = Response()
+        del http_response.headers["content-length"]
+        http_response.headers["X-Next-Cursor"] = "abc"
+        http_response.headers["ETag"] = '"v1"'
+
+        response = respuesta_json({"data": []}, http_response)
+
+        self.assertEqual(response.headers["x-next-cursor"], "abc")
+        self.assertEqual(response.headers["etag"], '"v1"')
+        self.assertEqual(response.headers.getlist("content-length"), [str(len(response.body))])
+
+
+if __name__ == "__main__":
+    unittest.main()
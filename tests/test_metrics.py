@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.config import config
+from app.core.cache import VersionedCache
+from app.core.metrics import (
+    CONSULTAS_DB,
+    DURACION_HTTP,
+    PETICIONES_HTTP,
+    RUTA_DESCONOCIDA,
+    Contador,
+    Histograma,
+    MiddlewareMetricas,
+    RegistroMetricas,
+    instrumentar_engine,
+    registrar_cache,
+    registro,
+)
+from app.routers import metricas
+from app.services.auth_service import create_access_token
+
+
+class TestMetricas(unittest.TestCase):
+
+    def test_exportar_contador_con_etiquetas(self):
+        registro_prueba = RegistroMetricas()
+        contador = registro_prueba.registrar(Contador("pruebas_total", "Pruebas.", ("tipo",)))
+        contador.inc("a")
+        contador.inc("a", cantidad=2)
+        contador.inc('b"c')
+
+        texto = registro_prueba.exportar()
+        self.assertIn("# TYPE pruebas_total counter", texto)
+        self.assertIn('pruebas_total{tipo="a"} 3', texto)
+        self.assertIn('pruebas_total{tipo="b\\"c"} 1', texto)
+
+    def test_histograma_acumula_buckets_suma_y_total(self):
+        registro_prueba = RegistroMetricas()
+        histograma = registro_prueba.registrar(Histograma("espera", "Espera.", limites=(0.1, 1)))
+        for valor in (0.05, 0.5, 3):
+            histograma.observar(valor)
+
+        texto = registro_prueba.exportar()
+        self.assertIn('espera_bucket{le="0.1"} 1', texto)
+        self.assertIn('espera_bucket{le="1"} 2', texto)
+        self.assertIn('espera_bucket{le="+Inf"} 3', texto)
+        self.assertIn("espera_sum 3.55", texto)
+        self.assertIn("espera_count 3", texto)
+
+    def test_middleware_registra_la_plantilla_de_la_ruta(self):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def obtener_item(item_id: int):
+            return {"id": item_id}
+
+        app.add_middleware(MiddlewareMetricas)
+        antes = PETICIONES_HTTP.valor("GET", "/items/{item_id}", "200")
+        sin_ruta = PETICIONES_HTTP.valor("GET", RUTA_DESCONOCIDA, "404")
+
+        with TestClient(app) as client:
+            client.get("/items/1")
+            client.get("/items/2")
+            client.get("/otra/ruta")
+
+        self.assertEqual(PETICIONES_HTTP.valor("GET", "/items/{item_id}", "200"), antes + 2)
+        self.assertEqual(PETICIONES_HTTP.valor("GET", RUTA_DESCONOCIDA, "404"), sin_ruta + 1)
+        self.assertGreaterEqual(DURACION_HTTP.total("GET", "/items/{item_id}"), 2)
+
+    def test_ruta_metrics_requiere_administrador_o_token(self):
+        app = FastAPI()
+        app.include_router(metricas.router)
+        client = TestClient(app)
+
+        def cabecera(token):
+            return {"Authorization": f"Bearer {token}"}
+
+        admin = create_access_token({"user_id": 1, "email": "a@x.com", "tipo_usuario": "admin"})
+        comun = create_access_token({"user_id": 2, "email": "b@x.com", "tipo_usuario": "comun"})
+        with patch.object(config, "METRICS_TOKEN", "token-prometheus"):
+            self.assertIn(client.get("/metrics").status_code, (401, 403))
+            self.assertEqual(client.get("/metrics", headers=cabecera(comun)).status_code, 403)
+            self.assertEqual(client.get("/metrics", headers=cabecera("otro")).status_code, 401)
+            self.assertEqual(client.get("/metrics", headers=cabecera(admin)).status_code, 200)
+            respuesta = client.get("/metrics", headers=cabecera("token-prometheus"))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("# TYPE", respuesta.text)
+
+    def test_instrumentar_engine_cuenta_consultas_por_operacion(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool)
+        instrumentar_engine(engine)
+        antes = CONSULTAS_DB.valor("SELECT")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        engine.dispose()
+
+        self.assertEqual(CONSULTAS_DB.valor("SELECT"), antes + 2)
+        self.assertIn('db_pool_connections{estado="en_uso"}', registro.exportar())
+
+    def test_cache_registrada_publica_proporcion_de_aciertos(self):
+        cache = registrar_cache(VersionedCache("prueba_metricas"))
+        cache.get_or_load("prueba_metricas:1", lambda: "valor")
+        cache.get("prueba_metricas:1")
+
+        texto = registro.exportar()
+        self.assertIn('cache_hits{cache="prueba_metricas"} 1', texto)
+        self.assertIn('cache_hit_ratio{cache="prueba_metricas"} 0.5', texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
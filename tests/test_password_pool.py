@@ -0,0 +1,71 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.core import password_pool
+from app.core.password_pool import (
+    crear_contexto_hashing,
+    ejecutar_hashing,
+    get_password_pool_stats,
+    hash_password,
+    verify_password_hash,
+)
+
+
+class TestPasswordPool(unittest.TestCase):
+
+    def test_hash_y_verificacion_en_el_pool_de_procesos(self):
+        hashed = hash_password("secreta123")
+        self.assertTrue(verify_password_hash("secreta123", hashed))
+        self.assertFalse(verify_password_hash("otra", hashed))
+
+    def test_contexto_marca_hashes_con_otro_costo(self):
+        contexto_bajo = crear_contexto_hashing(rounds=4)
+        contexto_alto = crear_contexto_hashing(rounds=5)
+        hashed = contexto_bajo.hash("secreta123")
+
+        self.assertFalse(contexto_bajo.needs_update(hashed))
+        self.assertTrue(contexto_alto.needs_update(hashed))
+        # El hash anterior sigue siendo válido mientras se recalcula
+        self.assertTrue(contexto_alto.verify("secreta123", hashed))
+
+    def test_pool_saturado_responde_429(self):
+        rechazadas = get_password_pool_stats()["rechazadas"]
+        with patch.object(password_pool, "_capacidad", threading.BoundedSemaphore(1)) as capacidad:
+            capacidad.acquire()
+            with self.assertRaises(HTTPException) as context:
+                hash_password("secreta123")
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertEqual(context.exception.headers, {"Retry-After": "1"})
+        self.assertEqual(get_password_pool_stats()["rechazadas"], rechazadas + 1)
+
+    @patch("app.core.password_pool.config.PASSWORD_POOL_ENABLED", False)
+    def test_pool_deshabilitado_ejecuta_en_el_hilo_actual(self):
+        completadas = get_password_pool_stats()["completadas"]
+        hilo = ejecutar_hashing(lambda: threading.current_thread().name)
+        self.assertEqual(hilo, threading.current_thread().name)
+        stats = get_password_pool_stats()
+        self.assertEqual(stats["completadas"], completadas + 1)
+        self.assertEqual(stats["en_curso"], 0)
+
+    @patch("app.core.password_pool.config.PASSWORD_POOL_ENABLED", False)
+    def test_capacidad_se_libera_tras_error(self):
+        def falla():
+            raise ValueError("error")
+
+        antes = get_password_pool_stats()
+        intentos = antes["capacidad"] + 1
+        for _ in range(intentos):
+            with self.assertRaises(ValueError):
+                ejecutar_hashing(falla)
+        stats = get_password_pool_stats()
+        self.assertEqual(stats["en_curso"], 0)
+        # Los errores se cuentan como fallidas, no como completadas
+        self.assertEqual(stats["fallidas"], antes["fallidas"] + intentos)
+        self.assertEqual(stats["completadas"], antes["completadas"])
+
+
+if __name__ == "__main__":
+    unittest.main()
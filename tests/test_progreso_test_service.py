@@ -0,0 +1,143 @@
+import unittest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.sch_base import Base
+from app.schemas.sch_pregunta import Pregunta
+from app.schemas.sch_progreso import ProgresoTestUsuario
+from app.schemas.sch_respuesta import Respuesta
+from app.schemas.sch_respuesta_usuario import RespuestaDeUsuario
+from app.schemas.sch_test import Test
+from app.schemas.sch_usuario import Usuario
+from app.services.progreso_test_service import (
+    registrar_respuestas_en_progreso,
+    reconstruir_progreso_tests,
+)
+from app.config import config
+
+
+class TestProgresoTestService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        db = self.Session()
+        db.add(Test(id=1, nombre="Test", descripcion="Test"))
+        db.add(Usuario(id=7, nombre="Ana", email="ana@x.com", sexo="Femenino", contrasena="x"))
+        db.add_all(Pregunta(id=i, test_id=1, enunciado=f"P{i}") for i in range(1, 5))
+        db.add_all(
+            Respuesta(id=i, pregunta_id=i, respuesta=f"R{i}", vocacion="Salud") for i in range(1, 5)
+        )
+        db.commit()
+        db.close()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def responder(self, db, *preguntas):
+        db.add_all(
+            RespuestaDeUsuario(test_id=1, pregunta_id=p, respuesta_id=p, usuario_id=7)
+            for p in preguntas
+        )
+        return registrar_respuestas_en_progreso(db, 7, 1, len(preguntas))
+
+    # --- Tests para registrar_respuestas_en_progreso ---
+    def test_registrar_respuestas_inicializa_progreso(self):
+        db = self.Session()
+        progreso = self.responder(db, 1, 2)
+        db.commit()
+
+        self.assertEqual(progreso.respuestas_contestadas, 2)
+        self.assertEqual(progreso.total_preguntas, 4)
+        self.assertFalse(progreso.completado)
+        db.close()
+
+    def test_registrar_respuestas_incrementa_y_completa(self):
+        db = self.Session()
+        self.responder(db, 1, 2)
+        db.commit()
+
+        progreso = self.responder(db, 3, 4)
+        db.commit()
+        self.assertEqual(progreso.respuestas_contestadas, 4)
+        self.assertTrue(progreso.completado)
+        db.close()
+
+    def test_registrar_respuestas_no_pierde_incrementos_concurrentes(self):
+        db = self.Session()
+        self.responder(db, 1)
+        db.commit()
+
+        # Otra sesión ya leyó el progreso antes de que esta sume sus respuestas
+        otra = self.Session()
+        otra.query(ProgresoTestUsuario).one()
+        self.responder(db, 2, 3)
+        db.commit()
+
+        progreso = self.responder(otra, 4)
+        otra.commit()
+        self.assertEqual(progreso.respuestas_contestadas, 4)
+        self.assertTrue(progreso.completado)
+        db.close()
+        otra.close()
+
+    def test_registrar_respuestas_suma_si_otra_peticion_creo_el_progreso(self):
+        db = self.Session()
+        db.add(ProgresoTestUsuario(
+            usuario_id=7, test_id=1, respuestas_contestadas=1, total_preguntas=4, completado=False
+        ))
+        db.commit()
+
+        # La primera actualización no encuentra el registro (se creó justo después) y el
+        # INSERT en conflicto debe sumar las respuestas en lugar de fallar
+        consulta = MagicMock()
+        consulta.filter.return_value.update.return_value = 0
+        query_original = db.query
+        llamadas = iter([consulta])
+        db.query = lambda *args: next(llamadas, None) or query_original(*args)
+
+        progreso = self.responder(db, 2, 3)
+        db.commit()
+        self.assertEqual(progreso.respuestas_contestadas, 3)
+        self.assertFalse(progreso.completado)
+        db.close()
+
+    def test_registrar_respuestas_test_sin_preguntas_no_se_completa(self):
+        db = self.Session()
+        db.add(Test(id=2, nombre="Vacío", descripcion="Sin preguntas"))
+        db.commit()
+
+        progreso = registrar_respuestas_en_progreso(db, 7, 2, 0)
+        self.assertEqual(progreso.total_preguntas, 0)
+        self.assertFalse(progreso.completado)
+        db.close()
+
+    # --- Tests para reconstruir_progreso_tests ---
+    def test_reconstruir_progreso_tests(self):
+        mock_session = MagicMock()
+        query_preguntas = MagicMock()
+        query_preguntas.group_by.return_value.all.return_value = [(1, 2), (2, 3)]
+        query_respuestas = MagicMock()
+        query_respuestas.group_by.return_value.all.return_value = [
+            SimpleNamespace(usuario_id=10, test_id=1, cantidad=2),
+            SimpleNamespace(usuario_id=11, test_id=2, cantidad=1),
+        ]
+        query_borrado = MagicMock()
+        mock_session.query.side_effect = [query_preguntas, query_respuestas, query_borrado]
+
+        total = reconstruir_progreso_tests(mock_session)
+        self.assertEqual(total, 2)
+        query_borrado.delete.assert_called_once()
+        registros = list(mock_session.add_all.call_args[0][0])
+        self.assertEqual(
+            [(r.usuario_id, r.test_id, r.respuestas_contestadas, r.total_preguntas, r.completado) for r in registros],
+            [(10, 1, 2, 2, True), (11, 2, 1, 3, False)],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
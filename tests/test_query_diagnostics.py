@@ -0,0 +1,102 @@
+import io
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import config
+from app.core.executor import run_blocking
+from app.core.query_diagnostics import (
+    MiddlewareDiagnosticoConsultas,
+    PresupuestoConsultasExcedido,
+    definir_presupuesto_consultas,
+    instrumentar_diagnostico,
+    presupuesto_consultas,
+)
+
+
+class TestQueryDiagnostics(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        instrumentar_diagnostico(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def consultar(self, veces=1, sql="SELECT 1"):
+        with self.engine.connect() as conn:
+            for _ in range(veces):
+                conn.execute(text(sql))
+
+    def test_presupuesto_consultas_cuenta_las_consultas_del_bloque(self):
+        with presupuesto_consultas() as diagnostico:
+            self.consultar(3)
+        self.assertEqual(diagnostico.total, 3)
+
+    def test_presupuesto_consultas_falla_al_excederse(self):
+        with self.assertRaises(PresupuestoConsultasExcedido):
+            with presupuesto_consultas(2):
+                self.consultar(3)
+
+    def test_detecta_sentencias_repetidas_como_posible_n_mas_uno(self):
+        with patch.object(config, "QUERY_N_PLUS_ONE_THRESHOLD", 3):
+            with presupuesto_consultas() as diagnostico:
+                self.consultar(4, "SELECT 1")
+                self.consultar(1, "SELECT 2")
+            self.assertEqual(diagnostico.repetidas(), [("SELECT 1", 4)])
+
+    def test_registra_consultas_lentas_con_sus_parametros(self):
+        with self.engine.connect() as conn:
+            conn.connection.driver_connection.create_function(
+                "dormir", 1, lambda segundos: time.sleep(segundos) or 0
+            )
+            salida = io.StringIO()
+            with patch.object(config, "SLOW_QUERY_MS", 10), redirect_stdout(salida):
+                conn.execute(text("SELECT dormir(:segundos)"), {"segundos": 0.02})
+                conn.execute(text("SELECT 1"))
+
+        lineas = salida.getvalue().strip().splitlines()
+        self.assertEqual(len(lineas), 1)
+        self.assertIn("Consulta lenta", lineas[0])
+        self.assertIn("0.02", lineas[0])
+
+    def test_consultas_lentas_omiten_parametros_de_tablas_sensibles(self):
+        with self.engine.connect() as conn:
+            conn.connection.driver_connection.create_function(
+                "dormir", 1, lambda segundos: time.sleep(segundos) or 0
+            )
+            conn.execute(text("CREATE TABLE correos_salientes (cuerpo TEXT)"))
+            salida = io.StringIO()
+            with patch.object(config, "SLOW_QUERY_MS", 10), redirect_stdout(salida):
+                conn.execute(
+                    text("INSERT INTO correos_salientes (cuerpo) SELECT :cuerpo WHERE dormir(0.02) = 0"),
+                    {"cuerpo": "contraseña secreta"},
+                )
+
+        self.assertIn("Consulta lenta", salida.getvalue())
+        self.assertNotIn("contraseña secreta", salida.getvalue())
+
+    def test_middleware_cuenta_consultas_y_aplica_presupuesto_estricto(self):
+        app = FastAPI()
+
+        @app.get("/consultas/{veces}")
+        async def ejecutar_consultas(veces: int):
+            await run_blocking(self.consultar, veces)
+            return {"ok": True}
+
+        app.add_middleware(MiddlewareDiagnosticoConsultas)
+        definir_presupuesto_consultas("/consultas/{veces}", 2)
+
+        with TestClient(app) as client, patch.object(config, "QUERY_BUDGET_STRICT", True):
+            respuesta = client.get("/consultas/2")
+            self.assertEqual(respuesta.headers["x-query-count"], "2")
+            with self.assertRaises(PresupuestoConsultasExcedido):
+                client.get("/consultas/3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,7 +14,13 @@ from app.services.resena_service import (
     get_resenas_by_user_id_service,
     get_average_rating_service,
     edit_resena_service,
-    delete_resena_service
+    delete_resena_service,
+    codificar_cursor_resena,
+    decodificar_cursor_resena,
+    siguiente_cursor_resenas,
+    get_all_reviews_service,
+    get_all_reviews_page_service,
+    stream_all_reviews_service,
 )
 from app.models.mdl_resena import ResenaCreate
 from app.config import config
@@ -28,6 +34,18 @@ dummy_resena = SimpleNamespace(
     fecha_creacion=datetime(2025, 1, 1, tzinfo=timezone.utc)
 )
 
+# Dummy del resumen materializado de puntuaciones: 2 reseñas que suman 7
+dummy_resumen = SimpleNamespace(
+    total=2,
+    suma=7,
+    estrellas_1=0,
+    estrellas_2=0,
+    estrellas_3=1,
+    estrellas_4=1,
+    estrellas_5=0,
+    actualizado_en=datetime(2025, 1, 1, tzinfo=timezone.utc),
+)
+
 # Dummy para join: simulamos que al unir con Usuario, obtenemos un nombre de usuario
 dummy_resena_with_usuario = SimpleNamespace(
     id=10,
@@ -111,6 +129,78 @@ class TestResenaService(unittest.TestCase):
         self.assertEqual(context.exception.status_code, 500)
         self.assertEqual(context.exception.detail, "Query error")
 
+    # --- Tests para la paginación por cursor ---
+    def test_cursor_resena_ida_y_vuelta(self):
+        cursor = codificar_cursor_resena(datetime(2025, 1, 1, tzinfo=timezone.utc), 10)
+        self.assertNotIn("2025", cursor)
+        fecha, resena_id = decodificar_cursor_resena(cursor)
+        self.assertEqual((fecha.isoformat(), resena_id), ("2025-01-01", 10))
+
+    def test_cursor_resena_invalido(self):
+        with self.assertRaises(HTTPException) as context:
+            decodificar_cursor_resena("no-es-un-cursor")
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_siguiente_cursor_resenas(self):
+        pagina = [{"id": 10, "fecha_creacion": datetime(2025, 1, 1, tzinfo=timezone.utc)}]
+        self.assertIsNone(siguiente_cursor_resenas(pagina, limit=5))
+        self.assertEqual(
+            decodificar_cursor_resena(siguiente_cursor_resenas(pagina, limit=1))[1], 10
+        )
+
+    @patch("app.services.resena_service.get_db_session")
+    def test_get_resenas_paginated_desc_service_con_cursor(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_query = mock_session.query.return_value.join.return_value
+        mock_query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [dummy_resena_with_usuario]
+        mock_get_db_session.return_value = iter([mock_session])
+
+        cursor = codificar_cursor_resena(datetime(2025, 1, 2, tzinfo=timezone.utc), 11)
+        result = get_resenas_paginated_desc_service(page=3, limit=5, cursor=cursor)
+        self.assertEqual(result[0]["id"], dummy_resena_with_usuario.id)
+        # Con cursor no se usa OFFSET aunque se indique una página
+        mock_query.filter.return_value.order_by.return_value.offset.assert_not_called()
+
+    # --- Tests para el listado completo (proyección, cursor y NDJSON) ---
+    @patch("app.services.resena_service.get_db_session")
+    def test_get_all_reviews_service_proyeccion(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_session.query.return_value.join.return_value.order_by.return_value.all.return_value = [dummy_resena_with_usuario]
+        mock_get_db_session.return_value = iter([mock_session])
+
+        result = get_all_reviews_service(campos=["id", "puntuacion"])
+        self.assertEqual(result, [{"id": 10, "puntuacion": 4}])
+
+    def test_get_all_reviews_service_campo_invalido(self):
+        with self.assertRaises(HTTPException) as context:
+            get_all_reviews_service(campos=["id", "contrasena"])
+        self.assertEqual(context.exception.status_code, 400)
+
+    @patch("app.services.resena_service.get_db_session")
+    def test_get_all_reviews_page_service_retorna_cursor(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_query = mock_session.query.return_value.join.return_value
+        mock_query.order_by.return_value.offset.return_value.limit.return_value.all.return_value = [dummy_resena_with_usuario]
+        mock_get_db_session.return_value = iter([mock_session])
+
+        result = get_all_reviews_page_service(limit=1, campos=["id"])
+        self.assertEqual(result["data"], [{"id": 10}])
+        self.assertEqual(decodificar_cursor_resena(result["next_cursor"])[1], 10)
+
+    @patch("app.services.resena_service.get_db_session")
+    def test_stream_all_reviews_service_ndjson(self, mock_get_db_session):
+        mock_session = MagicMock()
+        mock_query = mock_session.query.return_value.join.return_value
+        mock_query.order_by.return_value.yield_per.return_value = [dummy_resena_with_usuario] * 3
+        mock_get_db_session.return_value = iter([mock_session])
+
+        stream = stream_all_reviews_service(campos=["id", "nombre_usuario"])
+        mock_session.close.assert_not_called()
+        contenido = b"".join(stream)
+        self.assertEqual(contenido.count(b"\n"), 3)
+        self.assertTrue(contenido.startswith(b'{"id":10,"nombre_usuario":"Test User"}\n'))
+        mock_session.close.assert_called_once()
+
     # --- Tests para get_resenas_paginated_asc_service ---
     @patch("app.services.resena_service.get_db_session")
     def test_get_resenas_paginated_asc_service_success(self, mock_get_db_session):
@@ -178,19 +268,19 @@ class TestResenaService(unittest.TestCase):
         self.assertEqual(context.exception.detail, "Query error")
 
     # --- Tests para get_average_rating_service ---
-    @patch("app.services.resena_service.get_db_session")
+    @patch("app.services.resumen_resenas_service.get_db_session")
     def test_get_average_rating_service_success(self, mock_get_db_session):
         mock_session = MagicMock()
-        mock_session.query.return_value.scalar.return_value = 3.5
+        mock_session.get.return_value = dummy_resumen
         mock_get_db_session.return_value = iter([mock_session])
         
         result = get_average_rating_service()
         self.assertEqual(result, 3.5)
 
-    @patch("app.services.resena_service.get_db_session")
+    @patch("app.services.resumen_resenas_service.get_db_session")
     def test_get_average_rating_service_unexpected_exception(self, mock_get_db_session):
         mock_session = MagicMock()
-        mock_session.query.side_effect = Exception("Query error")
+        mock_session.get.side_effect = Exception("Query error")
         mock_get_db_session.return_value = iter([mock_session])
         
         with self.assertRaises(HTTPException) as context:
@@ -336,19 +426,19 @@ class TestResenaService(unittest.TestCase):
         self.assertEqual(context.exception.detail, "Delete error")
 
     # --- Tests para get_average_rating_service ---
-    @patch("app.services.resena_service.get_db_session")
+    @patch("app.services.resumen_resenas_service.get_db_session")
     def test_get_average_rating_service_success(self, mock_get_db_session):
         mock_session = MagicMock()
-        mock_session.query.return_value.scalar.return_value = 3.5
+        mock_session.get.return_value = dummy_resumen
         mock_get_db_session.return_value = iter([mock_session])
         
         result = get_average_rating_service()
         self.assertEqual(result, 3.5)
 
-    @patch("app.services.resena_service.get_db_session")
+    @patch("app.services.resumen_resenas_service.get_db_session")
     def test_get_average_rating_service_unexpected_exception(self, mock_get_db_session):
         mock_session = MagicMock()
-        mock_session.query.side_effect = Exception("Query error")
+        mock_session.get.side_effect = Exception("Query error")
         mock_get_db_session.return_value = iter([mock_session])
         
         with self.assertRaises(HTTPException) as context:
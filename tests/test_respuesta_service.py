@@ -142,7 +142,7 @@ class TestRespuestaService(unittest.TestCase):
     def test_create_respuesta_service_success(self, mock_get_db_session):
         mock_session = MagicMock()
         # Simular que la pregunta existe
-        dummy_question = SimpleNamespace(id=1)
+        dummy_question = SimpleNamespace(id=1, test_id=1)
         mock_session.query.return_value.filter.return_value.first.return_value = dummy_question
         # Simular que se asigna un id a la nueva respuesta
         nueva_respuesta = SimpleNamespace(id=50)
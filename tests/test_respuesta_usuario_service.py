@@ -4,13 +4,19 @@ from types import SimpleNamespace
 from datetime import datetime, timezone
 
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from app.services.respuesta_usuario_service import (
     list_respuestas_usuario,
     create_respuesta_usuario_service,
+    create_respuestas_usuario_batch_service,
     update_respuesta_usuario_service,
     delete_respuestas_usuario_admin_service
 )
-from app.models.mdl_respuesta_usuario import RespuestaDeUsuarioCreate, RespuestaDeUsuarioUpdate
+from app.models.mdl_respuesta_usuario import (
+    RespuestaDeUsuarioBatchCreate,
+    RespuestaDeUsuarioCreate,
+    RespuestaDeUsuarioUpdate,
+)
 from app.config import config
 
 # Dummy objetos para simular registros y relaciones
@@ -81,9 +87,11 @@ class TestRespuestaUsuarioService(unittest.TestCase):
         self.assertEqual(context.exception.detail, "Unexpected query error")
 
     # --- Tests para create_respuesta_usuario_service ---
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
     @patch("app.services.respuesta_usuario_service.get_db_session")
-    def test_create_respuesta_usuario_service_success(self, mock_get_db_session):
+    def test_create_respuesta_usuario_service_success(self, mock_get_db_session, mock_progreso):
         mock_session = MagicMock()
+        mock_progreso.return_value = SimpleNamespace(completado=False)
         # Simular que las entidades relacionadas existen: test, pregunta y respuesta
         mock_session.query.return_value.filter.return_value.first.side_effect = [dummy_test, dummy_pregunta, dummy_respuesta]
         # Simular asignación de id en refresh
@@ -101,6 +109,41 @@ class TestRespuestaUsuarioService(unittest.TestCase):
         self.assertEqual(result["message"], "Respuesta creada exitosamente.")
         self.assertEqual(result["data"]["id"], nueva_respuesta.id)
         mock_session.commit.assert_called_once()
+        mock_progreso.assert_called_once_with(mock_session, admin_user["user_id"], 1, 1)
+
+    @patch("app.services.respuesta_usuario_service.create_or_update_vocacion_usuario_service")
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuesta_usuario_service_completes_test(self, mock_get_db_session, mock_progreso, mock_vocacion):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.first.side_effect = [dummy_test, dummy_pregunta, dummy_respuesta]
+        mock_session.add.side_effect = lambda x: setattr(x, "id", 51)
+        mock_progreso.return_value = SimpleNamespace(completado=True)
+        mock_vocacion.return_value = {"message": "Vocación creada exitosamente.", "data": {"id": 9}}
+        mock_get_db_session.return_value = iter([mock_session])
+
+        respuesta_data = RespuestaDeUsuarioCreate(test_id=1, pregunta_id=2, respuesta_id=3)
+        result = create_respuesta_usuario_service(respuesta_data, admin_user)
+        self.assertIn("test completado", result["message"])
+        self.assertEqual(result["data"]["vocacion"], {"id": 9})
+        mock_vocacion.assert_called_once_with(1, admin_user)
+
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuesta_usuario_service_duplicate_answer(self, mock_get_db_session, mock_progreso):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.first.side_effect = [dummy_test, dummy_pregunta, dummy_respuesta]
+        mock_progreso.return_value = SimpleNamespace(completado=False)
+        # El índice único (usuario, pregunta) rechaza la segunda respuesta a la misma pregunta
+        mock_session.commit.side_effect = IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        mock_get_db_session.return_value = iter([mock_session])
+
+        respuesta_data = RespuestaDeUsuarioCreate(test_id=1, pregunta_id=2, respuesta_id=3)
+        with self.assertRaises(HTTPException) as context:
+            create_respuesta_usuario_service(respuesta_data, admin_user)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertIn("ya fue respondida", context.exception.detail)
+        mock_session.rollback.assert_called_once()
 
     @patch("app.services.respuesta_usuario_service.get_db_session")
     def test_create_respuesta_usuario_service_entity_not_found(self, mock_get_db_session):
@@ -153,10 +196,114 @@ class TestRespuestaUsuarioService(unittest.TestCase):
         self.assertEqual(context.exception.status_code, 500)
         self.assertEqual(context.exception.detail, "Unexpected error")
 
+    # --- Tests para create_respuestas_usuario_batch_service ---
+    def _batch_queries(self, relaciones, existentes):
+        # Secuencia: validación agregada y respuestas ya registradas
+        query_relaciones = MagicMock()
+        query_relaciones.join.return_value.filter.return_value.all.return_value = relaciones
+        query_existentes = MagicMock()
+        query_existentes.filter.return_value.all.return_value = existentes
+        return [query_relaciones, query_existentes]
+
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuestas_usuario_batch_service_upsert(self, mock_get_db_session, mock_progreso):
+        mock_session = MagicMock()
+        mock_progreso.return_value = SimpleNamespace(completado=False)
+        existente = SimpleNamespace(id=70, pregunta_id=2, respuesta_id=3)
+        mock_session.query.side_effect = self._batch_queries(
+            relaciones=[SimpleNamespace(id=4, pregunta_id=2), SimpleNamespace(id=5, pregunta_id=6)],
+            existentes=[existente],
+        )
+        mock_get_db_session.return_value = iter([mock_session])
+
+        batch = RespuestaDeUsuarioBatchCreate(
+            test_id=1,
+            respuestas=[{"pregunta_id": 2, "respuesta_id": 4}, {"pregunta_id": 6, "respuesta_id": 5}],
+        )
+        result = create_respuestas_usuario_batch_service(batch, dummy_usuario)
+        self.assertEqual(result["message"], "Respuestas registradas exitosamente.")
+        self.assertEqual(result["data"], {"creadas": 1, "actualizadas": 1})
+        self.assertEqual(existente.respuesta_id, 4)
+        nuevas = mock_session.add_all.call_args[0][0]
+        self.assertEqual([(r.pregunta_id, r.respuesta_id) for r in nuevas], [(6, 5)])
+        mock_session.commit.assert_called_once()
+        # Solo las respuestas nuevas incrementan el progreso
+        mock_progreso.assert_called_once_with(mock_session, dummy_usuario["user_id"], 1, 1)
+
+    @patch("app.services.respuesta_usuario_service.create_or_update_vocacion_usuario_service")
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuestas_usuario_batch_service_completes_test(self, mock_get_db_session, mock_progreso, mock_vocacion):
+        mock_session = MagicMock()
+        mock_progreso.return_value = SimpleNamespace(completado=True)
+        mock_session.query.side_effect = self._batch_queries(
+            relaciones=[SimpleNamespace(id=3, pregunta_id=2)],
+            existentes=[],
+        )
+        mock_get_db_session.return_value = iter([mock_session])
+        mock_vocacion.return_value = {"message": "Vocación creada exitosamente.", "data": {"id": 9}}
+
+        batch = RespuestaDeUsuarioBatchCreate(test_id=1, respuestas=[{"pregunta_id": 2, "respuesta_id": 3}])
+        result = create_respuestas_usuario_batch_service(batch, dummy_usuario)
+        self.assertIn("test completado", result["message"])
+        self.assertEqual(result["data"]["vocacion"], {"id": 9})
+        mock_vocacion.assert_called_once_with(1, dummy_usuario)
+
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuestas_usuario_batch_service_concurrent_batch(self, mock_get_db_session, mock_progreso):
+        mock_session = MagicMock()
+        mock_progreso.return_value = SimpleNamespace(completado=False)
+        mock_session.query.side_effect = self._batch_queries(
+            relaciones=[SimpleNamespace(id=3, pregunta_id=2)],
+            existentes=[],
+        )
+        # Un lote concurrente insertó la misma pregunta después de la consulta de existentes
+        mock_session.commit.side_effect = IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        mock_get_db_session.return_value = iter([mock_session])
+
+        batch = RespuestaDeUsuarioBatchCreate(test_id=1, respuestas=[{"pregunta_id": 2, "respuesta_id": 3}])
+        with self.assertRaises(HTTPException) as context:
+            create_respuestas_usuario_batch_service(batch, dummy_usuario)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertIn("Vuelva a enviar el lote", context.exception.detail)
+        self.assertNotIn("UNIQUE", context.exception.detail)
+        mock_session.rollback.assert_called_once()
+
+    @patch("app.services.respuesta_usuario_service.get_db_session")
+    def test_create_respuestas_usuario_batch_service_invalid_ids(self, mock_get_db_session):
+        mock_session = MagicMock()
+        # La respuesta 4 pertenece a otra pregunta y la 8 no existe o no es de este test
+        mock_session.query.side_effect = self._batch_queries(
+            relaciones=[SimpleNamespace(id=4, pregunta_id=99)],
+            existentes=[],
+        )
+        mock_get_db_session.return_value = iter([mock_session])
+
+        batch = RespuestaDeUsuarioBatchCreate(
+            test_id=1,
+            respuestas=[{"pregunta_id": 2, "respuesta_id": 4}, {"pregunta_id": 6, "respuesta_id": 8}],
+        )
+        with self.assertRaises(HTTPException) as context:
+            create_respuestas_usuario_batch_service(batch, dummy_usuario)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertIn("[2, 6]", context.exception.detail)
+        mock_session.commit.assert_not_called()
+
+    def test_batch_model_rejects_duplicate_preguntas(self):
+        with self.assertRaises(ValueError):
+            RespuestaDeUsuarioBatchCreate(
+                test_id=1,
+                respuestas=[{"pregunta_id": 2, "respuesta_id": 3}, {"pregunta_id": 2, "respuesta_id": 4}],
+            )
+
     # --- Tests para update_respuesta_usuario_service ---
+    @patch("app.services.respuesta_usuario_service.registrar_respuestas_en_progreso")
     @patch("app.services.respuesta_usuario_service.get_db_session")
-    def test_update_respuesta_usuario_service_success(self, mock_get_db_session):
+    def test_update_respuesta_usuario_service_success(self, mock_get_db_session, mock_progreso):
         mock_session = MagicMock()
+        mock_progreso.return_value = SimpleNamespace(completado=False)
         dummy_respuesta_usuario = SimpleNamespace(
             id=30,
             test_id=1,
@@ -209,8 +356,9 @@ class TestRespuestaUsuarioService(unittest.TestCase):
         self.assertEqual(context.exception.detail, "Update error")
 
     # --- Tests para delete_respuestas_usuario_admin_service ---
+    @patch("app.services.respuesta_usuario_service.eliminar_progreso_test")
     @patch("app.services.respuesta_usuario_service.get_db_session")
-    def test_delete_respuestas_usuario_admin_service_success(self, mock_get_db_session):
+    def test_delete_respuestas_usuario_admin_service_success(self, mock_get_db_session, mock_eliminar_progreso):
         mock_session = MagicMock()
         dummy_respuestas = [SimpleNamespace(id=40), SimpleNamespace(id=41)]
         mock_session.query.return_value.filter.return_value.all.return_value = dummy_respuestas
@@ -220,6 +368,7 @@ class TestRespuestaUsuarioService(unittest.TestCase):
         self.assertIn("message", result)
         self.assertIn("eliminadas exitosamente", result["message"])
         mock_session.commit.assert_called_once()
+        mock_eliminar_progreso.assert_called_once_with(mock_session, 1)
 
     @patch("app.services.respuesta_usuario_service.get_db_session")
     def test_delete_respuestas_usuario_admin_service_not_admin(self, mock_get_db_session):
@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.sch_base import Base
+from app.schemas.sch_resena import Resena
+from app.schemas.sch_resumen_resena import ResumenResenas
+from app.schemas.sch_usuario import Usuario
+from app.services.resumen_resenas_service import (
+    RESUMEN_ID,
+    asegurar_resumen_resenas,
+    obtener_resumen_resenas,
+    reconstruir_resumen_resenas,
+    registrar_puntuacion_en_resumen,
+)
+
+
+class TestResumenResenasService(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False)()
+        self.db.add(Usuario(id=1, nombre="Ana", email="ana@x.com", sexo="Femenino", contrasena="x"))
+        self.db.add_all(
+            [
+                Resena(id_usuario=1, comentario="Muy bueno", puntuacion=5),
+                Resena(id_usuario=1, comentario="Regular", puntuacion=3),
+                Resena(id_usuario=1, comentario="Excelente", puntuacion=5),
+            ]
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def resumen(self):
+        self.db.expire_all()
+        return self.db.get(ResumenResenas, RESUMEN_ID)
+
+    def test_reconstruir_resumen_calcula_total_suma_e_histograma(self):
+        reconstruir_resumen_resenas(self.db)
+        self.db.commit()
+
+        resumen = self.resumen()
+        self.assertEqual((resumen.total, resumen.suma), (3, 13))
+        self.assertEqual(
+            [resumen.estrellas_1, resumen.estrellas_2, resumen.estrellas_3,
+             resumen.estrellas_4, resumen.estrellas_5],
+            [0, 0, 1, 0, 2],
+        )
+
+    def test_registrar_puntuacion_crear_editar_y_eliminar(self):
+        asegurar_resumen_resenas(self.db)
+
+        registrar_puntuacion_en_resumen(self.db, puntuacion=4)
+        self.db.commit()
+        resumen = self.resumen()
+        self.assertEqual((resumen.total, resumen.suma, resumen.estrellas_4), (4, 17, 1))
+
+        registrar_puntuacion_en_resumen(self.db, puntuacion=1, puntuacion_anterior=5)
+        self.db.commit()
+        resumen = self.resumen()
+        self.assertEqual((resumen.total, resumen.suma), (4, 13))
+        self.assertEqual((resumen.estrellas_1, resumen.estrellas_5), (1, 1))
+
+        registrar_puntuacion_en_resumen(self.db, puntuacion_anterior=3)
+        self.db.commit()
+        resumen = self.resumen()
+        self.assertEqual((resumen.total, resumen.suma, resumen.estrellas_3), (3, 10, 0))
+
+    def test_registrar_sin_resumen_no_lo_crea(self):
+        registrar_puntuacion_en_resumen(self.db, puntuacion=4)
+        self.db.commit()
+        self.assertIsNone(self.resumen())
+
+    @patch("app.services.resumen_resenas_service.get_db_session")
+    def test_obtener_resumen_lo_construye_si_no_existe(self, mock_get_db_session):
+        db = sessionmaker(bind=self.engine)()
+        mock_get_db_session.return_value = iter([db])
+
+        resumen = obtener_resumen_resenas()
+        self.assertEqual(resumen["total_resenas"], 3)
+        self.assertAlmostEqual(resumen["average_rating"], 13 / 3)
+        self.assertEqual(resumen["histograma"], {"1": 0, "2": 0, "3": 1, "4": 0, "5": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
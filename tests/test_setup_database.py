@@ -0,0 +1,183 @@
+import unittest
+from unittest.mock import patch
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.depurar_respuestas_duplicadas import (
+    eliminar_respuestas_duplicadas,
+    recalcular_vocaciones,
+)
+from app.db.setup_database import sync_indexes
+from app.schemas.sch_base import Base
+from app.schemas.sch_pregunta import Pregunta
+from app.schemas.sch_respuesta import Respuesta
+from app.schemas.sch_respuesta_usuario import RespuestaDeUsuario
+from app.schemas.sch_vocacion_usuario import VocacionDeUsuarioPorTest
+
+# Consultas de los caminos críticos y la tabla que cada una debe resolver mediante un índice
+HOT_QUERIES = {
+    "listar respuestas del usuario": (
+        "respuestas_de_usuario",
+        select(RespuestaDeUsuario).where(
+            RespuestaDeUsuario.test_id == 1, RespuestaDeUsuario.usuario_id == 2
+        ),
+    ),
+    "editar respuesta del usuario": (
+        "respuestas_de_usuario",
+        select(RespuestaDeUsuario).where(
+            RespuestaDeUsuario.test_id == 1,
+            RespuestaDeUsuario.pregunta_id == 3,
+            RespuestaDeUsuario.usuario_id == 2,
+        ),
+    ),
+    "calcular vocación": (
+        "respuestas_de_usuario",
+        select(Respuesta.vocacion, func.count(RespuestaDeUsuario.id))
+        .join(Respuesta, Respuesta.id == RespuestaDeUsuario.respuesta_id)
+        .where(RespuestaDeUsuario.test_id == 1, RespuestaDeUsuario.usuario_id == 2)
+        .group_by(Respuesta.vocacion),
+    ),
+    "eliminar respuestas del test": (
+        "respuestas_de_usuario",
+        select(RespuestaDeUsuario.id).where(RespuestaDeUsuario.test_id == 1),
+    ),
+    "vocación del usuario por test": (
+        "vocaciones_de_usuario_por_test",
+        select(VocacionDeUsuarioPorTest).where(
+            VocacionDeUsuarioPorTest.id_usuario == 2, VocacionDeUsuarioPorTest.id_test == 1
+        ),
+    ),
+    "preguntas del test": (
+        "preguntas",
+        select(func.count(Pregunta.id)).where(Pregunta.test_id == 1),
+    ),
+    "respuestas de la pregunta": (
+        "respuestas",
+        select(Respuesta).where(Respuesta.pregunta_id == 3),
+    ),
+}
+
+
+def query_plan(connection, statement):
+    # Retorna el detalle de EXPLAIN QUERY PLAN para una consulta de SQLAlchemy
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def uses_index(plan, table_name):
+    return any(
+        detail.startswith(f"SEARCH {table_name} USING") and "INDEX" in detail
+        for detail in plan
+    )
+
+
+class TestSyncIndexes(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        # Simular una base de datos anterior a los índices administrados
+        with self.engine.begin() as connection:
+            for table in Base.metadata.tables.values():
+                for index in table.indexes:
+                    connection.execute(text(f"DROP INDEX {index.name}"))
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_query_plans_before_and_after_sync(self):
+        with self.engine.begin() as connection:
+            for name, (table_name, statement) in HOT_QUERIES.items():
+                plan = query_plan(connection, statement)
+                self.assertFalse(uses_index(plan, table_name), f"{name}: {plan}")
+                self.assertIn(f"SCAN {table_name}", plan, name)
+
+            sync_indexes(connection)
+
+            for name, (table_name, statement) in HOT_QUERIES.items():
+                plan = query_plan(connection, statement)
+                self.assertTrue(uses_index(plan, table_name), f"{name}: {plan}")
+
+    def test_sync_indexes_is_idempotent_and_drops_unknown_indexes(self):
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE INDEX ix_obsoleto ON respuestas (vocacion)"))
+            sync_indexes(connection)
+            sync_indexes(connection)
+            names = {
+                row[0]
+                for row in connection.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'respuestas'")
+                )
+            }
+        self.assertIn("ix_respuestas_pregunta_id", names)
+        self.assertNotIn("ix_obsoleto", names)
+
+    def indexes(self, connection, table_name):
+        return {
+            row[0]
+            for row in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :tabla"),
+                {"tabla": table_name},
+            )
+        }
+
+    def test_unique_index_is_skipped_while_duplicates_exist(self):
+        insert = text(
+            "INSERT INTO respuestas_de_usuario (test_id, pregunta_id, respuesta_id, usuario_id) "
+            "VALUES (1, 3, :respuesta_id, 2)"
+        )
+        with self.engine.begin() as connection:
+            connection.execute(insert, {"respuesta_id": 10})
+            connection.execute(insert, {"respuesta_id": 11})
+            with patch("builtins.print") as mock_print:
+                sync_indexes(connection)
+            rows = connection.execute(
+                text("SELECT respuesta_id FROM respuestas_de_usuario ORDER BY id")
+            ).fetchall()
+            indexes = self.indexes(connection, "respuestas_de_usuario")
+
+        # Al arrancar no se borran respuestas: se informa y se omite el índice único
+        self.assertEqual(rows, [(10,), (11,)])
+        self.assertNotIn("uq_respuestas_usuario_usuario_pregunta", indexes)
+        self.assertIn("ix_respuestas_usuario_test_usuario", indexes)
+        self.assertTrue(any("1 filas duplicadas" in str(c) for c in mock_print.call_args_list))
+
+    def test_depuracion_explicita_conserva_la_mas_reciente_y_crea_el_indice(self):
+        insert = text(
+            "INSERT INTO respuestas_de_usuario (test_id, pregunta_id, respuesta_id, usuario_id) "
+            "VALUES (:test_id, :pregunta_id, :respuesta_id, :usuario_id)"
+        )
+        with self.engine.begin() as connection:
+            connection.execute(insert, {"test_id": 1, "pregunta_id": 3, "respuesta_id": 10, "usuario_id": 2})
+            connection.execute(insert, {"test_id": 1, "pregunta_id": 3, "respuesta_id": 11, "usuario_id": 2})
+            connection.execute(insert, {"test_id": 1, "pregunta_id": 3, "respuesta_id": 10, "usuario_id": 5})
+            eliminadas, afectados = eliminar_respuestas_duplicadas(connection)
+            rows = connection.execute(
+                text("SELECT usuario_id, respuesta_id FROM respuestas_de_usuario ORDER BY id")
+            ).fetchall()
+
+        self.assertEqual(eliminadas, 1)
+        self.assertEqual(afectados, {(2, 1)})
+        self.assertEqual(rows, [(2, 11), (5, 10)])
+        with self.assertRaises(IntegrityError):
+            with self.engine.begin() as connection:
+                connection.execute(insert, {"test_id": 1, "pregunta_id": 3, "respuesta_id": 12, "usuario_id": 2})
+
+    @patch("app.db.depurar_respuestas_duplicadas.create_or_update_vocacion_usuario_service")
+    def test_recalcular_vocaciones_de_los_afectados(self, mock_vocacion):
+        mock_vocacion.side_effect = [
+            {"message": "ok"},
+            HTTPException(status_code=400, detail="No se han respondido todas las preguntas del test."),
+        ]
+        with patch("builtins.print"):
+            recalculadas = recalcular_vocaciones({(2, 1), (5, 1)})
+
+        self.assertEqual(recalculadas, 1)
+        mock_vocacion.assert_any_call(1, {"user_id": 2})
+        mock_vocacion.assert_any_call(1, {"user_id": 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
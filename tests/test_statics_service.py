@@ -157,12 +157,13 @@ class TestStaticsService(unittest.TestCase):
         self.assertIn("Error interno", context.exception.detail)
 
     # --- Tests for obtener_moda_vocacion_mas_comun ---
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_obtener_moda_vocacion_mas_comun_success(self, mock_get_db_session):
+    def test_obtener_moda_vocacion_mas_comun_success(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
-        # Simular cadena: query.group_by().order_by().first()
+        # Simular cadena sobre el snapshot: query.filter().order_by().first()
         mock_query = MagicMock()
-        mock_query.group_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.order_by.return_value = mock_query
         mock_query.first.return_value = dummy_moda
         mock_session.query.return_value = mock_query
@@ -172,12 +173,15 @@ class TestStaticsService(unittest.TestCase):
         self.assertEqual(result["moda_vocacion"], dummy_moda[0])
         self.assertEqual(result["conteo"], dummy_moda[1])
         self.assertIn("La vocación más común es", result["message"])
+        # La consulta se resuelve desde el snapshot materializado
+        mock_asegurar.assert_called_once_with(mock_session)
 
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_obtener_moda_vocacion_mas_comun_no_data(self, mock_get_db_session):
+    def test_obtener_moda_vocacion_mas_comun_no_data(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
         mock_query = MagicMock()
-        mock_query.group_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.order_by.return_value = mock_query
         mock_query.first.return_value = None
         mock_session.query.return_value = mock_query
@@ -230,13 +234,15 @@ class TestStaticsService(unittest.TestCase):
         self.assertIn("Error interno", context.exception.detail)
 
     # --- Tests for vocacion_mas_comun_por_ciudad_service ---
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_vocacion_mas_comun_por_ciudad_service_success(self, mock_get_db_session):
+    def test_vocacion_mas_comun_por_ciudad_service_success(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
         # Configurar la cadena de llamadas para que .all() devuelva una lista con un objeto dummy
         mock_query = MagicMock()
+        mock_query.select_from.return_value = mock_query
         mock_query.join.return_value = mock_query
-        mock_query.group_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.order_by.return_value = mock_query
         mock_query.all.return_value = [dummy_vocacion_ciudad]
         mock_session.query.return_value = mock_query
@@ -246,12 +252,14 @@ class TestStaticsService(unittest.TestCase):
         self.assertEqual(result[0]["id_ciudad"], dummy_vocacion_ciudad.id_ciudad)
         self.assertEqual(result[0]["nombre_ciudad"], dummy_vocacion_ciudad.nombre_ciudad)
 
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_vocacion_mas_comun_por_ciudad_service_no_data(self, mock_get_db_session):
+    def test_vocacion_mas_comun_por_ciudad_service_no_data(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
         mock_query = MagicMock()
+        mock_query.select_from.return_value = mock_query
         mock_query.join.return_value = mock_query
-        mock_query.group_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.order_by.return_value = mock_query
         mock_query.all.return_value = []
         mock_session.query.return_value = mock_query
@@ -277,13 +285,15 @@ class TestStaticsService(unittest.TestCase):
         self.assertIn("Error interno", context.exception.detail)
 
     # --- Tests for get_most_common_vocation_per_institution_service ---
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_get_most_common_vocation_per_institution_service_success(self, mock_get_db_session):
+    def test_get_most_common_vocation_per_institution_service_success(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
         # Configurar cadena para que .all() devuelva un listado con dummy_inst_vocacion
         mock_query = MagicMock()
+        mock_query.select_from.return_value = mock_query
         mock_query.join.return_value = mock_query
-        mock_query.group_by.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.all.return_value = [dummy_inst_vocacion]
         mock_session.query.return_value = mock_query
         mock_get_db_session.return_value = iter([mock_session])
@@ -292,10 +302,11 @@ class TestStaticsService(unittest.TestCase):
         self.assertEqual(result[0]["ID_Institucion"], dummy_inst_vocacion.id)
         self.assertEqual(result[0]["Moda_Vocacion"], dummy_inst_vocacion.moda_vocacion)
 
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_get_most_common_vocation_per_institution_service_no_data(self, mock_get_db_session):
+    def test_get_most_common_vocation_per_institution_service_no_data(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
-        mock_session.query.return_value.join.return_value.group_by.return_value.all.return_value = []
+        mock_session.query.return_value.select_from.return_value.join.return_value.filter.return_value.all.return_value = []
         mock_get_db_session.return_value = iter([mock_session])
         with self.assertRaises(HTTPException) as context:
             get_most_common_vocation_per_institution_service(admin_user)
@@ -318,13 +329,13 @@ class TestStaticsService(unittest.TestCase):
         self.assertIn("Error interno", context.exception.detail)
 
     # --- Tests for get_most_common_vocation_per_gender_service ---
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_get_most_common_vocation_per_gender_service_success(self, mock_get_db_session):
+    def test_get_most_common_vocation_per_gender_service_success(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
-        # Configurar cadena para que .group_by().having().all() devuelva una lista con dummy_gender
+        # Configurar cadena para que .filter().all() devuelva una lista con dummy_gender
         mock_query = MagicMock()
-        mock_query.group_by.return_value = mock_query
-        mock_query.having.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.all.return_value = [dummy_gender]
         mock_session.query.return_value = mock_query
         mock_get_db_session.return_value = iter([mock_session])
@@ -333,12 +344,12 @@ class TestStaticsService(unittest.TestCase):
         self.assertEqual(result[0]["Sexo"], dummy_gender.sexo)
         self.assertEqual(result[0]["Moda_Vocacion"], dummy_gender.moda_vocacion)
 
+    @patch("app.services.statics_service.asegurar_snapshot_estadisticas")
     @patch("app.services.statics_service.get_db_session")
-    def test_get_most_common_vocation_per_gender_service_no_data(self, mock_get_db_session):
+    def test_get_most_common_vocation_per_gender_service_no_data(self, mock_get_db_session, mock_asegurar):
         mock_session = MagicMock()
         mock_query = MagicMock()
-        mock_query.group_by.return_value = mock_query
-        mock_query.having.return_value = mock_query
+        mock_query.filter.return_value = mock_query
         mock_query.all.return_value = []
         mock_session.query.return_value = mock_query
         mock_get_db_session.return_value = iter([mock_session])
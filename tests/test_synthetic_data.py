@@ -0,0 +1,123 @@
+import unittest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.password_pool import pwd_context
+from app.db.synthetic_data import CONTRASENA_SINTETICA, generar_datos_sinteticos
+from app.schemas.sch_base import Base
+from app.schemas.sch_ciudad import Ciudad
+from app.schemas.sch_institucion import Institucion
+from app.services.vocacion_usuario_service import calcular_distribucion_vocaciones
+
+PARAMETROS = dict(
+    usuarios=40,
+    tests=2,
+    preguntas_min=5,
+    preguntas_max=8,
+    respuestas_min=4,
+    respuestas_max=6,
+    proporcion_incompletos=0.2,
+    proporcion_resenas=0.5,
+    lote=15,
+)
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    def crear_engine(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add_all(
+                [
+                    Ciudad(nombre="Bogotá", latitud=4.6, longitud=-74.1),
+                    Ciudad(nombre="Valledupar", latitud=10.5, longitud=-73.3),
+                    Institucion(nombre="Colegio", direccion="Calle 1", telefono="300"),
+                ]
+            )
+            db.commit()
+        self.addCleanup(engine.dispose)
+        return engine
+
+    def contar(self, engine, tabla):
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {tabla}")).scalar()
+
+    def test_genera_los_volumenes_solicitados(self):
+        engine = self.crear_engine()
+        totales = generar_datos_sinteticos(engine, semilla=1, **PARAMETROS)
+
+        self.assertEqual(self.contar(engine, "usuarios"), 40)
+        self.assertEqual(self.contar(engine, "tests"), 2)
+        for tabla in ("preguntas", "respuestas_de_usuario", "vocaciones_de_usuario_por_test", "resenas"):
+            self.assertEqual(self.contar(engine, tabla), totales[tabla])
+        with engine.connect() as conn:
+            por_pregunta = conn.execute(
+                text("SELECT MIN(c), MAX(c) FROM (SELECT COUNT(*) c FROM respuestas GROUP BY pregunta_id)")
+            ).one()
+            resumen = conn.execute(text("SELECT total FROM resumen_resenas")).scalar()
+        self.assertGreaterEqual(por_pregunta[0], 4)
+        self.assertLessEqual(por_pregunta[1], 6)
+        self.assertEqual(resumen, totales["resenas"])
+
+    def test_requiere_la_base_de_destino(self):
+        with self.assertRaises(ValueError):
+            generar_datos_sinteticos(None, semilla=1, **PARAMETROS)
+        with self.assertRaises(TypeError):
+            generar_datos_sinteticos(semilla=1, **PARAMETROS)
+
+    def test_rechaza_una_segunda_ejecucion_sobre_la_misma_base(self):
+        engine = self.crear_engine()
+        generar_datos_sinteticos(engine, semilla=1, **PARAMETROS)
+
+        with self.assertRaises(ValueError):
+            generar_datos_sinteticos(engine, semilla=1, **PARAMETROS)
+        # No quedan tests huérfanos de la ejecución rechazada
+        self.assertEqual(self.contar(engine, "tests"), 2)
+        self.assertEqual(self.contar(engine, "usuarios"), 40)
+
+    def test_misma_semilla_genera_los_mismos_datos(self):
+        consultas = [
+            "SELECT * FROM usuarios ORDER BY id",
+            "SELECT * FROM respuestas_de_usuario ORDER BY id",
+            "SELECT * FROM vocaciones_de_usuario_por_test ORDER BY id",
+        ]
+        resultados = []
+        for _ in range(2):
+            engine = self.crear_engine()
+            generar_datos_sinteticos(engine, semilla=3, **PARAMETROS)
+            with engine.connect() as conn:
+                resultados.append([conn.execute(text(sql)).all() for sql in consultas])
+        self.assertEqual(resultados[0], resultados[1])
+
+    def test_vocaciones_y_progreso_coinciden_con_las_respuestas(self):
+        engine = self.crear_engine()
+        generar_datos_sinteticos(engine, semilla=5, **PARAMETROS)
+
+        with Session(engine) as db:
+            progreso = db.execute(
+                text("SELECT usuario_id, test_id, respuestas_contestadas, completado FROM progreso_tests_usuario")
+            ).all()
+            vocaciones = {
+                (fila.id_usuario, fila.id_test): fila
+                for fila in db.execute(text("SELECT * FROM vocaciones_de_usuario_por_test")).all()
+            }
+            for usuario_id, test_id, contestadas, completado in progreso:
+                distribucion = calcular_distribucion_vocaciones(db, test_id, usuario_id)
+                self.assertEqual(sum(item["conteo"] for item in distribucion), contestadas)
+                self.assertEqual(bool(completado), (usuario_id, test_id) in vocaciones)
+                if completado:
+                    self.assertEqual(
+                        vocaciones[(usuario_id, test_id)].moda_vocacion, distribucion[0]["vocacion"]
+                    )
+
+    def test_usuarios_pueden_iniciar_sesion_con_la_contrasena_sintetica(self):
+        engine = self.crear_engine()
+        generar_datos_sinteticos(engine, semilla=1, **{**PARAMETROS, "usuarios": 1})
+        with engine.connect() as conn:
+            contrasena = conn.execute(text("SELECT contrasena FROM usuarios")).scalar()
+        self.assertTrue(pwd_context.verify(CONTRASENA_SINTETICA, contrasena))
+
+
+if __name__ == "__main__":
+    unittest.main()
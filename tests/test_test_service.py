@@ -10,6 +10,9 @@ from app.services.test_service import (
     get_test_by_id_service,
     delete_test_service,
     update_test_service,
+    get_test_bundle_service,
+    _bundle_cache,
+    invalidar_cache_test,
 )
 from app.models.mdl_test import TestCreate
 from app.config import config
@@ -166,6 +169,77 @@ class TestTestService(unittest.TestCase):
         self.assertEqual(context.exception.status_code, 500)
         self.assertIn("Error al consultar el test", context.exception.detail)
 
+    # --- Tests para get_test_bundle_service ---
+    def _mock_bundle_session(self, filas):
+        mock_session = MagicMock()
+        mock_query = MagicMock()
+        mock_query.outerjoin.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.all.return_value = filas
+        mock_session.query.return_value = mock_query
+        return mock_session
+
+    def _fila_bundle(self, pregunta_id, enunciado, respuesta_id, respuesta, vocacion):
+        return SimpleNamespace(
+            id=100,
+            nombre="Test 100",
+            descripcion="Descripción test",
+            fecha_creacion=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            fecha_actualizacion=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            pregunta_id=pregunta_id,
+            enunciado=enunciado,
+            respuesta_id=respuesta_id,
+            respuesta=respuesta,
+            vocacion=vocacion,
+        )
+
+    @patch("app.services.test_service.get_db_session")
+    def test_get_test_bundle_service_agrupa_preguntas_y_respuestas(self, mock_get_db_session):
+        _bundle_cache.clear()
+        filas = [
+            self._fila_bundle(1, "Pregunta 1", 10, "Sí", "Ingeniería"),
+            self._fila_bundle(1, "Pregunta 1", 11, "No", "Arte"),
+            self._fila_bundle(2, "Pregunta 2", None, None, None),
+        ]
+        mock_session = self._mock_bundle_session(filas)
+        mock_get_db_session.return_value = iter([mock_session])
+
+        result = get_test_bundle_service(100, dummy_usuario)
+        self.assertEqual(result["id"], 100)
+        self.assertEqual(result["total_preguntas"], 2)
+        self.assertEqual([r["id"] for r in result["preguntas"][0]["respuestas"]], [10, 11])
+        self.assertEqual(result["preguntas"][1]["respuestas"], [])
+        mock_session.query.assert_called_once()
+
+    @patch("app.services.test_service.get_db_session")
+    def test_get_test_bundle_service_usa_cache_hasta_invalidar(self, mock_get_db_session):
+        _bundle_cache.clear()
+        filas = [self._fila_bundle(None, None, None, None, None)]
+        mock_get_db_session.side_effect = lambda: iter([self._mock_bundle_session(filas)])
+
+        get_test_bundle_service(100, dummy_usuario)
+        get_test_bundle_service(100, dummy_usuario)
+        self.assertEqual(mock_get_db_session.call_count, 1)
+
+        invalidar_cache_test(100)
+        result = get_test_bundle_service(100, dummy_usuario)
+        self.assertEqual(mock_get_db_session.call_count, 2)
+        self.assertEqual(result["preguntas"], [])
+
+    @patch("app.services.test_service.get_db_session")
+    def test_get_test_bundle_service_not_found(self, mock_get_db_session):
+        _bundle_cache.clear()
+        mock_get_db_session.return_value = iter([self._mock_bundle_session([])])
+        with self.assertRaises(HTTPException) as context:
+            get_test_bundle_service(999, dummy_usuario)
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_get_test_bundle_service_sin_usuario(self):
+        with self.assertRaises(HTTPException) as context:
+            get_test_bundle_service(100, None)
+        self.assertEqual(context.exception.status_code, 401)
+
     # --- Tests para delete_test_service ---
     @patch("app.services.test_service.get_db_session")
     def test_delete_test_service_success(self, mock_get_db_session):
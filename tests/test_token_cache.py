@@ -0,0 +1,51 @@
+import time
+import unittest
+
+from app.core.token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def test_get_retorna_datos_hasta_la_expiracion(self):
+        cache = TokenCache("prueba")
+        cache.set("token.a", {"user_id": 1}, time.time() + 60)
+        self.assertEqual(cache.get("token.a"), {"user_id": 1})
+        self.assertIsNone(cache.get("token.b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_entrada_vencida_se_descarta(self):
+        cache = TokenCache("prueba")
+        cache.set("token.a", {"user_id": 1}, time.time() + 0.05)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("token.a"))
+        self.assertEqual(cache.stats()["entradas"], 0)
+
+    def test_no_guarda_tokens_ya_expirados(self):
+        cache = TokenCache("prueba")
+        cache.set("token.a", {"user_id": 1}, time.time() - 1)
+        self.assertEqual(cache.stats()["entradas"], 0)
+
+    def test_respeta_el_maximo_de_entradas_lru(self):
+        cache = TokenCache("prueba", max_entries=2)
+        expira = time.time() + 60
+        cache.set("token.a", {"user_id": 1}, expira)
+        cache.set("token.b", {"user_id": 2}, expira)
+        cache.get("token.a")
+        cache.set("token.c", {"user_id": 3}, expira)
+        self.assertIsNone(cache.get("token.b"))
+        self.assertEqual(cache.get("token.a"), {"user_id": 1})
+
+    def test_tamano_cero_desactiva_la_cache(self):
+        cache = TokenCache("prueba", max_entries=0)
+        cache.set("token.a", {"user_id": 1}, time.time() + 60)
+        self.assertIsNone(cache.get("token.a"))
+
+    def test_no_guarda_el_token_en_claro(self):
+        cache = TokenCache("prueba")
+        cache.set("token.secreto", {"user_id": 1}, time.time() + 60)
+        self.assertNotIn("token.secreto", cache._entradas)
+
+
+if __name__ == "__main__":
+    unittest.main()
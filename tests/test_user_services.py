@@ -9,7 +9,8 @@ from app.services.user_services import (
     login_user,
     get_user_data_service,
     change_password_service,
-    edit_user_service
+    edit_user_service,
+    rehash_contrasena_service,
 )
 from app.models.mdl_user import UsuarioCreate, UsuarioUpdate, PasswordChangeRequest
 from app.services.auth_service import get_password_hash, verify_password, create_access_token
@@ -160,6 +161,56 @@ class TestUserServices(unittest.TestCase):
             register_user(user_data)
         self.assertEqual(context.exception.status_code, 500)
 
+    @patch("app.services.user_services.programar_rehash_contrasena")
+    @patch("app.services.user_services.password_needs_rehash", return_value=True)
+    @patch("app.services.user_services.verify_password", return_value=True)
+    @patch("app.services.user_services.get_db_session")
+    def test_login_user_programa_rehash_si_cambia_el_costo(
+        self, mock_get_db_session, mock_verify, mock_needs_rehash, mock_programar
+    ):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.first.return_value = dummy_user
+        mock_get_db_session.return_value = iter([mock_session])
+
+        result = login_user(dummy_user.email, "password")
+        self.assertIn("access_token", result)
+        mock_needs_rehash.assert_called_once_with(dummy_user.contrasena)
+        mock_programar.assert_called_once_with(dummy_user.id, "password", dummy_user.contrasena)
+
+    @patch("app.services.user_services.programar_rehash_contrasena")
+    @patch("app.services.user_services.password_needs_rehash", return_value=False)
+    @patch("app.services.user_services.verify_password", return_value=True)
+    @patch("app.services.user_services.get_db_session")
+    def test_login_user_sin_rehash_si_el_costo_es_vigente(
+        self, mock_get_db_session, mock_verify, mock_needs_rehash, mock_programar
+    ):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.first.return_value = dummy_user
+        mock_get_db_session.return_value = iter([mock_session])
+
+        login_user(dummy_user.email, "password")
+        mock_programar.assert_not_called()
+
+    @patch("app.services.user_services.get_password_hash", return_value="nuevo_hash")
+    @patch("app.services.user_services.get_db_session")
+    def test_rehash_contrasena_service_actualiza_si_no_cambio(self, mock_get_db_session, mock_hash):
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.update.return_value = 1
+        mock_get_db_session.return_value = iter([mock_session])
+
+        self.assertTrue(rehash_contrasena_service(1, "password", "hash_anterior"))
+        mock_session.query.return_value.filter.return_value.update.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    @patch("app.services.user_services.get_password_hash")
+    @patch("app.services.user_services.get_db_session")
+    def test_rehash_contrasena_service_pool_saturado(self, mock_get_db_session, mock_hash):
+        mock_hash.side_effect = HTTPException(status_code=429, detail="saturado")
+
+        self.assertFalse(rehash_contrasena_service(1, "password", "hash_anterior"))
+        mock_get_db_session.assert_not_called()
+
     @patch("app.services.user_services.get_db_session")
     def test_login_user_unexpected_exception(self, mock_get_db_session):
         # Simular una excepción inesperada en login_user
@@ -20,6 +20,15 @@ dummy_test = SimpleNamespace(id=1)
 dummy_pregunta = SimpleNamespace(id=10, test_id=1)
 dummy_response_1 = SimpleNamespace(respuesta_id=100)
 
+
+def query_distribucion(*filas):
+    # Simula la consulta agregada (vocacion, conteo) usada para calcular la distribución
+    query = MagicMock()
+    query.join.return_value.filter.return_value.group_by.return_value.order_by.return_value.all.return_value = [
+        SimpleNamespace(vocacion=vocacion, conteo=conteo) for vocacion, conteo in filas
+    ]
+    return query
+
 # Dummy vocacion existente para update (incluyendo moda_vocacion2)
 dummy_vocacion = SimpleNamespace(
     id=50, id_usuario=1, id_test=1, moda_vocacion="Old", moda_vocacion2="Old2"
@@ -69,25 +78,19 @@ class TestVocacionUsuarioService(unittest.TestCase):
         query_vocacion = MagicMock()
         query_vocacion.filter.return_value.first.return_value = None
 
-        # 3. Respuestas query -> retorna una lista con solo una respuesta (incompleto)
-        query_respuestas = MagicMock()
-        query_respuestas.filter.return_value.all.return_value = [dummy_response_1]
+        # 3. Distribución agregada -> una sola respuesta registrada (incompleto)
+        query_respuestas = query_distribucion(("A", 1))
 
         # 4. Preguntas count query -> retorna 2 (más que respuestas disponibles)
         query_preguntas = MagicMock()
         query_preguntas.filter.return_value.count.return_value = 2
 
-        # 5. Para cada respuesta en la lista, se simula una consulta que retorna "A"
-        query_respuesta_vocacion = MagicMock()
-        query_respuesta_vocacion.filter.return_value.scalar.return_value = "A"
-
         # La secuencia de llamadas:
         mock_session.query.side_effect = [
             query_test,          # para Test
             query_vocacion,      # para VocacionDeUsuarioPorTest
-            query_respuestas,    # para RespuestaDeUsuario
+            query_respuestas,    # para la distribución de vocaciones
             query_preguntas,     # para Pregunta count
-            query_respuesta_vocacion  # para la primera iteración de la lista (solo hay 1 respuesta)
         ]
         mock_get_db_session.return_value = iter([mock_session])
         
@@ -96,8 +99,9 @@ class TestVocacionUsuarioService(unittest.TestCase):
         self.assertEqual(context.exception.status_code, 400)
         self.assertIn("No se han respondido todas las preguntas", context.exception.detail)
 
+    @patch("app.services.vocacion_usuario_service.registrar_vocacion_en_snapshot")
     @patch("app.services.vocacion_usuario_service.get_db_session")
-    def test_create_or_update_vocacion_update(self, mock_get_db_session):
+    def test_create_or_update_vocacion_update(self, mock_get_db_session, mock_registrar):
         mock_session = MagicMock()
         # Secuencia para update: ya existe registro de vocación
         # 1. Test query -> retorna dummy_test
@@ -108,25 +112,18 @@ class TestVocacionUsuarioService(unittest.TestCase):
         query_vocacion = MagicMock()
         query_vocacion.filter.return_value.first.return_value = dummy_vocacion
 
-        # 3. Respuestas query -> retorna dos respuestas (completas)
-        query_respuestas = MagicMock()
-        query_respuestas.filter.return_value.all.return_value = [dummy_response_1, dummy_response_1]
+        # 3. Distribución agregada -> dos respuestas con la vocación "A"
+        query_respuestas = query_distribucion(("A", 2))
 
         # 4. Preguntas count query -> retorna 2
         query_preguntas = MagicMock()
         query_preguntas.filter.return_value.count.return_value = 2
 
-        # 5-6. Para cada respuesta en la lista (2 respuestas), se simula una consulta que retorna "A"
-        query_respuesta_vocacion = MagicMock()
-        query_respuesta_vocacion.filter.return_value.scalar.return_value = "A"
-
         mock_session.query.side_effect = [
             query_test,          # para Test
             query_vocacion,      # para VocacionDeUsuarioPorTest
-            query_respuestas,    # para RespuestaDeUsuario
+            query_respuestas,    # para la distribución de vocaciones
             query_preguntas,     # para Pregunta count
-            query_respuesta_vocacion,  # para primera respuesta
-            query_respuesta_vocacion   # para segunda respuesta
         ]
         mock_get_db_session.return_value = iter([mock_session])
         
@@ -136,9 +133,11 @@ class TestVocacionUsuarioService(unittest.TestCase):
         self.assertEqual(result["data"]["moda_vocacion"], "A")
         self.assertEqual(result["data"]["moda_vocacion2"], "A")
         mock_session.commit.assert_called_once()
+        mock_registrar.assert_called_once_with(mock_session, admin_user["user_id"], "A", "Old")
 
+    @patch("app.services.vocacion_usuario_service.registrar_vocacion_en_snapshot")
     @patch("app.services.vocacion_usuario_service.get_db_session")
-    def test_create_or_update_vocacion_create(self, mock_get_db_session):
+    def test_create_or_update_vocacion_create(self, mock_get_db_session, mock_registrar):
         mock_session = MagicMock()
         # Secuencia para creación: no existe vocación previa
         # 1. Test query -> retorna dummy_test
@@ -149,26 +148,19 @@ class TestVocacionUsuarioService(unittest.TestCase):
         query_vocacion = MagicMock()
         query_vocacion.filter.return_value.first.return_value = None
 
-        # 3. Respuestas query -> retorna dos respuestas
-        query_respuestas = MagicMock()
-        query_respuestas.filter.return_value.all.return_value = [dummy_response_1, dummy_response_1]
+        # 3. Distribución agregada -> dos respuestas con la vocación "A"
+        query_respuestas = query_distribucion(("A", 2))
 
         # 4. Preguntas count query -> retorna 2
         query_preguntas = MagicMock()
         query_preguntas.filter.return_value.count.return_value = 2
 
-        # 5-6. Para cada respuesta en la lista, simula la consulta que retorna "A"
-        query_respuesta_vocacion = MagicMock()
-        query_respuesta_vocacion.filter.return_value.scalar.return_value = "A"
-
         # Secuencia completa de llamadas:
         mock_session.query.side_effect = [
             query_test,          # para Test
             query_vocacion,      # para VocacionDeUsuarioPorTest
-            query_respuestas,    # para RespuestaDeUsuario
+            query_respuestas,    # para la distribución de vocaciones
             query_preguntas,     # para Pregunta count
-            query_respuesta_vocacion,  # para primera respuesta
-            query_respuesta_vocacion   # para segunda respuesta
         ]
         # Simular asignación de id en refresh para la nueva vocación
         def refresh_side_effect(instance):
@@ -182,6 +174,38 @@ class TestVocacionUsuarioService(unittest.TestCase):
         self.assertEqual(result["data"]["moda_vocacion"], "A")
         self.assertEqual(result["data"]["moda_vocacion2"], "A")
         mock_session.commit.assert_called_once()
+        mock_registrar.assert_called_once_with(mock_session, admin_user["user_id"], "A")
+
+    @patch("app.services.vocacion_usuario_service.registrar_vocacion_en_snapshot")
+    @patch("app.services.vocacion_usuario_service.get_db_session")
+    def test_create_or_update_vocacion_returns_distribution(self, mock_get_db_session, mock_registrar):
+        mock_session = MagicMock()
+        query_test = MagicMock()
+        query_test.filter.return_value.first.return_value = dummy_test
+        query_vocacion = MagicMock()
+        query_vocacion.filter.return_value.first.return_value = None
+        # La consulta ya llega ordenada por conteo descendente y vocación ascendente
+        query_respuestas = query_distribucion(("A", 3), ("B", 1), ("C", 1))
+        query_preguntas = MagicMock()
+        query_preguntas.filter.return_value.count.return_value = 5
+
+        mock_session.query.side_effect = [query_test, query_vocacion, query_respuestas, query_preguntas]
+        mock_session.refresh.side_effect = lambda instance: setattr(instance, "id", 61)
+        mock_get_db_session.return_value = iter([mock_session])
+
+        result = create_or_update_vocacion_usuario_service(1, admin_user)
+        self.assertEqual(result["data"]["moda_vocacion"], "A")
+        self.assertEqual(result["data"]["moda_vocacion2"], "B")
+        self.assertEqual(
+            result["data"]["distribucion"],
+            [
+                {"vocacion": "A", "conteo": 3, "porcentaje": 60.0},
+                {"vocacion": "B", "conteo": 1, "porcentaje": 20.0},
+                {"vocacion": "C", "conteo": 1, "porcentaje": 20.0},
+            ],
+        )
+        # Test, vocación existente, distribución y conteo de preguntas: sin consultas por respuesta
+        self.assertEqual(mock_session.query.call_count, 4)
 
     @patch("app.services.vocacion_usuario_service.get_db_session")
     def test_create_or_update_vocacion_unexpected_exception(self, mock_get_db_session):